@@ -0,0 +1,219 @@
+'''
+Benchmark a whole crawl against a generated site served locally, without
+any network access, to compare engines and settings on one machine.
+
+    python -m benchmarks.crawl [--pages N] [--links N] [--latency SECONDS]
+                               [--not-found RATE] [--engine ENGINE]
+                               [--concurrency N] [--processes N]
+                               [--follow-links] [--stats]
+
+The site has a robots.txt, a /blog, a sitemap.xml listing every page and
+pages linking to each other, some of the pages are missing. It is served
+from a separate process so the crawl is measured on its own. Use --serve
+to keep the site up and run seoreport against it instead.
+'''
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import random
+import time
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from benchmarks import synthetic
+from seo_report import cmd
+from seo_report import stats
+
+ROBOTS = b"User-agent: *\nAllow: /\n"
+
+
+class Site(object):
+    '''
+    Generated site of pages pages, each linking to links other pages, with
+    not_found of the pages missing
+    '''
+
+    def __init__(self, pages=1000, links=20, not_found=0.05, words=500,
+                 seed=0):
+        self.pages = pages
+        self.links = links
+        self.not_found = not_found
+        self.words = words
+        self.seed = seed
+
+        rand = random.Random(seed)
+        self.missing = set(i for i in range(pages)
+                           if rand.random() < not_found)
+        self.sitemaps = {}
+
+    def page(self, i):
+        rand = random.Random(self.seed + i)
+        hrefs = [u"/page/{0}".format(rand.randrange(self.pages))
+                 for _ in range(self.links)]
+        return synthetic.generate_page(
+            self.words, images=5, seed=self.seed + i,
+            hrefs=hrefs).encode("utf-8")
+
+    def sitemap(self, host):
+        # sitemaps list absolute urls, on whichever port the site is served
+        if host not in self.sitemaps:
+            self.sitemaps[host] = synthetic.generate_sitemap(
+                self.pages, site="http://" + host).encode("utf-8")
+
+        return self.sitemaps[host]
+
+    def get(self, path, host):
+        '''
+        Returns the status code and body served for the path
+        '''
+        if path == "/robots.txt":
+            return 200, ROBOTS
+        if path == "/sitemap.xml":
+            return 200, self.sitemap(host)
+        if path in ("/", "/blog"):
+            return 200, self.page(self.pages)
+
+        if path.startswith("/page/"):
+            try:
+                i = int(path[len("/page/"):])
+            except ValueError:
+                i = -1
+            if 0 <= i < self.pages and i not in self.missing:
+                return 200, self.page(i)
+
+        return 404, b"Not Found"
+
+
+class SiteServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def handler(site, latency, requests_served):
+
+    class SiteHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+        # keep the connections alive like a real web server
+        protocol_version = "HTTP/1.1"
+
+        def respond(self, body=True):
+            with requests_served.get_lock():
+                requests_served.value += 1
+
+            if latency:
+                time.sleep(latency)
+
+            status_code, content = site.get(
+                self.path, self.headers.get("Host"))
+            self.send_response(status_code)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            if body:
+                self.wfile.write(content)
+
+        def do_GET(self):
+            self.respond()
+
+        def do_HEAD(self):
+            self.respond(body=False)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SiteHandler
+
+
+def serve(site, latency, requests_served, address):
+    server = SiteServer(("127.0.0.1", 0),
+                        handler(site, latency, requests_served))
+    address.send(server.server_address)
+    server.serve_forever()
+
+
+def start_server(site, latency):
+    '''
+    Serve the site from a new process, returns the process, its url and
+    the counter of requests served
+    '''
+    requests_served = multiprocessing.Value("l", 0)
+    address, child_address = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=serve, args=(site, latency, requests_served, child_address))
+    process.daemon = True
+    process.start()
+
+    host, port = address.recv()
+    return process, "http://{0}:{1}".format(host, port), requests_served
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--links', type=int, default=20,
+                        help='Links from each page to other pages')
+    parser.add_argument('--words', type=int, default=500,
+                        help='Words of text on each page')
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='Seconds before each response is sent')
+    parser.add_argument('--not-found', type=float, default=0.05,
+                        help='Fraction of the pages that are missing')
+    parser.add_argument('--engine', type=str, default='threads',
+                        choices=['threads', 'asyncio'])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--follow-links', action='store_true',
+                        help='Discover the pages from the links instead '
+                             'of the sitemap')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print the time spent in each phase')
+    parser.add_argument('--serve', action='store_true',
+                        help='Only serve the site until interrupted')
+    args = parser.parse_args()
+
+    site = Site(args.pages, args.links, args.not_found, args.words)
+    process, url, requests_served = start_server(site, args.latency)
+
+    if args.serve:
+        print("Serving {0} pages on {1}".format(args.pages, url))
+        try:
+            process.join()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    sitemap = None if args.follow_links else "/sitemap.xml"
+    crawl_stats = stats.CrawlStats()
+    try:
+        cmd.analyze(url, sitemap, concurrency=args.concurrency,
+                    engine=args.engine, processes=args.processes,
+                    follow_links=args.follow_links, crawl_stats=crawl_stats)
+    finally:
+        process.terminate()
+
+    summary = crawl_stats.summary()
+    elapsed = summary["elapsed"]
+    print("{0:<20} {1:>12}".format("engine", args.engine))
+    print("{0:<20} {1:>12}".format("concurrency", args.concurrency))
+    print("{0:<20} {1:>12}".format("processes", args.processes or "-"))
+    print("{0:<20} {1:>12}".format(
+        "pages", summary["counters"].get("pages", 0)))
+    print("{0:<20} {1:>12}".format("requests", requests_served.value))
+    print("{0:<20} {1:>12.2f}".format("seconds", elapsed))
+    print("{0:<20} {1:>12.1f}".format(
+        "pages/s", summary["pages_per_second"]))
+    print("{0:<20} {1:>12.1f}".format(
+        "requests/s", requests_served.value / elapsed))
+    print("{0:<20} {1:>12.1f}".format(
+        "peak RSS (MB)", summary["peak_rss_mb"] or 0))
+
+    if args.stats:
+        print()
+        print(crawl_stats.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+'''
+Benchmark the page analysis hot path on synthetic pages, without any
+network access, and compare the results with a stored baseline.
+
+    python -m benchmarks.hotpath [--repeat N] [--baseline FILE]
+                                 [--check] [--tolerance T] [--save]
+
+With --check, exits with a non zero status if any benchmark is slower, or
+peaks at more memory, than the baseline allows. Each run of a benchmark is
+timed relative to a run of a pure Python calibration loop right after it,
+and the median of these ratios is compared, so a baseline saved with --save
+on one machine stays meaningful on another.
+'''
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+import bs4
+import requests
+
+from benchmarks import synthetic
+from seo_report import links
+from seo_report import webpage
+from seo_report import website
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "baseline.json")
+DEFAULT_REPEAT = 10
+
+# the median ratio of a benchmark still varies by a few tens of percent
+# between runs on a busy machine, only larger slow downs are reported
+DEFAULT_TOLERANCE = 1.0
+DEFAULT_MEMORY_TOLERANCE = 0.1
+
+# words, anchors and images of the generated pages
+PAGE_SIZES = collections.OrderedDict([
+    ("small", (200, 10, 2)),
+    ("medium", (1000, 100, 20)),
+    ("large", (5000, 500, 100)),
+])
+SITEMAP_SIZE = 10000
+
+SITE = "http://www.example.com"
+
+
+def report_benchmark(html, link_checker):
+    def run():
+        webpage.Webpage(SITE + "/", html, {}, {},
+                        link_checker=link_checker).report()
+
+    return run
+
+
+def benchmarks(link_checker):
+    '''
+    The benchmarks to run, by name
+    '''
+    cases = collections.OrderedDict()
+    for size, (words, anchors, images) in PAGE_SIZES.items():
+        html = synthetic.generate_page(words, anchors, images, site=SITE)
+        cases["report[{0}]".format(size)] = report_benchmark(
+            html, link_checker)
+
+    html = synthetic.generate_page(*PAGE_SIZES["large"], site=SITE)
+    soup = bs4.BeautifulSoup(html, webpage.DEFAULT_PARSER)
+    page = webpage.Webpage(SITE + "/", html, {}, {},
+                           link_checker=link_checker)
+    text = page._get_page_text(soup).text
+    tokens = page.tokenize(text)
+
+    cases["tokenize[large]"] = lambda: page.tokenize(text)
+    cases["grouped[large]"] = lambda: page.grouped(tokens)
+
+    # a new page for each run, the keywords are cached per page
+    cases["_get_keywords[large]"] = lambda: webpage.Webpage(
+        SITE + "/", html, {}, {},
+        link_checker=link_checker)._get_keywords(soup)
+
+    sitemap = synthetic.generate_sitemap(SITEMAP_SIZE, site=SITE)
+    spider = website.Spider(SITE, None)
+    spider.link_checker.close()
+    cases["_parse_sitemap[{0}]".format(SITEMAP_SIZE)] = \
+        lambda: spider._parse_sitemap(sitemap)
+
+    return cases
+
+
+def calibration():
+    # tokenizing and counting words, like the analysis, in plain Python
+    words = synthetic.WORDS * 200
+
+    def run():
+        counts = {}
+        for word in words:
+            counts[word.lower()] = counts.get(word.lower(), 0) + 1
+        return sorted(counts.items(), key=lambda x: x[1])
+
+    return run
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def loops(timer):
+    # enough calls of the function to last a fraction of a second
+    if hasattr(timer, "autorange"):
+        return timer.autorange()[0]
+
+    return 1
+
+
+def measure(run, calibrate, repeat=DEFAULT_REPEAT):
+    '''
+    Median time of a call to run and median ratio to the calibration loop,
+    timed right after each run so both are slowed down alike by the rest of
+    the system
+    '''
+    timer = timeit.Timer(run)
+    calibration_timer = timeit.Timer(calibrate)
+    number = loops(timer)
+    calibration_number = loops(calibration_timer)
+
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        seconds = timer.timeit(number) / number
+        unit = calibration_timer.timeit(
+            calibration_number) / calibration_number
+        times.append(seconds)
+        ratios.append(seconds / unit)
+
+    result = {"seconds": median(times), "relative": median(ratios)}
+    if tracemalloc is not None:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_kb"] = peak / 1024.0
+
+    return result
+
+
+def regressions(results, baseline, tolerance,
+                memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    '''
+    Returns the benchmarks slower or using more memory than the baseline
+    plus the tolerance
+    '''
+    regressed = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        for metric, allowed in (("relative", tolerance),
+                                ("peak_kb", memory_tolerance)):
+            if metric not in result or metric not in expected:
+                continue
+
+            limit = expected[metric] * (1 + allowed)
+            if result[metric] > limit:
+                regressed.append("{0} {1}: {2:.4g} > {3:.4g}".format(
+                    name, metric, result[metric], limit))
+
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--baseline', type=str, default=BASELINE)
+    parser.add_argument('--check', action='store_true',
+                        help='Fail if a benchmark regressed from the '
+                             'baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slow down, as a fraction')
+    parser.add_argument('--memory-tolerance', type=float,
+                        default=DEFAULT_MEMORY_TOLERANCE,
+                        help='Allowed increase of the peak memory')
+    parser.add_argument('--save', action='store_true',
+                        help='Store the results as the new baseline')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # every link is reported as working without making any request
+    link_checker = links.OfflineLinkChecker(lambda url: requests.codes.ok)
+    results = collections.OrderedDict()
+
+    calibrate = calibration()
+    for name, run in benchmarks(link_checker).items():
+        results[name] = measure(run, calibrate, args.repeat)
+
+    print("{0:<24} {1:>12} {2:>12} {3:>12} {4:>10}".format(
+        "benchmark", "msec", "per second", "peak KB", "change"))
+    for name, result in results.items():
+        change = ""
+        if "relative" in baseline.get(name, {}):
+            change = "{0:+.1%}".format(
+                result["relative"] / baseline[name]["relative"] - 1)
+        print("{0:<24} {1:>12.3f} {2:>12.1f} {3:>12.1f} {4:>10}".format(
+            name, result["seconds"] * 1000, 1 / result["seconds"],
+            result.get("peak_kb", 0), change))
+
+    link_checker.close()
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4, separators=(',', ': '))
+            f.write("\n")
+        print("Baseline saved to {0}".format(args.baseline))
+        return
+
+    if not args.check:
+        return
+
+    regressed = regressions(results, baseline, args.tolerance,
+                            args.memory_tolerance)
+    if regressed:
+        print("\nRegressions:")
+        for regression in regressed:
+            print("  " + regression)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+'''
+Compare the per page parse time of each HTML parser backend on the html
+fixtures used by the unit tests.
+
+    python -m benchmarks.parsers [--repeat N]
+'''
+from __future__ import print_function
+
+import argparse
+import glob
+import json
+import os
+import timeit
+
+import bs4
+import six
+
+from seo_report import webpage
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests", "unit")
+
+
+def load_pages():
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(FIXTURES, "data_*.json"))):
+        with open(filename) as fixture:
+            data = json.load(fixture)
+
+        for value in data.values():
+            html = value[0] if isinstance(value, list) else value
+            if isinstance(html, six.string_types) and "<" in html:
+                pages.append(html)
+
+    return pages
+
+
+def available_parsers():
+    return [parser for parser in webpage.PARSERS
+            if bs4.builder.builder_registry.lookup(parser) is not None]
+
+
+def benchmark(pages, parser, repeat):
+    timer = timeit.Timer(
+        lambda: [bs4.BeautifulSoup(html, parser) for html in pages])
+
+    # the best of the runs is the least disturbed by the rest of the system
+    best = min(timer.repeat(repeat=repeat, number=1))
+    return best / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_pages()
+    print("{0} pages from {1}".format(len(pages), FIXTURES))
+    print("{0:<12} {1:>14}".format("parser", "usec per page"))
+
+    for backend in available_parsers():
+        per_page = benchmark(pages, backend, args.repeat)
+        print("{0:<12} {1:>14.1f}".format(backend, per_page * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+'''
+Synthetic pages and sitemaps for the benchmarks, generated from a seed so
+every run measures the same content.
+'''
+import random
+
+WORDS = (
+    "search engine optimization page content keyword title description "
+    "heading anchor image link crawler sitemap robots index ranking user "
+    "website blog article product category review guide tutorial price "
+    "shipping support contact about team careers news press release event "
+    "the and of to in is for on with as by at from that this are be or an"
+).split()
+
+
+def sentence(rand, length):
+    return u" ".join(rand.choice(WORDS) for _ in range(length))
+
+
+def generate_page(words=500, anchors=50, images=10, seed=0,
+                  site="http://www.example.com", hrefs=None):
+    '''
+    HTML page of about words words of text, with anchors links, half of
+    them to the same site, and images images, one in five without an alt.
+    The links point to hrefs instead when given.
+    '''
+    rand = random.Random(seed)
+    if hrefs is not None:
+        anchors = len(hrefs)
+
+    parts = [
+        u"<html><head>",
+        u"<title>{0}</title>".format(sentence(rand, 6)),
+        u"<meta name='description' content='{0}' />".format(
+            sentence(rand, 20)),
+        u"</head><body>",
+        u"<h1>{0}</h1>".format(sentence(rand, 5))
+    ]
+
+    per_paragraph = 50
+    for paragraph in range(max(1, words // per_paragraph)):
+        if paragraph % 4 == 0:
+            parts.append(u"<h2>{0}</h2>".format(sentence(rand, 4)))
+        parts.append(u"<p>{0}</p>".format(sentence(rand, per_paragraph)))
+
+    for i in range(anchors):
+        if hrefs is not None:
+            href = hrefs[i]
+        elif i % 2 == 0:
+            href = u"/{0}/{1}".format(rand.choice(WORDS), i)
+        else:
+            href = u"http://www.{0}{1}.com/".format(rand.choice(WORDS), i)
+        parts.append(u"<a href='{0}' title='{1}'>{1}</a>".format(
+            href, sentence(rand, 3)))
+
+    for i in range(images):
+        alt = u"" if i % 5 == 0 else sentence(rand, 3)
+        parts.append(u"<img src='/images/{0}.png' alt='{1}' />".format(
+            i, alt))
+
+    parts.append(u"</body></html>")
+
+    return u"".join(parts)
+
+
+def generate_sitemap(pages, site="http://www.example.com"):
+    '''
+    Sitemap listing pages urls of the site
+    '''
+    parts = [u'<?xml version="1.0" encoding="UTF-8"?>'
+             u'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for i in range(pages):
+        parts.append(u"<url><loc>{0}/page/{1}</loc>"
+                     u"<lastmod>2016-01-01</lastmod></url>".format(site, i))
+    parts.append(u"</urlset>")
+
+    return u"".join(parts)
@@ -0,0 +1,365 @@
+import asyncio
+import collections
+from concurrent import futures
+import threading
+
+from six.moves.urllib import parse
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from seo_report import links
+from seo_report import sessions
+from seo_report import sitemaps
+from seo_report import stats
+from seo_report import webpage
+from seo_report import website
+
+Response = website.Response
+
+DEFAULT_CONCURRENCY = 100
+
+# seconds before the first retry of a failed request, doubled after each
+# one as with the sessions of the threads engine
+RETRY_BACKOFF = 0.5
+
+
+class AsyncSitemap(sitemaps.Sitemap):
+    '''
+    Stream the page locations of a sitemap over an aiohttp client
+    '''
+
+    async def iter_locations(self, client):
+        seen = set([self.url])
+        pending = [(self.url, 0)]
+
+        while pending:
+            sitemap_url, depth = pending.pop(0)
+
+            parser = sitemaps.SitemapParser()
+            nested = []
+            async for chunk in self._chunks(client, sitemap_url):
+                for kind, loc in parser.feed(chunk):
+                    if kind == "url":
+                        yield loc
+                    else:
+                        nested.append(loc)
+
+            for kind, loc in parser.close():
+                if kind == "url":
+                    yield loc
+                else:
+                    nested.append(loc)
+
+            if parser.error is not None:
+                self.invalid.append(sitemap_url)
+
+            for loc in nested:
+                loc = parse.urljoin(sitemap_url, loc)
+                if loc not in seen and depth < self.max_depth:
+                    seen.add(loc)
+                    pending.append((loc, depth + 1))
+
+    async def _chunks(self, client, sitemap_url):
+        async with client.get(sitemap_url) as resp:
+            if resp.status != website.requests.codes.ok:
+                return
+
+            async for chunk in resp.content.iter_chunked(
+                    sitemaps.CHUNK_SIZE):
+                yield chunk
+
+
+class AsyncLinkChecker(links.LinkChecker):
+    '''
+    Verify links with aiohttp on the event loop of the crawl, sharing its
+    connections. The futures can be waited on from the threads analyzing
+    the pages.
+    '''
+
+    def __init__(self, politeness=None, stats=None):
+        self.politeness = politeness
+        self.stats = stats
+        self.checked = {}
+        self.lock = threading.Lock()
+
+        # set once the crawl has started its event loop
+        self.loop = None
+        self.client = None
+
+    def start(self, loop, client):
+        self.loop = loop
+        self.client = client
+
+    def check(self, url):
+        with self.lock:
+            future = self.checked.get(url)
+            if future is None:
+                future = asyncio.run_coroutine_threadsafe(
+                    self._status(url), self.loop)
+                self.checked[url] = future
+
+        return future
+
+    async def _status(self, url):
+        if self.stats is not None:
+            self.stats.incr("link_checks")
+
+        with stats.timed(self.stats, "link_check"):
+            # links are rate limited along with the pages of their host,
+            # the connector caps the connections to each host
+            if self.politeness is not None:
+                await asyncio.sleep(self.politeness.reserve(url))
+
+            return await self._head(url)
+
+    async def _head(self, url):
+        async with self.client.head(url) as resp:
+            return resp.status
+
+    def close(self):
+        pass
+
+
+class AsyncSpider(website.Spider):
+    '''
+    Crawl a website with asyncio, multiplexing every in-flight request on
+    a single event loop instead of a pool of threads
+    '''
+
+    def __init__(self, site, sitemap=None, page=None,
+                 concurrency=DEFAULT_CONCURRENCY, session=None,
+                 stop_words=None, parser=webpage.DEFAULT_PARSER,
+                 writer=None, follow_links=False, max_depth=None,
+                 max_pages=None, cache=None, store=None, processes=None,
+                 checkpoint=None, resume=False, politeness=None, stats=None,
+                 max_page_size=None, codes=False,
+                 timeout=sessions.DEFAULT_TIMEOUT,
+                 retries=sessions.DEFAULT_RETRIES):
+        if aiohttp is None:
+            raise ImportError(
+                "The asyncio engine requires aiohttp to be installed")
+
+        super(AsyncSpider, self).__init__(
+            site, sitemap, page,
+            concurrency=concurrency, session=session, stop_words=stop_words,
+            parser=parser, writer=writer, follow_links=follow_links,
+            max_depth=max_depth, max_pages=max_pages, cache=cache,
+            store=store, processes=processes, checkpoint=checkpoint,
+            resume=resume, politeness=politeness, stats=stats,
+            max_page_size=max_page_size, codes=codes)
+
+        # applied to the aiohttp requests, the blocking session has its own
+        self.timeout = timeout
+        self.retries = retries
+
+        # the sitemap is streamed on the event loop during the crawl
+        if self.sitemap is not None:
+            self.sitemap = AsyncSitemap(None, self.sitemap.url)
+
+    def _create_link_checker(self):
+        return AsyncLinkChecker(politeness=self.politeness, stats=self.stats)
+
+    def crawl(self):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self._crawl())
+        finally:
+            loop.close()
+            self._close()
+
+    async def _fetch(self, client, page_url):
+        # only failed connections and reads are retried, a server error
+        # response is reported as is
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._fetch_once(client, page_url)
+            except (aiohttp.ClientConnectionError,
+                    aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    async def _fetch_once(self, client, page_url):
+        # the cache is read and written on the default executor, so the
+        # event loop keeps servicing the other requests meanwhile
+        loop = asyncio.get_event_loop()
+
+        cached = None
+        headers = {}
+        if self.cache is not None:
+            cached = await loop.run_in_executor(
+                None, self.cache.get, page_url)
+            headers = self.cache.conditional_headers(cached)
+
+        async with client.get(page_url, headers=headers) as resp:
+            if resp.status == website.requests.codes.not_modified \
+                    and cached is not None:
+                await loop.run_in_executor(None, self.cache.hit, page_url)
+                return cached
+
+            # responses with a cache are fetched whole, a page cut short
+            # would later be revalidated as if it was complete
+            if self.cache is not None:
+                content = await resp.read()
+                await loop.run_in_executor(
+                    None, self.cache.miss, page_url, resp.status,
+                    resp.headers, content)
+            elif self.max_page_size is None:
+                content = await resp.read()
+            else:
+                content = await self._read_limited(resp)
+
+            return Response(resp.status, content)
+
+    async def _read_limited(self, resp):
+        # stop the download one byte past the limit, like the threads
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(website.CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_page_size:
+                break
+
+        return b"".join(chunks)[:self.max_page_size + 1]
+
+    async def _fetch_bounded(self, client, semaphore, page_url, pool=None):
+        # wait for the rate limit of the host without holding a connection
+        if self.politeness is not None:
+            await asyncio.sleep(self.politeness.reserve(page_url))
+
+        async with semaphore:
+            with stats.timed(self.stats, "fetch"):
+                resp = await self._fetch(client, page_url)
+
+        self._count("requests")
+        self._count("bytes", len(resp.content))
+
+        # start parsing the page in a worker process right away, hashing
+        # it and looking it up in the store off the event loop
+        analysis = None
+        if pool is not None:
+            analysis = await asyncio.get_event_loop().run_in_executor(
+                None, self._submit, pool, page_url, resp)
+
+        return resp, analysis
+
+    async def _next_page(self, sitemap_locations):
+        # pages found on the site come first, the sitemap is only read
+        # once they run out
+        entry = self.frontier.pop()
+        while entry is None and sitemap_locations is not None:
+            try:
+                self.frontier.add(await sitemap_locations.__anext__())
+            except StopAsyncIteration:
+                return None
+
+            entry = self.frontier.pop()
+
+        return entry
+
+    async def _next_allowed_page(self, loop, sitemap_locations):
+        # robots.txt is fetched with the blocking session on first use
+        while True:
+            entry = await self._next_page(sitemap_locations)
+            if entry is None or self.politeness is None:
+                return entry
+
+            allowed = await loop.run_in_executor(
+                None, self._allowed, entry[0])
+            if allowed:
+                return entry
+
+    async def _crawl(self):
+        loop = asyncio.get_event_loop()
+
+        # page analysis is CPU bound, so it runs on a single worker thread
+        # to keep the event loop free to service the sockets meanwhile,
+        # optionally parsing the pages in worker processes
+        pool = None
+        if self.processes:
+            pool = futures.ProcessPoolExecutor(max_workers=self.processes)
+
+        try:
+            await self._crawl_pages(loop, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self._analyze_sitemap()
+
+        report = self._aggregate()
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+        return report
+
+    async def _crawl_pages(self, loop, pool):
+        limit_per_host = 0
+        if self.politeness is not None \
+                and self.politeness.max_connections is not None:
+            limit_per_host = self.politeness.max_connections
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=limit_per_host)
+
+        with futures.ThreadPoolExecutor(max_workers=1) as analyzer:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(
+                    connector=connector, timeout=timeout) as client:
+                self.link_checker.start(loop, client)
+
+                # the site wide checks of a resumed crawl are already done
+                if not self._resume():
+                    # the scheduler fetches robots.txt once for its rules
+                    if self.politeness is not None:
+                        robots = loop.run_in_executor(
+                            None, self.politeness.robots_txt, self.domain)
+                    else:
+                        robots = self._fetch(
+                            client, self.domain + "/robots.txt")
+                    robots, blog = await asyncio.gather(
+                        robots, self._fetch(client, self.domain + "/blog"))
+                    self._analyze_crawlers(robots)
+                    self._analyze_mobile()
+                    self._analyze_analytics()
+                    self._analyze_blog(blog)
+
+                    self.frontier = self._create_frontier()
+
+                # keep a bounded window of requests in flight and analyze
+                # the responses in the order the pages were queued
+                sitemap_locations = None
+                if self.sitemap is not None:
+                    sitemap_locations = self.sitemap.iter_locations(client)
+
+                semaphore = asyncio.Semaphore(self.concurrency)
+                in_flight = collections.deque()
+                while True:
+                    while len(in_flight) <= self.concurrency:
+                        entry = await self._next_allowed_page(
+                            loop, sitemap_locations)
+                        if entry is None:
+                            break
+
+                        page_url, depth = entry
+                        task = asyncio.ensure_future(self._fetch_bounded(
+                            client, semaphore, page_url, pool))
+                        in_flight.append((page_url, depth, task))
+
+                    if len(in_flight) == 0:
+                        break
+
+                    await self._analyze_next(loop, analyzer, in_flight)
+
+    async def _analyze_next(self, loop, analyzer, in_flight):
+        page_url, depth, task = in_flight.popleft()
+        resp, analysis = await task
+        await loop.run_in_executor(
+            analyzer, self._complete, page_url, depth, resp, analysis)
+
+        # the crawl state is saved between pages, from the event loop
+        self._page_done(page_url)
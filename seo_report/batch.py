@@ -0,0 +1,159 @@
+'''
+Audit a list of websites in one process, crawling several of them at once
+over shared connection pools and writing one report per website
+
+    seoreport-batch domains.txt -o reports/ --sites 8 -s /sitemap.xml
+'''
+import argparse
+from concurrent import futures
+import io
+import os
+import sys
+
+from six.moves.urllib import parse
+
+from seo_report import cmd
+from seo_report import sessions
+
+DEFAULT_SITES = 4
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        description='Analyze and report on the Search Experience of a list '
+                    'of websites.'
+    )
+
+    parser.add_argument(
+        'domains', type=str,
+        help='File listing the website domains to analyze, one per line'
+    )
+
+    parser.add_argument(
+        '-o', '--output-dir', type=str, required=False, default='.',
+        help='Directory the report of each website is written to'
+    )
+
+    parser.add_argument(
+        '--sites', type=int, required=False, default=DEFAULT_SITES,
+        help='Number of websites crawled at once'
+    )
+
+    cmd.add_arguments(parser)
+
+    return parser
+
+
+def load_domains(path):
+    '''
+    Domains listed in the file, skipping blank lines and # comments
+    '''
+    with io.open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def report_path(output_dir, domain, output_format):
+    '''
+    File the report of the domain is written to, named after its host
+    '''
+    netloc = parse.urlparse(domain).netloc.lower() or domain
+    return os.path.join(output_dir, "{0}.{1}".format(
+        netloc.replace(":", "_"), output_format))
+
+
+def audit_site(domain, path, sitemap=None, page=None, **options):
+    try:
+        with io.open(path, "w", encoding="utf-8") as f:
+            report = cmd.analyze(domain, sitemap, page, stream=f, **options)
+            if report is not None:
+                f.write(report)
+                f.write(u"\n")
+    except Exception:
+        # jsonl reports are written as the crawl goes, a failed crawl
+        # leaves no partial report behind
+        os.remove(path)
+        raise
+
+
+def audit(domains, output_dir, sites=DEFAULT_SITES, sitemap=None,
+          page=None, concurrency=None, retries=sessions.DEFAULT_RETRIES,
+          timeout=sessions.DEFAULT_TIMEOUT, output_format='json',
+          **options):
+    '''
+    Crawl the domains, sites at a time, each with its own state. The
+    connection pools are shared by every crawl. Returns the domains that
+    failed along with their error, the other reports are written to
+    output_dir.
+    '''
+    sites = max(1, min(sites, len(domains) or 1))
+    engine = options.get("engine", "threads")
+    concurrency = cmd.get_concurrency(engine, concurrency)
+
+    # one pool per host, for the hosts of every site crawled at once
+    session = sessions.create_session(
+        pool_size=sites * cmd.pool_size(concurrency, engine),
+        retries=retries,
+        timeout=timeout)
+
+    failed = {}
+    with futures.ThreadPoolExecutor(max_workers=sites) as executor:
+        crawls = {}
+        for domain in domains:
+            path = report_path(output_dir, domain, output_format)
+            crawls[executor.submit(
+                audit_site, domain, path, sitemap, page,
+                concurrency=concurrency, retries=retries, timeout=timeout,
+                output_format=output_format, session=session,
+                **options)] = domain
+
+        for crawl in futures.as_completed(crawls):
+            # a failed site doesn't stop the audit of the others
+            error = crawl.exception()
+            if error is not None:
+                failed[crawls[crawl]] = error
+
+    session.close()
+
+    return failed
+
+
+def main():
+    parser = create_parser()
+    args = parser.parse_args()
+
+    # each crawl would need a state of its own
+    if args.checkpoint is not None or args.resume:
+        parser.error("--checkpoint and --resume are not supported by the "
+                     "batch audit")
+
+    # an archive or directory holds a single website
+    if args.warc is not None or args.directory is not None:
+        parser.error("--warc and --directory are not supported by the "
+                     "batch audit")
+
+    domains = load_domains(args.domains)
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    options = cmd.analyze_options(args)
+    try:
+        failed = audit(domains, args.output_dir, sites=args.sites,
+                       sitemap=args.sitemap, page=args.page, **options)
+    finally:
+        cmd.close_options(options)
+
+    for domain in domains:
+        if domain in failed:
+            sys.stderr.write("{0}: {1}\n".format(domain, failed[domain]))
+
+    if options["crawl_stats"] is not None:
+        sys.stderr.write(options["crawl_stats"].format() + "\n")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
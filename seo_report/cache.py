@@ -0,0 +1,148 @@
+import collections
+import sqlite3
+import threading
+import time
+
+import requests
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+CachedResponse = collections.namedtuple(
+    "CachedResponse", ["status_code", "content", "etag", "last_modified"])
+
+
+class ResponseCache(object):
+    '''
+    Persistent cache of page bodies keyed by url. Stored pages are
+    revalidated with their ETag and Last-Modified headers, so unchanged
+    pages cost a 304 instead of a full download. The least recently used
+    pages are evicted once the bodies exceed max_size bytes.
+    '''
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                "content BLOB, size INTEGER, accessed REAL)")
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed "
+                "ON responses (accessed)")
+
+        # total size of the bodies, kept up to date so storing a page
+        # doesn't scan the whole table
+        self.total = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT content, etag, last_modified FROM responses "
+                "WHERE url = ?", (url,)).fetchone()
+
+        if row is None:
+            return None
+
+        content, etag, last_modified = row
+        return CachedResponse(
+            requests.codes.ok, bytes(content), etag, last_modified)
+
+    def conditional_headers(self, cached):
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        return headers
+
+    def store(self, url, headers, content):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+
+        # pages without validators can't be revalidated
+        if etag is None and last_modified is None:
+            return
+
+        with self.lock, self.db:
+            replaced = self.db.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, sqlite3.Binary(content),
+                 len(content), time.time()))
+
+            self.total += len(content)
+            if replaced is not None:
+                self.total -= replaced[0]
+            self._evict()
+
+    def touch(self, url):
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE responses SET accessed = ? WHERE url = ?",
+                (time.time(), url))
+
+    def fetch(self, session, url):
+        '''
+        Fetch the url with the session, revalidating the stored copy
+        '''
+        cached = self.get(url)
+        resp = session.get(url, headers=self.conditional_headers(cached))
+
+        if resp.status_code == requests.codes.not_modified \
+                and cached is not None:
+            self.hit(url)
+            return cached
+
+        self.miss(url, resp.status_code, resp.headers, resp.content)
+        return resp
+
+    def hit(self, url):
+        '''
+        Record that the stored copy of the url is still valid
+        '''
+        self.touch(url)
+        with self.lock:
+            self.hits += 1
+
+    def miss(self, url, status_code, headers, content):
+        '''
+        Record a full download of the url, storing it if successful
+        '''
+        with self.lock:
+            self.misses += 1
+
+        if status_code == requests.codes.ok:
+            self.store(url, headers, content)
+
+    def size(self):
+        with self.lock:
+            return self.total
+
+    def _evict(self):
+        if self.total <= self.max_size:
+            return
+
+        evicted = []
+        for url, size in self.db.execute(
+                "SELECT url, size FROM responses ORDER BY accessed"):
+            if self.total <= self.max_size:
+                break
+
+            evicted.append((url,))
+            self.total -= size
+
+        self.db.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+import six
+
+DEFAULT_INTERVAL = 60
+
+# os.rename can't replace an existing file on Windows
+_replace = getattr(os, "replace", os.rename)
+
+
+class Checkpoint(object):
+    '''
+    State of a crawl saved to disk every interval seconds, so an
+    interrupted crawl can be resumed without fetching or analyzing the
+    pages crawled before the last save again
+    '''
+
+    def __init__(self, path, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.saved = time.time()
+
+    def due(self):
+        return time.time() - self.saved >= self.interval
+
+    def load(self):
+        '''
+        Returns the saved state, or None if there is none
+        '''
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as f:
+            return json.loads(f.read().decode("utf-8"))
+
+    def save(self, state):
+        # write a new file and swap it in, so a crash while saving leaves
+        # the previous checkpoint intact
+        data = json.dumps(state, default=six.text_type)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+        _replace(tmp_path, self.path)
+        self.saved = time.time()
+
+    def clear(self):
+        '''
+        Remove the checkpoint once the crawl is complete
+        '''
+        if os.path.exists(self.path):
+            os.remove(self.path)
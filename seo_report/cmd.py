@@ -1,6 +1,19 @@
 import argparse
 import json
+import sys
 
+from seo_report import cache as response_cache
+from seo_report import checkpoint as crawl_checkpoint
+from seo_report import incremental
+from seo_report import links
+from seo_report import local
+from seo_report import output
+from seo_report import politeness
+from seo_report import sessions
+from seo_report import stats
+from seo_report import stop_words
+from seo_report import warc
+from seo_report import webpage
 from seo_report import website
 
 
@@ -14,6 +27,15 @@ def create_parser():
         help='Website domain to analyze'
     )
 
+    add_arguments(parser)
+
+    return parser
+
+
+def add_arguments(parser):
+    '''
+    Add the options of the crawl, shared with the batch audit
+    '''
     parser.add_argument(
         '-s', '--sitemap', type=str, required=False,
         help='Sitemap.xml file to use'
@@ -24,23 +46,355 @@ def create_parser():
         help='Single Page to analyze'
     )
 
+    parser.add_argument(
+        '-c', '--concurrency', type=int, required=False,
+        help='Number of pages to fetch in parallel, defaults to 1 with '
+             'threads and 100 with asyncio'
+    )
 
-    return parser
+    parser.add_argument(
+        '-e', '--engine', type=str, required=False, default='threads',
+        choices=['threads', 'asyncio'],
+        help='Crawl engine used to fetch the pages'
+    )
 
+    parser.add_argument(
+        '-t', '--timeout', type=float, required=False,
+        default=sessions.DEFAULT_TIMEOUT,
+        help='Seconds to wait for a response before giving up'
+    )
 
-def analyze(domain, sitemap, page):
-    spider = website.Spider(domain, sitemap, page)
-    report = spider.crawl()
+    parser.add_argument(
+        '-r', '--retries', type=int, required=False,
+        default=sessions.DEFAULT_RETRIES,
+        help='Number of times to retry a failed connection'
+    )
 
-    return (json.dumps(report, indent=4, separators=(',', ': ')))
+    parser.add_argument(
+        '-w', '--stop-words', type=str, required=False,
+        help='File of stop words to use instead of the English stop words'
+    )
+
+    parser.add_argument(
+        '--parser', type=str, required=False, default=webpage.DEFAULT_PARSER,
+        choices=webpage.PARSERS,
+        help='HTML parser used to analyze the pages'
+    )
+
+    parser.add_argument(
+        '-f', '--format', type=str, required=False, default='json',
+        choices=output.FORMATS,
+        help='Report format, jsonl writes each page as soon as it is analyzed'
+    )
+
+    parser.add_argument(
+        '-l', '--follow-links', action='store_true', required=False,
+        help='Discover pages by following the links on the website'
+    )
+
+    parser.add_argument(
+        '--max-depth', type=int, required=False,
+        help='Maximum number of links followed from the start pages'
+    )
+
+    parser.add_argument(
+        '--max-pages', type=int, required=False,
+        help='Maximum number of pages to crawl'
+    )
+
+    parser.add_argument(
+        '--cache', type=str, required=False,
+        help='File caching the pages between crawls, unchanged pages are '
+             'revalidated instead of downloaded again'
+    )
+
+    parser.add_argument(
+        '--cache-size', type=int, required=False,
+        default=response_cache.DEFAULT_MAX_SIZE // (1024 * 1024),
+        help='Maximum size of the cached pages in MB'
+    )
+
+    parser.add_argument(
+        '-i', '--incremental', type=str, required=False,
+        help='File storing the analysis of each page, pages unchanged since '
+             'the previous audit are not analyzed again'
+    )
+
+    parser.add_argument(
+        '--processes', type=int, required=False,
+        help='Number of worker processes parsing the pages, by default the '
+             'pages are parsed by the crawl'
+    )
+
+    parser.add_argument(
+        '--checkpoint', type=str, required=False,
+        help='File the crawl state is periodically saved to'
+    )
+
+    parser.add_argument(
+        '--checkpoint-interval', type=int, required=False,
+        default=crawl_checkpoint.DEFAULT_INTERVAL,
+        help='Seconds between saves of the crawl state'
+    )
+
+    parser.add_argument(
+        '--resume', action='store_true', required=False,
+        help='Continue the interrupted crawl saved in the checkpoint file'
+    )
+
+    parser.add_argument(
+        '--polite', action='store_true', required=False,
+        help='Skip the pages disallowed by robots.txt and honor its '
+             'Crawl-delay'
+    )
+
+    parser.add_argument(
+        '--rate', type=float, required=False,
+        help='Maximum number of requests per second to each host'
+    )
+
+    parser.add_argument(
+        '--max-connections', type=int, required=False,
+        help='Maximum number of connections open at once to each host'
+    )
+
+    parser.add_argument(
+        '--max-page-size', type=int, required=False,
+        help='Only download and analyze the first KB of each page'
+    )
+
+    parser.add_argument(
+        '--stats', action='store_true', required=False,
+        help='Print the time spent in each phase of the crawl when done'
+    )
+
+    parser.add_argument(
+        '--warc', type=str, nargs='+', required=False,
+        help='Analyze the pages archived in these WARC files, gzipped or '
+             'not, instead of crawling the website'
+    )
+
+    parser.add_argument(
+        '--directory', type=str, required=False,
+        help='Analyze the static website built to this directory, as it '
+             'will be served from the domain, instead of crawling it'
+    )
+
+    parser.add_argument(
+        '--codes', action='store_true', required=False,
+        help='Report the codes of the issues, with their messages listed '
+             'once at the end'
+    )
+
+
+# pages fetched at once unless set, the asyncio engine keeps many requests
+# in flight on a single thread
+DEFAULT_CONCURRENCY = {
+    'threads': 1,
+    'asyncio': 100
+}
+
+
+def get_spider(engine):
+    if engine == 'asyncio':
+        # the asyncio engine has optional dependencies, only import on use
+        from seo_report import async_website
+        return async_website.AsyncSpider
+
+    return website.Spider
+
+
+def pool_size(concurrency, engine='threads'):
+    '''
+    Connections to each host needed by a crawl, for its pages and links
+    '''
+    # the asyncio engine fetches pages and links with aiohttp, the session
+    # only fetches robots.txt
+    if engine == 'asyncio':
+        return sessions.DEFAULT_POOL_SIZE
+
+    return concurrency + max(concurrency, links.DEFAULT_CONCURRENCY)
+
+
+def get_concurrency(engine, concurrency=None):
+    if concurrency is None:
+        return DEFAULT_CONCURRENCY[engine]
+
+    return concurrency
+
+
+def analyze(domain, sitemap=None, page=None, concurrency=None,
+            engine='threads', timeout=sessions.DEFAULT_TIMEOUT,
+            retries=sessions.DEFAULT_RETRIES, stop_words=None,
+            parser=webpage.DEFAULT_PARSER, output_format='json',
+            stream=None, follow_links=False, max_depth=None,
+            max_pages=None, cache=None, store=None, processes=None,
+            checkpoint=None, resume=False, polite=False, rate=None,
+            max_connections=None, crawl_stats=None, max_page_size=None,
+            codes=False, session=None, archives=None, directory=None):
+    concurrency = get_concurrency(engine, concurrency)
+
+    # jsonl results are written out as the crawl progresses
+    writer = None
+    if output_format == 'jsonl':
+        writer = output.JsonLinesWriter(stream or sys.stdout)
+
+    if archives is not None:
+        spider = warc.WarcSpider(domain, archives, stop_words=stop_words,
+                                 parser=parser, writer=writer,
+                                 max_pages=max_pages, store=store,
+                                 processes=processes, stats=crawl_stats,
+                                 max_page_size=max_page_size, codes=codes)
+        return format_report(spider.crawl(), writer)
+
+    if directory is not None:
+        spider = local.DirectorySpider(
+            domain, directory, concurrency=concurrency, session=session,
+            stop_words=stop_words, parser=parser, writer=writer,
+            follow_links=follow_links, max_depth=max_depth,
+            max_pages=max_pages, store=store, processes=processes,
+            checkpoint=checkpoint, resume=resume, stats=crawl_stats,
+            max_page_size=max_page_size, codes=codes)
+        return format_report(spider.crawl(), writer)
+
+    if session is None:
+        session = sessions.create_session(
+            pool_size=pool_size(concurrency, engine), retries=retries,
+            timeout=timeout)
+
+    scheduler = None
+    if polite or rate is not None or max_connections is not None:
+        scheduler = politeness.Scheduler(
+            session, rate=rate, max_connections=max_connections,
+            obey_robots=polite)
+
+    # the asyncio engine makes its requests without the session
+    engine_options = {}
+    if engine == 'asyncio':
+        engine_options = {"timeout": timeout, "retries": retries}
+
+    spider = get_spider(engine)(domain, sitemap, page,
+                                concurrency=concurrency, session=session,
+                                stop_words=stop_words, parser=parser,
+                                writer=writer, follow_links=follow_links,
+                                max_depth=max_depth, max_pages=max_pages,
+                                cache=cache, store=store,
+                                processes=processes, checkpoint=checkpoint,
+                                resume=resume, politeness=scheduler,
+                                stats=crawl_stats,
+                                max_page_size=max_page_size, codes=codes,
+                                **engine_options)
+    return format_report(spider.crawl(), writer)
+
+
+def format_report(site_report, writer=None):
+    # the report was already written out line by line
+    if writer is not None:
+        return None
+
+    return (json.dumps(site_report, indent=4, separators=(',', ': ')))
+
+
+def analyze_options(args):
+    '''
+    Keyword arguments of analyze for the parsed command line, the cache
+    and store opened are closed by close_options
+    '''
+    words = None
+    if args.stop_words is not None:
+        words = stop_words.load_stop_words(args.stop_words)
+
+    cache = None
+    if args.cache is not None:
+        cache = response_cache.ResponseCache(
+            args.cache, max_size=args.cache_size * 1024 * 1024)
+
+    store = None
+    if args.incremental is not None:
+        store = incremental.AuditStore(args.incremental)
+
+    crawl_stats = None
+    if args.stats:
+        crawl_stats = stats.CrawlStats()
+
+    max_page_size = None
+    if args.max_page_size is not None:
+        max_page_size = args.max_page_size * 1024
+
+    return {
+        "concurrency": get_concurrency(args.engine, args.concurrency),
+        "engine": args.engine,
+        "timeout": args.timeout,
+        "retries": args.retries,
+        "stop_words": words,
+        "parser": args.parser,
+        "output_format": args.format,
+        "follow_links": args.follow_links,
+        "max_depth": args.max_depth,
+        "max_pages": args.max_pages,
+        "cache": cache,
+        "store": store,
+        "processes": args.processes,
+        "polite": args.polite,
+        "rate": args.rate,
+        "max_connections": args.max_connections,
+        "crawl_stats": crawl_stats,
+        "max_page_size": max_page_size,
+        "codes": args.codes,
+        "archives": args.warc,
+        "directory": args.directory
+    }
+
+
+def close_options(options):
+    if options["cache"] is not None:
+        options["cache"].close()
+    if options["store"] is not None:
+        options["store"].close()
+
+    # the counters of the cache and store cover every crawl they served
+    crawl_stats = options["crawl_stats"]
+    if crawl_stats is not None:
+        if options["cache"] is not None:
+            crawl_stats.incr("cache_hits", options["cache"].hits)
+            crawl_stats.incr("cache_misses", options["cache"].misses)
+        if options["store"] is not None:
+            crawl_stats.incr("pages_reused", options["store"].reused)
 
 
 def main():
     parser = create_parser()
     args = parser.parse_args()
-    report = analyze(args.domain, args.sitemap, args.page)
 
-    print(report)
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires a --checkpoint file")
+    if args.warc is not None and args.checkpoint is not None:
+        parser.error("--checkpoint is not supported with --warc")
+
+    # the pages written out before a crash are not part of the checkpoint,
+    # a resumed crawl would not write them again
+    if args.format == 'jsonl' and args.checkpoint is not None:
+        parser.error("--checkpoint is not supported with --format jsonl")
+
+    checkpoint = None
+    if args.checkpoint is not None:
+        checkpoint = crawl_checkpoint.Checkpoint(
+            args.checkpoint, interval=args.checkpoint_interval)
+
+    options = analyze_options(args)
+    try:
+        report = analyze(args.domain, args.sitemap, args.page,
+                         checkpoint=checkpoint, resume=args.resume,
+                         **options)
+    finally:
+        close_options(options)
+
+    if report is not None:
+        print(report)
+
+    # keep the summary out of the report on stdout
+    if options["crawl_stats"] is not None:
+        sys.stderr.write(options["crawl_stats"].format() + "\n")
 
 if __name__ == "__main__":
     main()
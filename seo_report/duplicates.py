@@ -0,0 +1,209 @@
+import hashlib
+import sqlite3
+import struct
+import threading
+
+import six
+
+DEFAULT_SHARDS = 16
+
+# distinct values kept in memory before they are moved to disk
+DEFAULT_MAX_KEYS = 1000000
+
+# previous pages listed in the warning of each duplicate page, all of them
+# are listed once in the site wide warning
+MAX_LISTED = 10
+
+
+def normalize(value):
+    '''
+    Values differing only by case or whitespace are duplicates
+    '''
+    return u" ".join(value.split()).lower()
+
+
+def value_hash(value):
+    '''
+    Signed 64 bit hash of the normalized value, stored instead of the value
+    '''
+    digest = hashlib.sha1(normalize(value).encode("utf-8")).digest()
+    return struct.unpack("<q", digest[:8])[0]
+
+
+def describe(value, previous, count=None):
+    '''
+    Value of the warning of a page using the value after count previous
+    pages, of which only the first are listed
+    '''
+    if count is None:
+        count = len(previous)
+
+    listed = u", ".join(previous[:MAX_LISTED])
+    if count > MAX_LISTED:
+        listed += u" and {0} more".format(count - MAX_LISTED)
+
+    return u'"{0}" previously used on pages: {1}'.format(value, listed)
+
+
+class DuplicateRegistry(object):
+    '''
+    Urls of the pages using each title or description of a website, keyed
+    by a hash of the normalized value. Only the values used by more than
+    one page are kept as text, to report them.
+
+    Pages can be added from several threads, each shard of the values has
+    its own lock. Once more than max_keys values are held in memory they
+    are moved to a temporary database on disk.
+    '''
+
+    def __init__(self, shards=DEFAULT_SHARDS, max_keys=DEFAULT_MAX_KEYS):
+        self.shards = [{} for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.labels = {}
+        self.max_keys = max_keys
+
+        # the database is only created on the first spill
+        self.db = None
+        self.db_lock = threading.Lock()
+
+    def __len__(self):
+        keys = sum(len(shard) for shard in self.shards)
+        if self.db is not None:
+            with self.db_lock:
+                keys += self.db.execute(
+                    "SELECT COUNT(DISTINCT hash) FROM pages").fetchone()[0]
+
+        return keys
+
+    def _shard(self, key):
+        return key % len(self.shards)
+
+    def _stored(self, key, limit=-1):
+        if self.db is None:
+            return [], 0
+
+        with self.db_lock:
+            rows = self.db.execute(
+                "SELECT url FROM pages WHERE hash = ? ORDER BY rowid "
+                "LIMIT ?", (key, limit)).fetchall()
+            count = len(rows)
+            if limit >= 0 and count == limit:
+                count = self.db.execute(
+                    "SELECT COUNT(*) FROM pages WHERE hash = ?",
+                    (key,)).fetchone()[0]
+
+        return [row[0] for row in rows], count
+
+    def add(self, value, url):
+        '''
+        Record the page as using the value, returns the first MAX_LISTED
+        urls of the pages which used it before and their number
+        '''
+        key = value_hash(value)
+        shard = self._shard(key)
+
+        with self.locks[shard]:
+            urls = self.shards[shard].get(key)
+            if urls is not None:
+                previous, count = urls[:MAX_LISTED], len(urls)
+                urls.append(url)
+            else:
+                previous, count = self._stored(key, MAX_LISTED)
+                if count:
+                    with self.db_lock, self.db:
+                        self.db.execute("INSERT INTO pages VALUES (?, ?)",
+                                        (key, url))
+                else:
+                    self.shards[shard][key] = [url]
+
+            if count:
+                self.labels.setdefault(key, value)
+
+        if self.max_keys is not None and \
+                len(self.shards[shard]) * len(self.shards) > self.max_keys:
+            self.spill()
+
+        return previous, count
+
+    def urls(self, value):
+        '''
+        Urls of the pages using the value, in the order they were added
+        '''
+        key = value_hash(value)
+        shard = self._shard(key)
+        with self.locks[shard]:
+            urls = self.shards[shard].get(key)
+            if urls is not None:
+                return list(urls)
+
+            return self._stored(key)[0]
+
+    def spill(self):
+        '''
+        Move the values held in memory to the database on disk
+        '''
+        with self.db_lock:
+            if self.db is None:
+                # an empty path is a temporary database, deleted on close
+                self.db = sqlite3.connect("", check_same_thread=False)
+                with self.db:
+                    self.db.execute(
+                        "CREATE TABLE pages (hash INTEGER, url TEXT)")
+                    self.db.execute(
+                        "CREATE INDEX pages_hash ON pages (hash)")
+
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                rows = [(key, url) for key, urls in six.iteritems(shard)
+                        for url in urls]
+                with self.db_lock, self.db:
+                    self.db.executemany(
+                        "INSERT INTO pages VALUES (?, ?)", rows)
+                shard.clear()
+
+    def duplicates(self):
+        '''
+        Yields each value used by more than one page, with the urls of all
+        the pages using it
+        '''
+        for key, value in sorted(six.iteritems(self.labels),
+                                 key=lambda x: x[1]):
+            yield value, self.urls(value)
+
+    def state(self):
+        '''
+        Serializable form of the registry, as [value hash, urls] pairs and
+        the duplicated values
+        '''
+        entries = []
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                entries.extend([key, list(urls)]
+                               for key, urls in six.iteritems(shard))
+
+        if self.db is not None:
+            with self.db_lock:
+                rows = self.db.execute(
+                    "SELECT hash, url FROM pages ORDER BY hash, rowid")
+                for key, url in rows:
+                    if entries and entries[-1][0] == key:
+                        entries[-1][1].append(url)
+                    else:
+                        entries.append([key, [url]])
+
+        return {
+            "entries": entries,
+            "labels": [[key, value]
+                       for key, value in six.iteritems(self.labels)]
+        }
+
+    def restore(self, state):
+        for key, urls in state["entries"]:
+            self.shards[self._shard(key)][key] = list(urls)
+        self.labels = dict((key, value) for key, value in state["labels"])
+
+    def close(self):
+        with self.db_lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
@@ -0,0 +1,117 @@
+import collections
+
+from six.moves.urllib import parse
+
+DEFAULT_PORTS = {
+    "http": ":80",
+    "https": ":443"
+}
+
+
+def normalize_url(url):
+    '''
+    Normalize a url so that the same page is only crawled once, the scheme
+    and host are lower cased, default ports and fragments are dropped
+    '''
+    parsed = parse.urlsplit(url.strip())
+
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port is not None and netloc.endswith(default_port):
+        netloc = netloc[:-len(default_port)]
+
+    return parse.urlunsplit(
+        (scheme, netloc, parsed.path or "/", parsed.query, ""))
+
+
+class Frontier(object):
+    '''
+    Queue of the pages left to crawl, each normalized url is queued once
+    '''
+
+    def __init__(self, max_depth=None, max_pages=None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+
+        self.queue = collections.deque()
+        self.sources = collections.deque()
+        self.seen = set()
+        self.popped = 0
+
+        # pages popped but not crawled yet
+        self.active = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def add(self, url, depth=0):
+        '''
+        Queue the url unless it was seen before or is too deep, returns
+        whether it was queued
+        '''
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        key = normalize_url(url)
+        if key in self.seen:
+            return False
+
+        self.seen.add(key)
+        self.queue.append((url, depth))
+        return True
+
+    def add_source(self, urls, depth=0):
+        '''
+        Queue the urls of an iterable, e.g. a sitemap, which is only
+        consumed once the queue runs out
+        '''
+        self.sources.append((iter(urls), depth))
+
+    def pop(self):
+        '''
+        Returns the next (url, depth) to crawl, or None when there is
+        nothing left to crawl
+        '''
+        if self.max_pages is not None and self.popped >= self.max_pages:
+            return None
+
+        while len(self.queue) == 0 and len(self.sources) > 0:
+            source, depth = self.sources[0]
+            try:
+                self.add(next(source), depth)
+            except StopIteration:
+                self.sources.popleft()
+
+        if len(self.queue) == 0:
+            return None
+
+        self.popped += 1
+        url, depth = self.queue.popleft()
+        self.active[url] = depth
+        return url, depth
+
+    def done(self, url):
+        '''
+        Mark a popped url as crawled
+        '''
+        self.active.pop(url, None)
+
+    def state(self):
+        '''
+        Serializable state of the frontier, the pages still being crawled
+        are queued again
+        '''
+        queue = list(self.active.items()) + list(self.queue)
+        return {
+            "queue": [[url, depth] for url, depth in queue],
+            "seen": sorted(self.seen),
+            "popped": self.popped - len(self.active)
+        }
+
+    def restore(self, state):
+        self.queue = collections.deque(
+            (url, depth) for url, depth in state["queue"])
+        self.seen = set(state["seen"])
+        self.popped = state["popped"]
+        self.active = collections.OrderedDict()
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+import six
+
+
+def content_digest(content, *options):
+    '''
+    Hash of the page content and of the options it was analyzed with
+    '''
+    digest = hashlib.sha1()
+    for option in options:
+        digest.update(six.text_type(option).encode("utf-8"))
+        digest.update(b"\0")
+
+    if isinstance(content, six.text_type):
+        content = content.encode("utf-8")
+    digest.update(content)
+
+    return digest.hexdigest()
+
+
+class AuditStore(object):
+    '''
+    Persistent store of the per page analysis of previous audits, keyed by
+    url together with the digest of the content it was computed from
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.reused = 0
+        self.analyzed = 0
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS audits ("
+                "url TEXT PRIMARY KEY, digest TEXT, snapshot TEXT)")
+
+    def get(self, url, digest):
+        '''
+        Returns the stored snapshot of the page, or None if the page
+        changed since it was stored
+        '''
+        with self.lock:
+            row = self.db.execute(
+                "SELECT snapshot FROM audits WHERE url = ? AND digest = ?",
+                (url, digest)).fetchone()
+
+            if row is None:
+                self.analyzed += 1
+                return None
+
+            self.reused += 1
+
+        return json.loads(row[0])
+
+    def put(self, url, digest, snapshot):
+        # values such as tags found on the page are stored as text
+        data = json.dumps(snapshot, default=six.text_type)
+
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO audits VALUES (?, ?, ?)",
+                (url, digest, data))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
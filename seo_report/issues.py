@@ -0,0 +1,99 @@
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+
+class Issue(object):
+    '''
+    Warning raised for a page or the site, stored as its code, the message
+    is only looked up when the report is rendered
+    '''
+    __slots__ = ("code", "value")
+
+    kind = "warning"
+    messages = WARNINGS
+
+    def __init__(self, code, value=None):
+        self.code = code
+        self.value = value
+
+    @property
+    def message(self):
+        return self.messages[self.code]
+
+    def __getitem__(self, key):
+        # read like the rendered dict
+        if key == self.kind:
+            return self.message
+        if key == "value":
+            return self.value
+
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        if isinstance(other, Issue):
+            return (self.kind, self.code, self.value) == \
+                (other.kind, other.code, other.value)
+        if isinstance(other, dict):
+            return self.render() == other
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{0}({1!r}, {2!r})".format(
+            type(self).__name__, self.code, self.value)
+
+    def __reduce__(self):
+        return type(self), (self.code, self.value)
+
+    def render(self, codes=False):
+        return {
+            self.kind: self.code if codes else self.message,
+            "value": self.value
+        }
+
+
+class Achievement(Issue):
+    '''
+    Achievement earned by a page or the site
+    '''
+    __slots__ = ()
+
+    kind = "achievement"
+    messages = BADGES
+
+
+def render(records, codes=False):
+    '''
+    Render the records as dicts, with either the messages or their codes
+    '''
+    return [record.render(codes) for record in records]
+
+
+def dump(records):
+    '''
+    Serializable form of the records, as [code, value] pairs
+    '''
+    return [[record.code, record.value] for record in records]
+
+
+def load(record_type, pairs):
+    return [record_type(code, value) for code, value in pairs]
+
+
+def messages():
+    '''
+    The messages of every code, reported once along with the codes
+    '''
+    return {
+        "warnings": WARNINGS,
+        "achievements": BADGES
+    }
@@ -0,0 +1,84 @@
+from concurrent import futures
+import threading
+
+import requests
+
+from seo_report import sessions
+from seo_report import stats
+
+DEFAULT_CONCURRENCY = 10
+
+
+class LinkChecker(object):
+    '''
+    Verify links in parallel, checking each unique url once per crawl
+    '''
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, session=None,
+                 politeness=None, stats=None):
+        # a session created here is closed along with the checker
+        self.own_session = session is None
+        if session is None:
+            session = sessions.create_session(pool_size=concurrency)
+
+        self.session = session
+        self.politeness = politeness
+        self.stats = stats
+        self.executor = futures.ThreadPoolExecutor(max_workers=concurrency)
+        self.checked = {}
+        self.lock = threading.Lock()
+
+    def check(self, url):
+        '''
+        Schedule the url to be verified, returning a future for its
+        HTTP status code. Urls already checked share the cached future.
+        '''
+        with self.lock:
+            future = self.checked.get(url)
+            if future is None:
+                future = self.executor.submit(self._status, url)
+                self.checked[url] = future
+
+        return future
+
+    def is_broken(self, url):
+        return self.check(url).result() == requests.codes.not_found
+
+    def _status(self, url):
+        if self.stats is not None:
+            self.stats.incr("link_checks")
+
+        with stats.timed(self.stats, "link_check"):
+            # links are rate limited along with the pages of their host
+            if self.politeness is not None:
+                with self.politeness.slot(url):
+                    return self.session.head(url).status_code
+
+            return self.session.head(url).status_code
+
+    def close(self):
+        self.executor.shutdown()
+        if self.own_session:
+            self.session.close()
+
+
+class OfflineLinkChecker(LinkChecker):
+    '''
+    Verify links without any request, the status code of each url is
+    looked up with status, e.g. in an archive of the website
+    '''
+
+    def __init__(self, status, stats=None):
+        self.status = status
+        self.stats = stats
+
+    def check(self, url):
+        if self.stats is not None:
+            self.stats.incr("link_checks")
+
+        future = futures.Future()
+        future.set_result(self.status(url))
+        return future
+
+    def close(self):
+        pass
@@ -0,0 +1,148 @@
+'''
+Analyze a static website from the directory it was built to, before it
+is deployed, reading the files instead of fetching the pages
+'''
+import io
+import os
+import posixpath
+
+import requests
+from six.moves.urllib import parse
+
+from seo_report import links
+from seo_report import webpage
+from seo_report import website
+
+INDEX = "index.html"
+EXTENSIONS = (".html", ".htm")
+
+
+def url_path(root, path):
+    '''
+    Path of the url serving the file, index.html is served as its directory
+    '''
+    relative = os.path.relpath(path, root).replace(os.sep, "/")
+    if relative == INDEX:
+        return "/"
+    if relative.endswith("/" + INDEX):
+        relative = relative[:-len(INDEX)]
+
+    return "/" + parse.quote(relative)
+
+
+def file_path(root, path):
+    '''
+    File served for the url path, as a static web server would, None if
+    there is no such file in the root directory
+    '''
+    # the path can't leave the root directory, like a url can't go above
+    # the root of the website
+    relative = posixpath.normpath("/" + parse.unquote(path)).strip("/")
+
+    candidate = root
+    if relative:
+        candidate = os.path.join(root, *relative.split("/"))
+
+    for candidate in (candidate, os.path.join(candidate, INDEX),
+                      candidate + ".html"):
+        if os.path.isfile(candidate):
+            return candidate
+
+    return None
+
+
+def walk(root):
+    '''
+    Yields the url path of each HTML file in the directory, sorted so the
+    pages are analyzed in the same order every time
+    '''
+    for directory, directories, files in os.walk(root):
+        directories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(EXTENSIONS):
+                yield url_path(root, os.path.join(directory, name))
+
+
+class LocalLinkChecker(links.LinkChecker):
+    '''
+    Verify the links to the website against the files of the directory,
+    links to other websites are checked with requests as usual
+    '''
+
+    def __init__(self, netloc, root, concurrency=links.DEFAULT_CONCURRENCY,
+                 session=None, stats=None):
+        super(LocalLinkChecker, self).__init__(
+            concurrency, session=session, stats=stats)
+
+        self.netloc = netloc
+        self.root = root
+        self.files = links.OfflineLinkChecker(self._file_status, stats=stats)
+
+    def _file_status(self, url):
+        if file_path(self.root, parse.urlparse(url).path) is None:
+            return requests.codes.not_found
+
+        return requests.codes.ok
+
+    def check(self, url):
+        if parse.urlparse(url).netloc.lower() == self.netloc:
+            return self.files.check(url)
+
+        return super(LocalLinkChecker, self).check(url)
+
+
+class DirectorySpider(website.Spider):
+    '''
+    Analyze the HTML files of a static website built to root, as served
+    from site. The files are read in parallel by concurrency workers.
+    '''
+
+    def __init__(self, site, root, concurrency=1, session=None,
+                 stop_words=None, parser=webpage.DEFAULT_PARSER,
+                 writer=None, follow_links=False, max_depth=None,
+                 max_pages=None, store=None, processes=None, checkpoint=None,
+                 resume=False, stats=None, max_page_size=None, codes=False):
+        self.root = root
+
+        super(DirectorySpider, self).__init__(
+            site, concurrency=concurrency, session=session,
+            stop_words=stop_words, parser=parser, writer=writer,
+            follow_links=follow_links, max_depth=max_depth,
+            max_pages=max_pages, store=store, processes=processes,
+            checkpoint=checkpoint, resume=resume, stats=stats,
+            max_page_size=max_page_size, codes=codes)
+
+    def _create_link_checker(self):
+        return LocalLinkChecker(
+            self.netloc, self.root,
+            max(self.concurrency, links.DEFAULT_CONCURRENCY),
+            session=self.session, stats=self.stats)
+
+    def _sources(self):
+        # every page is analyzed, unless only those linked are
+        if self.follow_links:
+            return []
+
+        return [(self.domain + path for path in walk(self.root))]
+
+    def _read(self, path):
+        page_file = file_path(self.root, path)
+        if page_file is None:
+            return website.Response(requests.codes.not_found, b"")
+
+        with io.open(page_file, "rb") as f:
+            if self.max_page_size is not None:
+                return website.Response(
+                    requests.codes.ok, f.read(self.max_page_size + 1))
+
+            return website.Response(requests.codes.ok, f.read())
+
+    def _get(self, page_url):
+        return self._read(parse.urlparse(page_url).path)
+
+    def _analyze_crawlers(self, resp=None):
+        super(DirectorySpider, self)._analyze_crawlers(
+            self._read("/robots.txt"))
+
+    def _analyze_blog(self, resp=None):
+        super(DirectorySpider, self)._analyze_blog(self._read("/blog"))
@@ -0,0 +1,37 @@
+import json
+
+FORMATS = [
+    "json",
+    "jsonl"
+]
+
+
+class JsonLinesWriter(object):
+    '''
+    Write each page report as a JSON line as soon as the page is analyzed,
+    followed by the site wide report once the crawl is complete
+
+        {"page": {"url": ..., "issues": [...], ...}}
+        {"site": {"issues": [...], "achieved": [...]}}
+
+    With the codes of the issues reported, their messages follow last
+
+        {"messages": {"warnings": {...}, "achievements": {...}}}
+    '''
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write_page(self, page_report):
+        self._write({"page": page_report})
+
+    def write_site(self, site_report):
+        self._write({"site": site_report})
+
+    def write_messages(self, messages):
+        self._write({"messages": messages})
+
+    def _write(self, record):
+        self.stream.write(json.dumps(record, separators=(',', ':')))
+        self.stream.write("\n")
+        self.stream.flush()
@@ -0,0 +1,194 @@
+import contextlib
+from concurrent import futures
+import threading
+import time
+
+import requests
+from six.moves.urllib import parse
+from six.moves.urllib import robotparser
+
+DEFAULT_USER_AGENT = "seoreport"
+
+
+class TokenBucket(object):
+    '''
+    Rate limit of rate requests per second, allowing bursts of up to burst
+    requests
+    '''
+
+    def __init__(self, rate, burst=1, clock=time.time):
+        self.rate = float(rate)
+        self.burst = burst
+        self.clock = clock
+
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        '''
+        Take a token, returns the seconds to wait before it can be used
+        '''
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # tokens go negative so concurrent callers queue up behind
+            # each other
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+
+            return -self.tokens / self.rate
+
+
+class Scheduler(object):
+    '''
+    Crawl each host politely: urls disallowed by its robots.txt are
+    skipped, requests are rate limited, honoring its Crawl-delay, and the
+    connections open at once are capped
+    '''
+
+    def __init__(self, session, rate=None, burst=1, max_connections=None,
+                 user_agent=DEFAULT_USER_AGENT, obey_robots=True):
+        self.session = session
+        self.rate = rate
+        self.burst = burst
+        self.max_connections = max_connections
+        self.user_agent = user_agent
+        self.obey_robots = obey_robots
+
+        # future of the rules and response of the robots.txt of each host
+        self.robots = {}
+        self.buckets = {}
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        parsed_url = parse.urlsplit(url)
+        return "{0}://{1}".format(parsed_url.scheme, parsed_url.netloc.lower())
+
+    def _robots(self, host):
+        # robots.txt is fetched once per host, outside of the lock so a
+        # slow host doesn't hold up the others
+        with self.lock:
+            future = self.robots.get(host)
+            fetch = future is None
+            if fetch:
+                future = self.robots[host] = futures.Future()
+
+        if fetch:
+            try:
+                future.set_result(self._fetch_rules(host))
+            except Exception as e:
+                future.set_exception(e)
+                raise
+
+        return future.result()
+
+    def _rules(self, host):
+        return self._robots(host)[0]
+
+    def robots_txt(self, site):
+        '''
+        Response of the robots.txt of the site, fetched once along with its
+        rules. None if it could not be fetched.
+        '''
+        return self._robots(self._host(site))[1]
+
+    def _fetch_rules(self, host):
+        rules = robotparser.RobotFileParser(host + "/robots.txt")
+        try:
+            resp = self.session.get(host + "/robots.txt")
+        except requests.exceptions.RequestException:
+            resp = None
+
+        if resp is None or resp.status_code >= 500:
+            # an unreachable robots.txt allows everything, as crawlers
+            # usually assume
+            rules.parse([])
+        elif resp.status_code in (requests.codes.unauthorized,
+                                  requests.codes.forbidden):
+            rules.disallow_all = True
+        elif resp.status_code >= 400:
+            rules.allow_all = True
+        else:
+            content = resp.content
+            if isinstance(content, bytes):
+                content = content.decode("utf-8", "replace")
+            rules.parse(content.splitlines())
+
+        return rules, resp
+
+    def allowed(self, url):
+        '''
+        Whether robots.txt allows crawling the url
+        '''
+        if not self.obey_robots:
+            return True
+
+        return self._rules(self._host(url)).can_fetch(self.user_agent, url)
+
+    def _bucket(self, host):
+        with self.lock:
+            if host in self.buckets:
+                return self.buckets[host]
+
+            # the Crawl-delay of hosts whose robots.txt was read lowers the
+            # rate further
+            rate = self.rate
+            rules = None
+            future = self.robots.get(host)
+            if self.obey_robots and future is not None and future.done() \
+                    and future.exception() is None:
+                rules = future.result()[0]
+            crawl_delay = None
+            if rules is not None and hasattr(rules, "crawl_delay"):
+                crawl_delay = rules.crawl_delay(self.user_agent)
+            if crawl_delay:
+                delay_rate = 1.0 / float(crawl_delay)
+                if rate is None or delay_rate < rate:
+                    rate = delay_rate
+
+            bucket = None
+            if rate is not None:
+                bucket = TokenBucket(rate, self.burst)
+            self.buckets[host] = bucket
+
+        return bucket
+
+    def reserve(self, url):
+        '''
+        Returns the seconds to wait before requesting the url
+        '''
+        bucket = self._bucket(self._host(url))
+        if bucket is None:
+            return 0
+
+        return bucket.reserve()
+
+    def _connections(self, host):
+        with self.lock:
+            semaphore = self.connections.get(host)
+            if semaphore is None:
+                semaphore = self.connections[host] = \
+                    threading.BoundedSemaphore(self.max_connections)
+
+        return semaphore
+
+    @contextlib.contextmanager
+    def slot(self, url):
+        '''
+        Wait until the url can be requested, holding one of the
+        connections to its host meanwhile
+        '''
+        if self.max_connections is None:
+            time.sleep(self.reserve(url))
+            yield
+            return
+
+        with self._connections(self._host(url)):
+            time.sleep(self.reserve(url))
+            yield
@@ -0,0 +1,48 @@
+import requests
+from requests import adapters
+from urllib3.util import retry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 30
+
+
+class TimeoutHTTPAdapter(adapters.HTTPAdapter):
+    '''
+    HTTP Adapter applying a default timeout to every request
+    '''
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, *args, **kwargs):
+        self.timeout = timeout
+        super(TimeoutHTTPAdapter, self).__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+
+        return super(TimeoutHTTPAdapter, self).send(request, **kwargs)
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                   timeout=DEFAULT_TIMEOUT, keep_alive=True):
+    '''
+    Create a session reusing connections to the same host across requests
+    '''
+    session = requests.Session()
+
+    # only retry failed connections and reads, a server error response is
+    # reported as is
+    max_retries = retry.Retry(
+        total=retries, connect=retries, read=retries, status=0,
+        backoff_factor=0.5, raise_on_status=False)
+
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout, pool_connections=pool_size, pool_maxsize=pool_size,
+        max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
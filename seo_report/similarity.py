@@ -0,0 +1,144 @@
+'''
+Detect pages with nearly the same content across a website, in roughly
+linear time, with MinHash signatures of the text of each page indexed by
+locality sensitive hashing
+'''
+import array
+import zlib
+
+SHINGLE_SIZE = 3
+
+# 8 bands of 8 rows find most pairs of pages sharing more than ~80% of
+# their shingles, the candidates are then verified against the threshold
+BANDS = 8
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+THRESHOLD = 0.8
+
+# one permutation hashing: a single hash of each shingle picks one of the
+# NUM_PERM bins of the signature, each keeping its minimum value
+MAX_HASH = (1 << 32) - 1
+BIN_BITS = 6
+VALUE_BITS = 32 - BIN_BITS
+VALUE_MASK = (1 << VALUE_BITS) - 1
+EMPTY = 1 << VALUE_BITS
+
+# scrambles the crc32 of the shingles, the same in every process so the
+# signatures can be computed by worker processes
+MULTIPLIER = 0x9E3779B1
+
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    '''
+    Yields the 32 bit hashes of the runs of size consecutive tokens
+    '''
+    for i in range(len(tokens) - size + 1):
+        yield (zlib.crc32(u" ".join(tokens[i:i + size]).encode("utf-8")) *
+               MULTIPLIER) & MAX_HASH
+
+
+def minhash(tokens, size=SHINGLE_SIZE):
+    '''
+    MinHash signature of the tokens, None when there are too few tokens to
+    compare the page with others. One hash per shingle instead of one per
+    permutation keeps it linear in the length of the page.
+    '''
+    if len(tokens) < size:
+        return None
+
+    # the shingles are streamed, repeated ones don't change the minimums
+    bins = [EMPTY] * NUM_PERM
+    for h in shingles(tokens, size):
+        value = h & VALUE_MASK
+        if value < bins[h >> VALUE_BITS]:
+            bins[h >> VALUE_BITS] = value
+
+    # empty bins borrow the value of the next bin, shifted by the distance
+    # so that they only match the same empty bins of similar pages
+    signature = array.array("I", bins)
+    for i in range(NUM_PERM):
+        distance = 0
+        while bins[(i + distance) % NUM_PERM] == EMPTY:
+            distance += 1
+        signature[i] = bins[(i + distance) % NUM_PERM] + distance * EMPTY
+
+    return signature
+
+
+def similarity(signature, other):
+    '''
+    Estimated Jaccard similarity of the shingles of two signatures
+    '''
+    same = sum(1 for x, y in zip(signature, other) if x == y)
+    return same / float(len(signature))
+
+
+class NearDuplicateIndex(object):
+    '''
+    Group the pages with similar signatures as they are added. Each band of
+    a signature is hashed to a bucket and a page is only compared with the
+    first page of each bucket it falls in, so adding a page takes constant
+    time however many pages were added before.
+    '''
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+
+        self.urls = []
+        self.signatures = []
+        self.buckets = [{} for _ in range(BANDS)]
+
+        # union find of the pages, by their position
+        self.parents = []
+
+    def __len__(self):
+        return len(self.urls)
+
+    def _find(self, page):
+        while self.parents[page] != page:
+            self.parents[page] = self.parents[self.parents[page]]
+            page = self.parents[page]
+
+        return page
+
+    def _union(self, page, other):
+        page, other = self._find(page), self._find(other)
+
+        # the earliest page stays the root, to list the clusters in the
+        # order they were crawled
+        if page != other:
+            self.parents[max(page, other)] = min(page, other)
+
+    def add(self, url, signature):
+        page = len(self.urls)
+        self.urls.append(url)
+        self.signatures.append(signature)
+        self.parents.append(page)
+
+        for band, buckets in enumerate(self.buckets):
+            key = hash(signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            first = buckets.setdefault(key, page)
+            if first == page or self._find(first) == self._find(page):
+                continue
+
+            if similarity(signature, self.signatures[first]) >= \
+                    self.threshold:
+                self._union(page, first)
+
+    def clusters(self):
+        '''
+        Urls of each group of near duplicate pages, in crawl order
+        '''
+        groups = {}
+        for page in range(len(self.urls)):
+            groups.setdefault(self._find(page), []).append(self.urls[page])
+
+        return [urls for _, urls in sorted(groups.items()) if len(urls) > 1]
+
+    def state(self):
+        return [[url, list(signature)]
+                for url, signature in zip(self.urls, self.signatures)]
+
+    def restore(self, state):
+        for url, signature in state:
+            self.add(url, array.array("I", signature))
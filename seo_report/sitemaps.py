@@ -0,0 +1,170 @@
+import zlib
+from xml.etree import ElementTree
+
+import requests
+from six.moves.urllib import parse
+
+CHUNK_SIZE = 64 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_DEPTH = 5
+
+
+def _local_name(tag):
+    # strip the xml namespace, e.g. {http://www.sitemaps.org/...}loc
+    return tag.rsplit("}", 1)[-1]
+
+
+class _SitemapTarget(object):
+    '''
+    XMLParser target collecting the locations without building a tree
+    '''
+
+    def __init__(self):
+        self.locations = []
+        self._loc = None
+        self._text = None
+
+    def start(self, tag, attrib):
+        if _local_name(tag) == "loc":
+            self._text = []
+
+    def data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        name = _local_name(tag)
+        if name == "loc" and self._text is not None:
+            self._loc = u"".join(self._text).strip()
+            self._text = None
+        elif name in ("url", "sitemap"):
+            if self._loc:
+                self.locations.append((name, self._loc))
+            self._loc = None
+
+    def close(self):
+        pass
+
+
+class SitemapParser(object):
+    '''
+    Incremental parser for sitemaps and sitemap indexes, fed with chunks
+    of the body as they are downloaded. Gzipped sitemaps are decompressed
+    on the fly.
+
+    feed() returns the (kind, location) pairs completed by the chunk,
+    where kind is "url" for a page or "sitemap" for a nested sitemap.
+    '''
+
+    def __init__(self):
+        self.target = _SitemapTarget()
+        self.parser = ElementTree.XMLParser(target=self.target)
+        self.decompressor = None
+        self.error = None
+        self._head = b""
+
+    def feed(self, chunk):
+        if self.error is not None:
+            return []
+
+        # sniff the first bytes for the gzip magic number
+        if self._head is not None:
+            self._head += chunk
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+
+            chunk, self._head = self._head, None
+            if chunk.startswith(GZIP_MAGIC):
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        try:
+            if self.decompressor is not None:
+                chunk = self.decompressor.decompress(chunk)
+            self.parser.feed(chunk)
+        except (ElementTree.ParseError, zlib.error) as e:
+            self.error = e
+
+        return self._drain()
+
+    def close(self):
+        if self.error is None:
+            try:
+                if self._head:
+                    self.parser.feed(self._head)
+                self.parser.close()
+            except ElementTree.ParseError as e:
+                self.error = e
+
+        return self._drain()
+
+    def _drain(self):
+        locations = self.target.locations
+        self.target.locations = []
+        return locations
+
+
+def parse_locations(chunks):
+    '''
+    Yield the page locations of a sitemap from an iterable of chunks
+    '''
+    parser = SitemapParser()
+    for chunk in chunks:
+        for kind, loc in parser.feed(chunk):
+            if kind == "url":
+                yield loc
+
+    for kind, loc in parser.close():
+        if kind == "url":
+            yield loc
+
+
+class Sitemap(object):
+    '''
+    Stream the page locations of a sitemap, following nested sitemap
+    indexes. Sitemaps that could not be parsed are listed in invalid.
+    '''
+
+    def __init__(self, session, url, max_depth=MAX_DEPTH):
+        self.session = session
+        self.url = url
+        self.max_depth = max_depth
+        self.invalid = []
+
+    def __iter__(self):
+        seen = set([self.url])
+        pending = [(self.url, 0)]
+
+        while pending:
+            sitemap_url, depth = pending.pop(0)
+
+            # nested sitemaps are fetched once the current one is closed
+            nested = []
+            for kind, loc in self._stream(sitemap_url):
+                if kind == "url":
+                    yield loc
+                else:
+                    loc = parse.urljoin(sitemap_url, loc)
+                    if loc not in seen and depth < self.max_depth:
+                        seen.add(loc)
+                        nested.append((loc, depth + 1))
+
+            pending.extend(nested)
+
+    def _stream(self, sitemap_url):
+        resp = self.session.get(sitemap_url, stream=True)
+        try:
+            if resp.status_code != requests.codes.ok:
+                return
+
+            parser = SitemapParser()
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                for location in parser.feed(chunk):
+                    yield location
+
+            for location in parser.close():
+                yield location
+
+            if parser.error is not None:
+                self.invalid.append(sitemap_url)
+        finally:
+            resp.close()
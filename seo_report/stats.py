@@ -0,0 +1,126 @@
+import collections
+import contextlib
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def peak_rss_mb():
+    '''
+    Peak resident memory of the process in MB, None where unknown
+    '''
+    if resource is None:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return maxrss / (1024.0 * 1024.0)
+    return maxrss / 1024.0
+
+
+@contextlib.contextmanager
+def timed(stats, phase):
+    '''
+    Time the phase, when the crawl collects stats
+    '''
+    if stats is None:
+        yield
+        return
+
+    with stats.timer(phase):
+        yield
+
+
+class CrawlStats(object):
+    '''
+    Timings of each phase of a crawl along with counters such as the
+    requests made and bytes downloaded
+    '''
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.started = clock()
+        self.finished = None
+
+        self.timings = collections.defaultdict(float)
+        self.calls = collections.defaultdict(int)
+        self.counters = collections.defaultdict(int)
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def timer(self, phase):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.add_time(phase, self.clock() - started)
+
+    def add_time(self, phase, seconds):
+        with self.lock:
+            self.timings[phase] += seconds
+            self.calls[phase] += 1
+
+    def incr(self, counter, value=1):
+        with self.lock:
+            self.counters[counter] += value
+
+    def finish(self):
+        self.finished = self.clock()
+
+    def elapsed(self):
+        finished = self.finished
+        if finished is None:
+            finished = self.clock()
+
+        return finished - self.started
+
+    def summary(self):
+        elapsed = self.elapsed()
+        with self.lock:
+            pages = self.counters.get("pages", 0)
+            return {
+                "elapsed": elapsed,
+                "pages_per_second": pages / elapsed if elapsed else 0.0,
+                "phases": dict(
+                    (phase, {"seconds": seconds, "calls": self.calls[phase]})
+                    for phase, seconds in self.timings.items()),
+                "counters": dict(self.counters),
+                "peak_rss_mb": peak_rss_mb()
+            }
+
+    def format(self):
+        '''
+        Summary table of the crawl, slowest phases first
+        '''
+        summary = self.summary()
+        lines = [
+            "{0:<32} {1:>10} {2:>10} {3:>10}".format(
+                "phase", "seconds", "calls", "ms/call")
+        ]
+        for phase, timing in sorted(summary["phases"].items(),
+                                    key=lambda x: x[1]["seconds"],
+                                    reverse=True):
+            lines.append("{0:<32} {1:>10.3f} {2:>10} {3:>10.2f}".format(
+                phase, timing["seconds"], timing["calls"],
+                1000 * timing["seconds"] / max(1, timing["calls"])))
+
+        lines.append("")
+        for counter, value in sorted(summary["counters"].items()):
+            lines.append("{0:<32} {1:>10}".format(counter, value))
+
+        lines.append("{0:<32} {1:>10.3f}".format(
+            "elapsed", summary["elapsed"]))
+        lines.append("{0:<32} {1:>10.2f}".format(
+            "pages/s", summary["pages_per_second"]))
+        if summary["peak_rss_mb"] is not None:
+            lines.append("{0:<32} {1:>10.1f}".format(
+                "peak RSS (MB)", summary["peak_rss_mb"]))
+
+        return "\n".join(lines)
@@ -1,3 +1,5 @@
+import io
+
 # Most Search Engines do not consider extremely common words
 # in order to save disk space or to speed up search results.
 # These filtered words are known as 'Stop Words'.
@@ -639,3 +641,43 @@ ENGLISH_STOP_WORDS = [
     "you've",
     "zero"
 ]
+
+# hashed index of the stop words for constant time lookups
+ENGLISH_STOP_WORDS_INDEX = frozenset(ENGLISH_STOP_WORDS)
+
+# stop word indexes by language, other languages can be added with
+# register_stop_words or load_stop_words
+STOP_WORDS = {
+    "english": ENGLISH_STOP_WORDS_INDEX
+}
+
+
+def register_stop_words(language, words):
+    '''
+    Register the stop words to use for a language
+    '''
+    index = frozenset(
+        word.strip().lower() for word in words if len(word.strip()) > 0)
+    STOP_WORDS[language.lower()] = index
+
+    return index
+
+
+def load_stop_words(filename, language=None):
+    '''
+    Load stop words from a UTF-8 file with one word per line, lines
+    starting with a # are ignored
+    '''
+    with io.open(filename, encoding="utf-8") as stop_words_file:
+        words = [line for line in stop_words_file
+                 if not line.startswith("#")]
+
+    return register_stop_words(language or filename, words)
+
+
+def get_stop_words(language="english"):
+    try:
+        return STOP_WORDS[language.lower()]
+    except KeyError:
+        raise ValueError(
+            "No stop words registered for {0}".format(language))
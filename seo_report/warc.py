@@ -0,0 +1,245 @@
+'''
+Analyze a website from the responses archived in WARC files, gzipped or
+not, without making any request
+'''
+import collections
+import gzip
+import io
+import zlib
+
+import requests
+from six.moves.urllib import parse
+
+from seo_report import frontier
+from seo_report import links
+from seo_report import webpage
+from seo_report import website
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+Capture = collections.namedtuple(
+    "Capture", ["url", "status_code", "headers", "content"])
+
+
+def open_archive(path):
+    '''
+    Open the WARC file, gzipped archives are decompressed as they are read
+    '''
+    with io.open(path, "rb") as f:
+        magic = f.read(2)
+
+    if magic == GZIP_MAGIC:
+        return gzip.open(path, "rb")
+
+    return io.open(path, "rb")
+
+
+def read_records(stream):
+    '''
+    Yields the headers, lower cased, and the content block of each record
+    '''
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+
+        # records are separated by blank lines
+        if not line.strip():
+            continue
+        if not line.startswith(b"WARC/"):
+            raise ValueError("Invalid WARC record: {0!r}".format(line))
+
+        headers = {}
+        for line in iter(stream.readline, b""):
+            line = line.strip()
+            if not line:
+                break
+
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower().decode("utf-8")] = \
+                value.strip().decode("utf-8")
+
+        length = int(headers.get("content-length", 0))
+        yield headers, stream.read(length)
+
+
+def dechunk(body):
+    chunks = []
+    while body:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size.split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            break
+
+        chunks.append(body[:size])
+        body = body[size + 2:]
+
+    return b"".join(chunks)
+
+
+def decode(body, encoding):
+    '''
+    Decompress a gzip or deflate encoded body, as a client would
+    '''
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            return zlib.decompress(body)
+    except zlib.error:
+        pass
+
+    return body
+
+
+def parse_response(block):
+    '''
+    Returns the status code, lower cased headers and body of an archived
+    HTTP response
+    '''
+    head, separator, body = block.partition(b"\r\n\r\n")
+    if not separator:
+        head, _, body = block.partition(b"\n\n")
+
+    lines = head.splitlines()
+    try:
+        status_code = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise ValueError("Invalid HTTP response: {0!r}".format(head[:80]))
+
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower().decode("latin-1")] = \
+            value.strip().decode("latin-1")
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = dechunk(body)
+    body = decode(body, headers.get("content-encoding", "").lower())
+
+    return status_code, headers, body
+
+
+def captures(paths):
+    '''
+    Yields the HTTP responses archived in the WARC files, in the order they
+    were captured. Other responses, such as dns lookups, and responses cut
+    short are skipped.
+    '''
+    for path in paths:
+        with open_archive(path) as stream:
+            for headers, block in read_records(stream):
+                if headers.get("warc-type") != "response":
+                    continue
+                if not headers.get("content-type", "").lower().startswith(
+                        "application/http"):
+                    continue
+
+                # WARC/1.1 writers may enclose the uri in angle brackets
+                url = headers.get("warc-target-uri", "").strip("<>")
+                if not url:
+                    continue
+
+                try:
+                    status_code, http_headers, content = \
+                        parse_response(block)
+                except ValueError:
+                    continue
+
+                yield Capture(url, status_code, http_headers, content)
+
+
+def statuses(paths):
+    '''
+    Status code of each url archived, by normalized url
+    '''
+    return dict((frontier.normalize_url(capture.url), capture.status_code)
+                for capture in captures(paths))
+
+
+def is_html(capture):
+    content_type = capture.headers.get("content-type")
+    return content_type is None or "html" in content_type.lower()
+
+
+class WarcSpider(website.Spider):
+    '''
+    Analyze the pages of the website archived in WARC files instead of
+    fetching them. Links are checked against the archived responses, the
+    links that were not archived are assumed to work.
+    '''
+
+    def __init__(self, site, archives, stop_words=None,
+                 parser=webpage.DEFAULT_PARSER, writer=None, max_pages=None,
+                 store=None, processes=None, stats=None, max_page_size=None,
+                 codes=False):
+        # status code of each archived url, read when the crawl starts
+        self.archives = archives
+        self.archived = {}
+
+        super(WarcSpider, self).__init__(
+            site, stop_words=stop_words, parser=parser, writer=writer,
+            max_pages=max_pages, store=store, processes=processes,
+            stats=stats, max_page_size=max_page_size, codes=codes)
+
+        # responses of the site wide checks, as found in the archives
+        self.site_responses = {}
+
+    def _create_link_checker(self):
+        return links.OfflineLinkChecker(self._link_status, stats=self.stats)
+
+    def _link_status(self, url):
+        return self.archived.get(frontier.normalize_url(url),
+                                 requests.codes.ok)
+
+    def _fetch_pages(self, pages):
+        for capture in captures(self.archives):
+            parsed_url = parse.urlparse(capture.url)
+            if parsed_url.netloc.lower() != self.netloc:
+                continue
+
+            resp = website.Response(capture.status_code, capture.content)
+            if parsed_url.path == "/robots.txt":
+                self.site_responses.setdefault(parsed_url.path, resp)
+                continue
+            if parsed_url.path == "/blog":
+                self.site_responses.setdefault(parsed_url.path, resp)
+
+            # only html pages are analyzed, redirects are archived along
+            # with the page they lead to
+            if capture.status_code == requests.codes.ok:
+                if not is_html(capture):
+                    continue
+            elif capture.status_code < 400:
+                continue
+
+            # only the first capture of a page is analyzed
+            if not pages.add(capture.url):
+                continue
+
+            entry = pages.pop()
+            if entry is None:
+                return
+
+            self._count("bytes", len(capture.content))
+            yield entry[0], entry[1], resp
+
+    def crawl(self):
+        # links are checked against every response of the archives, read
+        # before the pages are analyzed
+        self.archived = statuses(self.archives)
+
+        try:
+            self.frontier = frontier.Frontier(max_pages=self.max_pages)
+            self._crawl_frontier()
+
+            missing = website.Response(requests.codes.not_found, b"")
+            self._analyze_crawlers(
+                self.site_responses.get("/robots.txt", missing))
+            self._analyze_mobile()
+            self._analyze_analytics()
+            self._analyze_blog(self.site_responses.get("/blog", missing))
+
+            return self._aggregate()
+        finally:
+            self._close()
@@ -84,6 +84,18 @@ WARNINGS = {
     u"Avoid referencing broken links on your site.",
     "SERVER_ERROR":
     u"Avoid referencing pages that error out on your site.",
+    "SITEMAP_INVALID":
+    u"Sitemap could not be parsed. "
+    u"Search engines may ignore a sitemap that is not valid XML.",
+    "PAGE_TOO_LARGE":
+    u"Page is too large and was only partially analyzed. "
+    u"Large pages are slow to load and may be truncated by search engines.",
+    "CONTENT_NEAR_DUPLICATE":
+    u"Avoid publishing pages with nearly the same content across your "
+    u"website. Search engines only show one of them in their results.",
+    "ROBOTS_DISALLOWED":
+    u"Page is blocked by robots.txt and was not crawled. "
+    u"Avoid linking to or listing pages search engines may not crawl.",
     "BLOG_MISSING":
     u"Blog was not found on this domain. "
     u"Blogging about your expertise helps build trust and relationships. "
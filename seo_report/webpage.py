@@ -1,14 +1,30 @@
 import bs4
 
+import array
 import re
-import requests
 from six.moves.urllib import parse
 
-from seo_report.stop_words import ENGLISH_STOP_WORDS
-from seo_report.warnings import BADGES
-from seo_report.warnings import WARNINGS
+from seo_report import duplicates
+from seo_report import issues
+from seo_report import links
+from seo_report import similarity
+from seo_report import stats
+from seo_report.stop_words import ENGLISH_STOP_WORDS_INDEX
 
 TOKEN_REGEX = re.compile(r'(?u)\b\w\w+\b')
+
+# bumped whenever the snapshot format changes, so stored analyses made
+# with another format are not restored
+SNAPSHOT_VERSION = 3
+
+# BeautifulSoup tree builders that can be used to parse the pages,
+# lxml and html5lib must be installed separately
+DEFAULT_PARSER = "html.parser"
+PARSERS = [
+    "html.parser",
+    "lxml",
+    "html5lib"
+]
 SOCIAL_WEBSITES = [
     "www.facebook.com",
     "twitter.com",
@@ -18,6 +34,46 @@ SOCIAL_WEBSITES = [
 ]
 
 
+class PageText(object):
+    '''
+    Visible text of a page, extracted, tokenized and grouped only once and
+    shared by every analysis step
+    '''
+
+    def __init__(self, doc, visible, tokenize, grouped):
+        self.doc = doc
+        self._visible = visible
+        self._tokenize = tokenize
+        self._grouped = grouped
+
+        self._text = None
+        self._tokens = None
+        self._keywords = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            text_elements = filter(self._visible, self.doc.findAll(text=True))
+            self._text = u' '.join(
+                element.lower() for element in text_elements)
+
+        return self._text
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = self._tokenize(self.text)
+
+        return self._tokens
+
+    @property
+    def keywords(self):
+        if self._keywords is None:
+            self._keywords = self._grouped(self.tokens)
+
+        return self._keywords
+
+
 class Webpage(object):
     url = None
     title = None
@@ -26,43 +82,143 @@ class Webpage(object):
     website_titles = {}
     website_descriptions = {}
 
-    def __init__(self, page_url, html, website_titles, website_descriptions):
+    def __init__(self, page_url, html, website_titles, website_descriptions,
+                 link_checker=None, stop_words=None, parser=DEFAULT_PARSER,
+                 stats=None, codes=False):
         self.url = page_url
         self.netloc = parse.urlparse(page_url).netloc
         self.html = html
+        self.parser = parser
         self.title = None
         self.description = None
         self.keywords = {}
+        self.page_text = None
         self.issues = []
         self.achieved = []
+        self.links = []
+
+        # signature of the text, to find the pages with nearly the same
+        # content across the website
+        self.fingerprint = None
+
+        # share a link checker across pages to verify each link only once,
+        # without one the links are only verified once the page is complete
+        self.link_checker = link_checker
+
+        if stop_words is None:
+            stop_words = ENGLISH_STOP_WORDS_INDEX
+        self.stop_words = stop_words
 
         self.website_titles = website_titles
         self.website_descriptions = website_descriptions
 
+        # time each step of the analysis
+        self.stats = stats
+
+        # render the codes of the issues instead of their messages
+        self.codes = codes
+
     def report(self):
         '''
         Analyze the Page
         '''
-        soup = bs4.BeautifulSoup(self.html, "html.parser")
-
-        # per page analysis
-        self._analyze_title(soup)
-        self._analyze_description(soup)
-        self._analyze_url_structure(soup)
-        self._analyze_content(soup)
-        self._analyze_anchors(soup)
-        self._analyze_images(soup)
-        self._analyze_headings(soup)
-        self._analyze_keywords(soup)
-        self._analyze_wordcount(soup)
-        self._analyze_backlinks(soup)
-        self._analyze_social(soup)
-        self._analyze_pagespeed(soup)
-        self._analyze_sentiment(soup)
+        self.analyze()
+
+        return self.complete()
+
+    def analyze(self):
+        '''
+        Per page analysis, independent of the other pages of the website
+        '''
+        with stats.timed(self.stats, "parse"):
+            soup = bs4.BeautifulSoup(self.html, self.parser)
+        self.page_text = PageText(
+            soup, self.visible_tags, self.tokenize, self.grouped)
+
+        for analyze_step in (self._analyze_title,
+                             self._analyze_description,
+                             self._analyze_url_structure,
+                             self._analyze_content,
+                             self._analyze_anchors,
+                             self._analyze_images,
+                             self._analyze_headings,
+                             self._analyze_keywords,
+                             self._analyze_wordcount,
+                             self._analyze_fingerprint,
+                             self._analyze_backlinks,
+                             self._analyze_social,
+                             self._analyze_pagespeed,
+                             self._analyze_sentiment):
+            with stats.timed(self.stats, analyze_step.__name__):
+                analyze_step(soup)
+
+        self.release(soup)
+
+    def release(self, soup=None):
+        '''
+        Free the raw page and its parse tree once analyzed, the results are
+        kept as plain values
+        '''
+        self.html = None
+        self.page_text = None
+
+        # the tree is full of reference cycles, unlinking it frees it now
+        # rather than whenever the garbage collector runs
+        if soup is not None:
+            soup.decompose()
+
+    def complete(self):
+        '''
+        Run the checks depending on other pages and render the results
+        '''
+        # waits for the links still being verified
+        with stats.timed(self.stats, "_analyze_links"):
+            self._analyze_links()
+        with stats.timed(self.stats, "_analyze_duplicates"):
+            self._analyze_duplicates()
 
         # return the rendered results
         return self._render()
 
+    def snapshot(self):
+        '''
+        State of the per page analysis, which can be restored later on to
+        skip analyzing the page again
+        '''
+        return {
+            "url": self.url,
+            "title": self.title,
+            "description": self.description,
+            "keywords": [list(kw) for kw in self.keywords],
+            "headers": list(self.headers),
+            "issues": issues.dump(self.issues),
+            "achieved": issues.dump(self.achieved),
+            "links": list(self.links),
+            "fingerprint": None if self.fingerprint is None
+            else list(self.fingerprint)
+        }
+
+    def restore(self, snapshot):
+        '''
+        Restore the per page analysis from a snapshot
+        '''
+        self.title = snapshot["title"]
+        self.description = snapshot["description"]
+        self.keywords = [tuple(kw) for kw in snapshot["keywords"]]
+        self.headers = list(snapshot["headers"])
+        self.issues = issues.load(issues.Issue, snapshot["issues"])
+        self.achieved = issues.load(
+            issues.Achievement, snapshot["achieved"])
+        self.links = list(snapshot["links"])
+        self.fingerprint = None
+        if snapshot["fingerprint"] is not None:
+            self.fingerprint = array.array("I", snapshot["fingerprint"])
+
+        # schedule the links to be verified again
+        if self.link_checker is not None:
+            for referenced_href in self.links:
+                self.link_checker.check(referenced_href)
+
     def _analyze_title(self, doc):
         """
         Validate the title
@@ -74,28 +230,28 @@ class Webpage(object):
         # Avoid using extremely lengthy titles that are unhelpful to users
         length = len(t)
         if length == 0:
-            self.warn(WARNINGS["TITLE_MISSING"], self.title)
+            self.warn("TITLE_MISSING", self.title)
             return
         elif length < 10:
-            self.warn(WARNINGS["TITLE_TOO_SHORT"], self.title)
+            self.warn("TITLE_TOO_SHORT", self.title)
         elif length > 70:
-            self.warn(WARNINGS["TITLE_TOO_LONG"], self.title)
+            self.warn("TITLE_TOO_LONG", self.title)
         else:
-            self.earned(BADGES["TITLE_LENGTH"], self.title)
+            self.earned("TITLE_LENGTH", self.title)
 
         # Avoid using default or vague titles like "Untitled" or "New Page 1"
         if any(vague_words in t.lower()
                for vague_words in ['untitled', 'page']):
-            self.warn(WARNINGS["TITLE_TOO_GENERIC"], self.title)
+            self.warn("TITLE_TOO_GENERIC", self.title)
         else:
-            self.earned(BADGES["TITLE_INFORMATIVE"], self.title)
+            self.earned("TITLE_INFORMATIVE", self.title)
 
         # Avoid stuffing unneeded keywords in your title tags
         title_words = self.grouped(self.tokenize(t))
         for word, count in title_words:
             if count > 3:
                 self.warn(
-                    WARNINGS["TITLE_KEYWORD_STUFFED"],
+                    "TITLE_KEYWORD_STUFFED",
                     self.title)
 
         # Avoid choosing a title that has no relation to the content on the
@@ -104,14 +260,7 @@ class Webpage(object):
 
         # Avoid using a single title tag across all of your site's pages or a
         # large group of pages
-        if t in self.website_titles:
-            self.warn(
-                WARNINGS["TITLE_DUPLICATED"],
-                u'"{0}" previously used on pages: {1}'.format(
-                    t, self.website_titles[t]))
-        else:
-            self.earned(BADGES["TITLE_UNIQUE"], self.title)
-            self.website_titles[t] = self.url
+        # see _analyze_duplicates
 
     def _analyze_description(self, doc):
         """
@@ -126,30 +275,30 @@ class Webpage(object):
         # calculate the length of the description once
         length = len(d)
         if length == 0:
-            self.warn(WARNINGS["DESCRIPTION_MISSING"])
+            self.warn("DESCRIPTION_MISSING")
             return
         elif length < 140:
-            self.warn(WARNINGS["DESCRIPTION_TOO_SHORT"], self.description)
+            self.warn("DESCRIPTION_TOO_SHORT", self.description)
         elif length > 255:
-            self.warn(WARNINGS["DESCRIPTION_TOO_LONG"], self.description)
+            self.warn("DESCRIPTION_TOO_LONG", self.description)
         else:
-            self.earned(BADGES["DESCRIPTION_LENGTH"], self.description)
+            self.earned("DESCRIPTION_LENGTH", self.description)
 
         # Avoid using generic descriptions like "This is a web page" or "Page
         # about baseball cards"
         if any(vague_words in d.lower()
                for vague_words in ['web page', 'page about']
                ):
-            self.warn(WARNINGS["DESCRIPTION_TOO_GENERIC"], self.description)
+            self.warn("DESCRIPTION_TOO_GENERIC", self.description)
         else:
-            self.earned(BADGES["DESCRIPTION_INFORMATIVE"], self.description)
+            self.earned("DESCRIPTION_INFORMATIVE", self.description)
 
         # Avoid filling the description with only keywords
         desc_words = self.grouped(self.tokenize(d))
         for word, count in desc_words:
             if count > 3:
                 self.warn(
-                    WARNINGS["DESCRIPTION_KEYWORD_STUFFED"], self.description)
+                    "DESCRIPTION_KEYWORD_STUFFED", self.description)
 
         # Avoid copying and pasting the entire content
         # of the document into the description meta tag
@@ -157,12 +306,47 @@ class Webpage(object):
 
         # Avoid using a single description meta tag across all of your site's
         # pages or a large group of pages
-        if d in self.website_descriptions:
-            self.warn(WARNINGS["DESCRIPTION_DUPLICATED"],
-                      u'"{0}" previously used on pages: {1}'.format(
-                d, self.website_descriptions[d]))
-        else:
-            self.website_descriptions[d] = self.url
+        # see _analyze_duplicates
+
+    def _analyze_duplicates(self):
+        """
+        Cross page checks against the titles and descriptions of the pages
+        analyzed before this one
+        """
+        # Avoid using a single title tag across all of your site's pages or a
+        # large group of pages
+        t = self.title
+        if len(t) > 0:
+            previous, count = self._register(self.website_titles, t)
+            if count:
+                self.warn("TITLE_DUPLICATED",
+                          duplicates.describe(t, previous, count))
+            else:
+                self.earned("TITLE_UNIQUE", self.title)
+
+        # Avoid using a single description meta tag across all of your site's
+        # pages or a large group of pages
+        d = self.description
+        if len(d) > 0:
+            previous, count = self._register(self.website_descriptions, d)
+            if count:
+                self.warn("DESCRIPTION_DUPLICATED",
+                          duplicates.describe(d, previous, count))
+
+    def _register(self, registry, value):
+        '''
+        Record the page as using the value, returns the first pages which
+        used it before and their number
+        '''
+        # a plain dict only keeps the first page using each value
+        if isinstance(registry, dict):
+            if value in registry:
+                return [registry[value]], 1
+
+            registry[value] = self.url
+            return [], 0
+
+        return registry.add(value, self.url)
 
     def _analyze_url_structure(self, doc):
         """
@@ -174,23 +358,23 @@ class Webpage(object):
 
         # Avoid using lengthy URLs with unnecessary parameters and session IDs
         if len(self.url) > 100:
-            self.warn(WARNINGS["URL_TOO_LONG"], self.url)
+            self.warn("URL_TOO_LONG", self.url)
 
         # Avoid choosing generic page names like "page1.html"
         if any(vague_words in self.url.lower() for vague_words in ['page']):
-            self.warn(WARNINGS["URL_TOO_GENERIC"], self.url)
+            self.warn("URL_TOO_GENERIC", self.url)
 
         # Avoid using excessive keywords
         # like "baseball-cards-baseball-cards-baseballcards.htm"
         url_words = self.grouped(self.tokenize(path[-1]))
         for word, count in url_words:
             if count >= 2:
-                self.warn(WARNINGS["URL_KEYWORD_STUFFED"], self.url)
+                self.warn("URL_KEYWORD_STUFFED", self.url)
 
         # Avoid having deep nesting of subdirectories like ".../dir1/dir2/dir3
         # /dir4/dir5/dir6/page.html"
         if len(path) > 3:
-            self.warn(WARNINGS["URL_TOO_DEEP"], self.url)
+            self.warn("URL_TOO_DEEP", self.url)
 
         # Avoid using directory names that have no relation to the content in
         # them
@@ -205,17 +389,17 @@ class Webpage(object):
 
             if canonical_url != self.url:
                 # ignore this page, but ensure the canonical url is in our list
-                self.warn(WARNINGS["URL_NOT_CANONICAL"], canonical_url)
+                self.warn("URL_NOT_CANONICAL", canonical_url)
             else:
-                self.earned(BADGES["URL_CANONICAL"], self.url)
+                self.earned("URL_CANONICAL", self.url)
 
         # Avoid using odd capitalization of URLs
         if any(x.isupper() for x in self.url):
-            self.warn(WARNINGS["URL_CAPITALIZED"], self.url)
+            self.warn("URL_CAPITALIZED", self.url)
         else:
             # Achievement: many users expect lower-case URLs and remember them
             # better
-            self.earned(BADGES["URL_CORRECTLY_CASED"], self.url)
+            self.earned("URL_CORRECTLY_CASED", self.url)
 
         # Avoid creating complex webs of navigation links, e.g. linking every
         # page on your site to every other page
@@ -251,7 +435,7 @@ class Webpage(object):
         Analyze Anchor Tags
         """
         anchors = doc.find_all('a', href=True)
-        verified_pages = []
+        verified_pages = set()
 
         for tag in anchors:
             tag_href = tag['href']
@@ -262,9 +446,9 @@ class Webpage(object):
             if image_link is not None:
                 # Ensure the image uses an Alt tag
                 if len(image_link.get('alt', '')) == 0:
-                    self.warn(WARNINGS["IMAGE_LINK_ALT_MISSING"], tag_href)
+                    self.warn("IMAGE_LINK_ALT_MISSING", tag_href)
                 else:
-                    self.earned(BADGES["IMAGE_LINK_ALT"],
+                    self.earned("IMAGE_LINK_ALT",
                                 image_link.get('alt', ''))
 
             else:
@@ -272,27 +456,27 @@ class Webpage(object):
                 # Avoid writing long anchor text, such as a lengthy sentence or
                 # short paragraph of text
                 if len(tag.get('title', '')) == 0 and len(tag_text) == 0:
-                    self.warn(WARNINGS["ANCHOR_TEXT_MISSING"], tag_href)
+                    self.warn("ANCHOR_TEXT_MISSING", tag_href)
                 elif len(tag_text) < 3:
-                    self.warn(WARNINGS["ANCHOR_TEXT_TOO_SHORT"], tag_text)
+                    self.warn("ANCHOR_TEXT_TOO_SHORT", tag_text)
                 elif len(tag_text) > 100:
-                    self.warn(WARNINGS["ANCHOR_TEXT_TOO_LONG"], tag_text)
+                    self.warn("ANCHOR_TEXT_TOO_LONG", tag_text)
 
                 # Avoid writing generic anchor text like "page", "article", or
                 # "click here"
                 if any(vague_words in tag_text.lower()
                        for vague_words in ['click here', 'page', 'article']):
-                    self.warn(WARNINGS["ANCHOR_TEXT_TOO_GENERIC"], tag_text)
+                    self.warn("ANCHOR_TEXT_TOO_GENERIC", tag_text)
 
             if len(tag_href) > 100:
-                self.warn(WARNINGS["ANCHOR_HREF_TOO_LONG"], tag_href)
+                self.warn("ANCHOR_HREF_TOO_LONG", tag_href)
 
             # Avoid using text that is off-topic or has no relation to the
             # content of the page linked to
 
             # Avoid using the page's URL as the anchor text in most cases
             if tag_text == tag_href:
-                self.warn(WARNINGS["ANCHOR_HREF_EQUALS_TEXT"], tag_text)
+                self.warn("ANCHOR_HREF_EQUALS_TEXT", tag_text)
 
             # Avoid comment spam to external websites
             if len(parse.urlparse(tag_href).netloc) > 0:
@@ -301,9 +485,9 @@ class Webpage(object):
                                for social_site in SOCIAL_WEBSITES)):
                         if tag.get('rel') is None \
                                 or 'nofollow' not in tag.get('rel'):
-                            self.warn(WARNINGS["ANCHOR_NO_FOLLOW"], tag_href)
+                            self.warn("ANCHOR_NO_FOLLOW", tag_href)
                         else:
-                            self.earned(BADGES["ANCHOR_NO_FOLLOW"], tag_href)
+                            self.earned("ANCHOR_NO_FOLLOW", tag_href)
 
             # Avoid linking to broken webpages
             if not tag_href.startswith("mailto:"):
@@ -311,12 +495,35 @@ class Webpage(object):
                 if len(parse.urlparse(tag_href).netloc) == 0:
                     referenced_href = parse.urljoin(self.url, tag_href)
 
+                # verified in the background while the page is analyzed
                 if referenced_href not in verified_pages:
-                    resp = requests.head(referenced_href)
-                    if resp.status_code == requests.codes.not_found:
-                        self.warn(WARNINGS["BROKEN_LINK"], referenced_href)
+                    if self.link_checker is not None:
+                        self.link_checker.check(referenced_href)
+                    self.links.append(referenced_href)
+
+                verified_pages.add(referenced_href)
 
-                verified_pages.append(referenced_href)
+    def _analyze_links(self):
+        """
+        Avoid linking to broken webpages
+        """
+        # a page analyzed on its own checks its links with a checker of
+        # its own, closed once they are verified
+        link_checker = self.link_checker
+        if link_checker is None:
+            link_checker = links.LinkChecker()
+
+        try:
+            # links not checked yet are verified in parallel
+            for referenced_href in self.links:
+                link_checker.check(referenced_href)
+
+            for referenced_href in self.links:
+                if link_checker.is_broken(referenced_href):
+                    self.warn("BROKEN_LINK", referenced_href)
+        finally:
+            if link_checker is not self.link_checker:
+                link_checker.close()
 
     def _analyze_images(self, doc):
         """
@@ -328,10 +535,10 @@ class Webpage(object):
             src = image.get('src', image.get('data-src', ''))
 
             if len(src) == 0:
-                self.warn(WARNINGS["IMAGE_SRC_MISSING"], str(image))
+                self.warn("IMAGE_SRC_MISSING", str(image))
             else:
                 if len(image.get('alt', '')) == 0:
-                    self.warn(WARNINGS["IMAGE_ALT_MISSING"], str(image))
+                    self.warn("IMAGE_ALT_MISSING", str(image))
 
                 # Avoid using generic filenames like
                 # "image1.jpg", "pic.gif", "1.jpg" when possible.
@@ -344,12 +551,12 @@ class Webpage(object):
                 if len(parse.urlparse(src).netloc) == 0 \
                    or self.netloc in src:
                     if len(src) > 15:
-                        self.warn(WARNINGS["IMAGE_SRC_TOO_LONG"], src)
+                        self.warn("IMAGE_SRC_TOO_LONG", src)
 
                 # Avoid writing excessively long alt text that would be
                 # considered spammy
                 if len(image.get('alt', '')) > 40:
-                    self.warn(WARNINGS["IMAGE_ALT_TOO_LONG"],
+                    self.warn("IMAGE_ALT_TOO_LONG",
                               image.get('alt', ''))
 
                 # Avoid using only image links for your site's navigation
@@ -366,14 +573,14 @@ class Webpage(object):
             self.headers.append(h.text)
 
             if len(h.text) < 3:
-                self.warn(WARNINGS["H1_TOO_SHORT"], h.text)
+                self.warn("H1_TOO_SHORT", h.text)
             else:
-                self.earned(BADGES["H1_LENGTH"], h.text)
+                self.earned("H1_LENGTH", h.text)
 
         if len(h1tags) != 1:
-            self.warn(WARNINGS["H1_ONE_PER_PAGE"], self.headers)
+            self.warn("H1_ONE_PER_PAGE", self.headers)
         else:
-            self.earned(BADGES["H1_ONE_PER_PAGE"], self.headers)
+            self.earned("H1_ONE_PER_PAGE", self.headers)
 
         # Avoid placing text in heading tags that wouldn't be helpful
         # in defining the structure of the page
@@ -403,7 +610,8 @@ class Webpage(object):
         kw_meta = doc.findAll('meta', attrs={'name': 'keywords'})
 
         if len(kw_meta) > 0:
-            self.warn(WARNINGS["KEYWORDS_META"], kw_meta)
+            self.warn("KEYWORDS_META",
+                      [str(meta) for meta in kw_meta])
 
         # Detect the most popular keywords used on the page
         self.keywords = self._get_keywords(doc)
@@ -420,20 +628,20 @@ class Webpage(object):
         # topic, rather than writing shorter content that only brushes the
         # surface of your topic
 
-        page_content = self._get_keywords(doc)
-
         # calculate total number of words used (ignoring stop words)
-        count = 0
-        for word, freq in page_content:
-            count += freq
+        count = len(self._get_page_text(doc).tokens)
 
         if count < 1140:
-            self.warn(WARNINGS["WORDCOUNT_TOO_SHORT"],
+            self.warn("WORDCOUNT_TOO_SHORT",
                       u"You have {0} words.".format(count))
         else:
-            self.earned(BADGES["WORDCOUNT"],
+            self.earned("WORDCOUNT",
                         u"You have {0} words.".format(count))
 
+    def _analyze_fingerprint(self, doc):
+        # compared with the other pages once the website is crawled
+        self.fingerprint = similarity.minhash(self._get_page_text(doc).tokens)
+
     def _analyze_backlinks(self, doc):
         pass
 
@@ -479,29 +687,19 @@ class Webpage(object):
         result = {
             "url": self.url,
             "keywords": keywords_result,
-            "issues": self.issues,
-            "achieved": self.achieved,
+            "issues": issues.render(self.issues, self.codes),
+            "achieved": issues.render(self.achieved, self.codes),
             "title": self.title,
             "description": self.description
         }
 
         return result
 
-    def warn(self, message, value=None):
-        self.issues.append(
-            {
-                "warning": message,
-                "value": value
-            }
-        )
+    def warn(self, code, value=None):
+        self.issues.append(issues.Issue(code, value))
 
-    def earned(self, message, value=None):
-        self.achieved.append(
-            {
-                "achievement": message,
-                "value": value
-            }
-        )
+    def earned(self, code, value=None):
+        self.achieved.append(issues.Achievement(code, value))
 
     def visible_tags(self, element):
         non_visible_elements = [
@@ -519,7 +717,7 @@ class Webpage(object):
         return [
             word
             for word in TOKEN_REGEX.findall(rawtext.lower())
-            if word not in ENGLISH_STOP_WORDS
+            if word not in self.stop_words
         ]
 
     def grouped(self, token_list):
@@ -534,14 +732,26 @@ class Webpage(object):
                               key=lambda x: x[1], reverse=True)
         return grouped_list
 
+    def _get_page_text(self, doc):
+        if self.page_text is None or self.page_text.doc is not doc:
+            self.page_text = PageText(
+                doc, self.visible_tags, self.tokenize, self.grouped)
+
+        return self.page_text
+
     def _get_keywords(self, doc):
-        keywords = {}
-        text_elements = filter(self.visible_tags, doc.findAll(text=True))
-        page_text = ''
-        for element in text_elements:
-            page_text += element.lower() + ' '
+        # callers may trim the keywords, so hand out a copy
+        return list(self._get_page_text(doc).keywords)
+
 
-        tokens = self.tokenize(page_text)
-        keywords = self.grouped(tokens)
+def analyze_page(page_url, html, stop_words=None, parser=DEFAULT_PARSER):
+    '''
+    Per page analysis of the page, returning its snapshot. Runs in worker
+    processes, the links are verified and the duplicates detected once the
+    snapshot is restored by the crawl.
+    '''
+    page = Webpage(page_url, html, {}, {}, stop_words=stop_words,
+                   parser=parser)
+    page.analyze()
 
-        return keywords
+    return page.snapshot()
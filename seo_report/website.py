@@ -1,36 +1,103 @@
+from seo_report import duplicates
+from seo_report import frontier
+from seo_report import incremental
+from seo_report import issues
+from seo_report import links
+from seo_report import sessions
+from seo_report import similarity
+from seo_report import sitemaps
+from seo_report import stats
 from seo_report import webpage
-from seo_report.warnings import WARNINGS
-from seo_report.warnings import BADGES
 
-from bs4 import BeautifulSoup as Soup
+import collections
+import datetime
+from concurrent import futures
 import requests
+import six
 from six.moves.urllib import parse
 
+CHUNK_SIZE = 64 * 1024
+
+Response = collections.namedtuple("Response", ["status_code", "content"])
+
 
 class Spider(object):
-    report = {"pages": []}
 
-    def __init__(self, site, sitemap=None, page=None):
+    def __init__(self, site, sitemap=None, page=None, concurrency=1,
+                 session=None, stop_words=None,
+                 parser=webpage.DEFAULT_PARSER, writer=None,
+                 follow_links=False, max_depth=None, max_pages=None,
+                 cache=None, store=None, processes=None, checkpoint=None,
+                 resume=False, politeness=None, stats=None,
+                 max_page_size=None, codes=False):
         parsed_url = parse.urlparse(site)
 
         self.domain = "{0}://{1}".format(parsed_url.scheme, parsed_url.netloc)
+        self.report = {"pages": []}
+        self.netloc = parsed_url.netloc.lower()
         self.pages_crawled = []
         self.pages_to_crawl = []
-        self.titles = {}
-        self.descriptions = {}
+        self.titles = duplicates.DuplicateRegistry()
+        self.descriptions = duplicates.DuplicateRegistry()
         self.issues = []
         self.achieved = []
+        self.near_duplicates = similarity.NearDuplicateIndex()
+        self.concurrency = max(1, concurrency)
+        self.stop_words = stop_words
+        self.parser = parser
+
+        # stream the results out instead of keeping them in the report
+        self.writer = writer
+
+        # discover pages by following the links found on the site
+        self.follow_links = follow_links
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.frontier = None
+
+        # revalidate the pages stored by previous crawls
+        self.cache = cache
+
+        # reuse the analysis of the pages unchanged since previous crawls
+        self.store = store
+
+        # analyze the pages in worker processes while the next ones are
+        # fetched
+        self.processes = processes
+
+        # periodically save the crawl state, continuing from it on resume
+        self.checkpoint = checkpoint
+        self.resume = resume
+
+        # skip the pages disallowed by robots.txt and rate limit requests
+        self.politeness = politeness
+
+        # time the phases of the crawl
+        self.stats = stats
+
+        # pages are only downloaded, and analyzed, up to this many bytes
+        self.max_page_size = max_page_size
+
+        # report the codes of the issues, with their messages listed once
+        self.codes = codes
+
+        # reuse connections for every request made during the crawl
+        link_concurrency = max(self.concurrency, links.DEFAULT_CONCURRENCY)
+        if session is None:
+            session = sessions.create_session(
+                pool_size=self.concurrency + link_concurrency)
+        self.session = session
+        self.link_checker = self._create_link_checker()
 
         # look for the sitemap on this page
+        self.sitemap = None
         if sitemap is not None:
-            # add all locations in the sitemap to the pages_to_crawl table
-            locations = []
-            resp = requests.get(self.domain + sitemap)
-            if resp.status_code == requests.codes.ok:
-                locations = self._parse_sitemap(resp.content)
+            # locations in the sitemap are streamed into the crawl as the
+            # pages are fetched
+            self.sitemap = sitemaps.Sitemap(
+                self.session, parse.urljoin(self.domain, sitemap))
 
             self.pages_to_crawl.append(site)
-            self.pages_to_crawl.extend(locations)
         elif page is not None:
             self.pages_to_crawl.append(site + page)
         else:
@@ -40,34 +107,131 @@ class Spider(object):
         '''
         Parse the Sitemap for Locations
         '''
-        locations = []
+        if isinstance(sitemap, six.text_type):
+            sitemap = sitemap.encode("utf-8")
+
+        return list(sitemaps.parse_locations([sitemap]))
+
+    def _create_link_checker(self):
+        # closed at the end of the crawl
+        return links.LinkChecker(
+            max(self.concurrency, links.DEFAULT_CONCURRENCY),
+            session=self.session, politeness=self.politeness,
+            stats=self.stats)
+
+    def _create_frontier(self):
+        pages = frontier.Frontier(self.max_depth, self.max_pages)
+        for page_url in self.pages_to_crawl:
+            pages.add(page_url)
+
+        return pages
+
+    def _sources(self):
+        # urls queued once the start pages are crawled
+        if self.sitemap is None:
+            return []
+
+        return [self.sitemap]
+
+    def _discover(self, page, depth):
+        # queue the pages of this site linked from the page
+        if not self.follow_links:
+            return
+
+        for link in page.links:
+            parsed_link = parse.urlparse(link)
+            if parsed_link.scheme in ("http", "https") \
+                    and parsed_link.netloc.lower() == self.netloc:
+                # pages are reported by their canonical url, whichever
+                # link led to them first
+                self.frontier.add(frontier.normalize_url(link), depth + 1)
+
+    def _state(self):
+        return {
+            "site": self.domain,
+            "frontier": self.frontier.state(),
+            "pages_crawled": self.pages_crawled,
+            "titles": self.titles.state(),
+            "descriptions": self.descriptions.state(),
+            "issues": issues.dump(self.issues),
+            "achieved": issues.dump(self.achieved),
+            "fingerprints": self.near_duplicates.state(),
+            "pages": self.report["pages"]
+        }
+
+    def _resume(self):
+        '''
+        Restore the state of an interrupted crawl, returns whether there
+        was one to resume
+        '''
+        if self.checkpoint is None or not self.resume:
+            return False
 
-        soup = Soup(sitemap, "html.parser")
-        urls = soup.findAll('url')
+        state = self.checkpoint.load()
+        if state is None:
+            return False
 
-        # get just the locations
-        if len(urls) > 0:
-            for u in urls:
-                loc = u.find('loc').string
-                locations.append(loc)
+        if state["site"] != self.domain:
+            raise ValueError(
+                "Checkpoint {0} was saved crawling {1}".format(
+                    self.checkpoint.path, state["site"]))
 
-        return locations
+        self.frontier = frontier.Frontier(self.max_depth, self.max_pages)
+        self.frontier.restore(state["frontier"])
+        self.pages_crawled = state["pages_crawled"]
+        self.titles.restore(state["titles"])
+        self.descriptions.restore(state["descriptions"])
+        self.issues = issues.load(issues.Issue, state["issues"])
+        self.achieved = issues.load(issues.Achievement, state["achieved"])
+        self.near_duplicates.restore(state["fingerprints"])
+        self.report = {"pages": state["pages"]}
 
-    def _analyze_crawlers(self):
-        # robots.txt present
-        resp = requests.get(self.domain + "/robots.txt")
+        return True
+
+    def _page_done(self, page_url):
+        self.frontier.done(page_url)
+        if self.checkpoint is not None and self.checkpoint.due():
+            self.checkpoint.save(self._state())
+
+    def _analyze_crawlers(self, resp=None):
+        # robots.txt present, as fetched by the scheduler to read its rules
+        if resp is None and self.politeness is not None:
+            resp = self.politeness.robots_txt(self.domain)
+        if resp is None:
+            resp = self.session.get(self.domain + "/robots.txt")
         if resp.status_code == requests.codes.ok:
-            self.earned(BADGES["ROBOTS.TXT"])
+            self.earned("ROBOTS.TXT")
         else:
-            self.warn(WARNINGS["ROBOTS.TXT"])
+            self.warn("ROBOTS.TXT")
 
-    def _analyze_blog(self):
+    def _analyze_blog(self, resp=None):
         # does the website have a blog present
-        resp = requests.get(self.domain + "/blog")
+        if resp is None:
+            resp = self.session.get(self.domain + "/blog")
         if resp.status_code == requests.codes.ok:
-            self.earned(BADGES["BLOG_DETECTED"], self.domain + u"/blog")
+            self.earned("BLOG_DETECTED", self.domain + u"/blog")
         else:
-            self.warn(WARNINGS["BLOG_MISSING"])
+            self.warn("BLOG_MISSING")
+
+    def _analyze_sitemap(self):
+        # sitemaps that could not be parsed
+        if self.sitemap is not None:
+            for sitemap_url in self.sitemap.invalid:
+                self.warn("SITEMAP_INVALID", sitemap_url)
+
+    def _analyze_duplicates(self):
+        # every page sharing a title or description, each page only lists
+        # the first pages using it before
+        for code, registry in (("TITLE_DUPLICATED", self.titles),
+                               ("DESCRIPTION_DUPLICATED", self.descriptions)):
+            for value, urls in registry.duplicates():
+                self.warn(code, u'"{0}" used on pages: {1}'.format(
+                    value, u", ".join(urls)))
+
+    def _analyze_near_duplicates(self):
+        # groups of pages with nearly the same content
+        for urls in self.near_duplicates.clusters():
+            self.warn("CONTENT_NEAR_DUPLICATE", urls)
 
     def _analyze_mobile(self):
         pass
@@ -76,56 +240,300 @@ class Spider(object):
         # Use Google Analytics or Omniture etc
         pass
 
-    def warn(self, message, value=None):
-        self.issues.append(
-            {
-                "warning": message,
-                "value": value
-            }
-        )
-
-    def earned(self, message, value=None):
-        self.achieved.append(
-            {
-                "achievement": message,
-                "value": value
-            }
-        )
+    def warn(self, code, value=None):
+        self.issues.append(issues.Issue(code, value))
 
-    def crawl(self):
-        # site wide checks
-        self._analyze_crawlers()
-        self._analyze_mobile()
-        self._analyze_analytics()
-        self._analyze_blog()
+    def earned(self, code, value=None):
+        self.achieved.append(issues.Achievement(code, value))
 
-        # iterate over individual pages to crawl
-        for page_url in self.pages_to_crawl:
-            resp = requests.get(page_url)
+    def _allowed(self, page_url):
+        if self.politeness is None or self.politeness.allowed(page_url):
+            return True
 
-            if resp.status_code == requests.codes.ok:
-                html = webpage.Webpage(
-                    page_url, resp.content, self.titles, self.descriptions)
+        self.warn("ROBOTS_DISALLOWED", page_url)
+        self.frontier.done(page_url)
+        return False
 
-                page_report = html.report()
-                self.report['pages'].append(page_report)
+    def _count(self, counter, value=1):
+        if self.stats is not None:
+            self.stats.incr(counter, value)
+
+    def _fetch(self, page_url):
+        with stats.timed(self.stats, "fetch"):
+            if self.politeness is not None:
+                with self.politeness.slot(page_url):
+                    resp = self._get(page_url)
+            else:
+                resp = self._get(page_url)
+
+        self._count("requests")
+        self._count("bytes", len(resp.content or b""))
+
+        # time to the response headers, covering dns, connect and the
+        # server response time, the rest of the fetch is the download
+        elapsed = getattr(resp, "elapsed", None)
+        if self.stats is not None \
+                and isinstance(elapsed, datetime.timedelta):
+            self.stats.add_time("fetch_headers", elapsed.total_seconds())
+
+        return resp
+
+    def _get(self, page_url):
+        if self.cache is not None:
+            return self.cache.fetch(self.session, page_url)
+
+        if self.max_page_size is not None:
+            return self._get_limited(page_url)
+
+        return self.session.get(page_url)
+
+    def _content(self, resp):
+        # the part of the page that is analyzed
+        if self.max_page_size is None:
+            return resp.content
+
+        return resp.content[:self.max_page_size]
+
+    def _get_limited(self, page_url):
+        # stop the download one byte past the limit, so pages that are too
+        # large can be told apart when analyzed
+        resp = self.session.get(page_url, stream=True)
+        try:
+            chunks = []
+            size = 0
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_page_size:
+                    break
+
+            content = b"".join(chunks)[:self.max_page_size + 1]
+        finally:
+            resp.close()
 
-                # mark the page as crawled
-                self.pages_crawled.append(page_url.strip().lower())
+        return Response(resp.status_code, content)
 
-                print("Crawled {0} Pages of {1}: {2}".format(
-                    len(self.pages_crawled), len(self.pages_to_crawl), page_url))
-            
-            elif resp.status_code == requests.codes.not_found:
-                self.warn(WARNINGS["BROKEN_LINK"], page_url)
+    def _fetch_pages(self, pages):
+        '''
+        Fetch the pages in the frontier using a bounded pool of workers,
+        yielding the responses in the order the pages were queued
+        '''
+        with futures.ThreadPoolExecutor(
+                max_workers=self.concurrency) as executor:
+            in_flight = collections.deque()
+            while True:
+                # keep the window bounded so responses are not buffered
+                # faster than they can be analyzed
+                while len(in_flight) <= self.concurrency:
+                    entry = pages.pop()
+                    if entry is None:
+                        break
+
+                    page_url, depth = entry
+                    if not self._allowed(page_url):
+                        continue
+
+                    in_flight.append(
+                        (page_url, depth,
+                         executor.submit(self._fetch, page_url)))
+
+                if len(in_flight) == 0:
+                    break
+
+                # links found on this page are queued before resuming
+                page_url, depth, future = in_flight.popleft()
+                yield page_url, depth, future.result()
+
+    def _digest(self, content):
+        # pages keep their analysis until their content or the analysis
+        # options change
+        stop_words = self.stop_words
+        if stop_words is None:
+            stop_words = webpage.ENGLISH_STOP_WORDS_INDEX
+
+        return incremental.content_digest(
+            content, webpage.SNAPSHOT_VERSION, self.parser,
+            u" ".join(sorted(stop_words)))
+
+    def _report(self, page, content, snapshot=None):
+        if snapshot is None and self.store is not None:
+            digest = self._digest(content)
+            snapshot = self.store.get(page.url, digest)
+            if snapshot is None:
+                page.analyze()
+                self.store.put(page.url, digest, page.snapshot())
+                return page.complete()
+
+        if snapshot is None:
+            return page.report()
+
+        # only the cross page checks are run again
+        page.restore(snapshot)
+        return page.complete()
+
+    def _submit(self, pool, page_url, resp):
+        '''
+        Start the per page analysis of a fetched page in the process pool,
+        returns the future snapshot of the page and the digest to store it
+        under, if any
+        '''
+        if resp.status_code != requests.codes.ok:
+            return None
+
+        content = self._content(resp)
+        digest = None
+        if self.store is not None:
+            digest = self._digest(content)
+            snapshot = self.store.get(page_url, digest)
+            if snapshot is not None:
+                analysis = futures.Future()
+                analysis.set_result(snapshot)
+                return analysis, None
+
+        analysis = pool.submit(
+            webpage.analyze_page, page_url, content,
+            self.stop_words, self.parser)
+        return analysis, digest
+
+    def _complete_next(self, pending):
+        entry = pending.popleft()
+        self._complete(*entry)
+        self._page_done(entry[0])
+
+    def _complete(self, page_url, depth, resp, analysis):
+        snapshot = None
+        if analysis is not None:
+            future, digest = analysis
+            snapshot = future.result()
+            if digest is not None:
+                self.store.put(page_url, digest, snapshot)
+
+        self._analyze_page(page_url, resp, depth, snapshot)
+
+    def _analyze_page(self, page_url, resp, depth=0, snapshot=None):
+        # pages are analyzed one at a time, in crawl order, so the shared
+        # titles/descriptions see the same sequence as a serial crawl
+        if resp.status_code == requests.codes.ok:
+            content = self._content(resp)
+            if len(content) < len(resp.content):
+                self.warn("PAGE_TOO_LARGE", page_url)
+
+            html = webpage.Webpage(
+                page_url, content, self.titles, self.descriptions,
+                link_checker=self.link_checker, stop_words=self.stop_words,
+                parser=self.parser, stats=self.stats, codes=self.codes)
+
+            with stats.timed(self.stats, "analyze"):
+                page_report = self._report(html, content, snapshot)
+            if self.writer is not None:
+                self.writer.write_page(page_report)
             else:
-                self.warn(WARNINGS["SERVER_ERROR"],
-                          "HTTP{0} received for {1}".format(
-                              resp.status_code, page_url))
+                self.report['pages'].append(page_report)
+
+            # mark the page as crawled
+            self.pages_crawled.append(page_url.strip().lower())
+            if html.fingerprint is not None:
+                self.near_duplicates.add(page_url, html.fingerprint)
+            self._discover(html, depth)
+            self._count("pages")
+
+        elif resp.status_code == requests.codes.not_found:
+            self._count("pages_not_found")
+            self.warn("BROKEN_LINK", page_url)
+        else:
+            self._count("pages_failed")
+            self.warn("SERVER_ERROR",
+                      "HTTP{0} received for {1}".format(
+                          resp.status_code, page_url))
+
+    def crawl(self):
+        try:
+            # the site wide checks of a resumed crawl are already done
+            if not self._resume():
+                self._analyze_crawlers()
+                self._analyze_mobile()
+                self._analyze_analytics()
+                self._analyze_blog()
+
+                self.frontier = self._create_frontier()
+
+            # iterate over individual pages to crawl, the sitemap is read
+            # again on resume but its pages are only crawled once
+            for source in self._sources():
+                self.frontier.add_source(source)
+
+            self._crawl_frontier()
+            self._analyze_sitemap()
+
+            report = self._aggregate()
+        finally:
+            self._close()
+
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+        return report
+
+    def _close(self):
+        # release the threads of the link checker and the databases the
+        # duplicates spilled to
+        self.link_checker.close()
+        self.titles.close()
+        self.descriptions.close()
+
+    def _crawl_frontier(self):
+        if self.processes:
+            self._crawl_processes()
+            return
+
+        for page_url, depth, resp in self._fetch_pages(self.frontier):
+            self._analyze_page(page_url, resp, depth)
+            self._page_done(page_url)
+
+    def _crawl_processes(self):
+        # pages are parsed by the workers as soon as they are fetched, the
+        # snapshots are completed in crawl order
+        with futures.ProcessPoolExecutor(
+                max_workers=self.processes) as pool:
+            pending = collections.deque()
+            for page_url, depth, resp in self._fetch_pages(self.frontier):
+                pending.append(
+                    (page_url, depth, resp,
+                     self._submit(pool, page_url, resp)))
+
+                # keep just enough pages in flight to keep the workers busy,
+                # links are only discovered once a page is completed so the
+                # pending pages are drained before the frontier runs out
+                while pending and (
+                        len(pending) > self.processes or
+                        self.follow_links and len(self.frontier) == 0):
+                    self._complete_next(pending)
+
+            while pending:
+                self._complete_next(pending)
+
+    def _aggregate(self):
+        self._analyze_duplicates()
+        with stats.timed(self.stats, "_analyze_near_duplicates"):
+            self._analyze_near_duplicates()
+
+        if self.stats is not None:
+            self.stats.finish()
 
         # aggregate the site wide issues/achievements
         self.report["site"] = {}
-        self.report["site"]["issues"] = self.issues
-        self.report["site"]["achieved"] = self.achieved
+        self.report["site"]["issues"] = issues.render(
+            self.issues, self.codes)
+        self.report["site"]["achieved"] = issues.render(
+            self.achieved, self.codes)
+
+        # the messages are listed once, for the codes to be looked up
+        if self.codes:
+            self.report["messages"] = issues.messages()
+
+        if self.writer is not None:
+            self.writer.write_site(self.report["site"])
+            if self.codes:
+                self.writer.write_messages(self.report["messages"])
 
         return self.report
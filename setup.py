@@ -6,6 +6,7 @@ pip_requires = os.path.join(os.getcwd(), 'requirements.txt')
 
 REQUIRES=[
     'BeautifulSoup4',
+    'futures; python_version < "3"',
     'requests',
     'six'
 ]
@@ -20,10 +21,14 @@ setup(
     description='A Python client for analyzing webpages for SEO issues.',
     url='https://github.com/drawbuildplay/seo-report',
     install_requires=REQUIRES,
+    extras_require={
+        'asyncio': ['aiohttp; python_version >= "3.6"']
+    },
     packages = find_packages(),
     entry_points={
         'console_scripts': [
-            'seoreport = seo_report.cmd:main'
+            'seoreport = seo_report.cmd:main',
+            'seoreport-batch = seo_report.batch:main'
         ]
     }
 )
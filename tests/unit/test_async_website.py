@@ -0,0 +1,306 @@
+import asyncio
+import ddt
+import mock
+import requests
+import testtools
+import threading
+import uuid
+
+from seo_report import async_website
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+
+class MockContent(object):
+
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class MockResponse(object):
+
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.content = MockContent(body)
+
+    async def read(self):
+        return self.content.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class MockClient(object):
+    '''
+    aiohttp client raising the errors in turn before responding
+    '''
+
+    def __init__(self, response, errors=()):
+        self.response = response
+        self.errors = list(errors)
+        self.requests = 0
+
+    def get(self, url, headers=None):
+        self.requests += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+        return self.response
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@ddt.ddt
+@testtools.skipIf(async_website.aiohttp is None, "aiohttp is not installed")
+class AsyncWebsiteTests(testtools.TestCase):
+
+    def setUp(self):
+        super(AsyncWebsiteTests, self).setUp()
+
+        self.site_url = "http://www.mock{0}.com".format(uuid.uuid4())
+        self.responses = {}
+        self.requested = []
+        self.checked = []
+
+    def mock_fetch(self, spider):
+        async def _fetch(client, page_url):
+            self.requested.append(page_url)
+            status_code, content = self.responses.get(
+                page_url, (requests.codes.not_found, ""))
+            return async_website.Response(status_code, content)
+
+        async def _chunks(client, sitemap_url):
+            self.requested.append(sitemap_url)
+            status_code, content = self.responses.get(
+                sitemap_url, (requests.codes.not_found, ""))
+            if status_code == requests.codes.ok:
+                for i in range(0, len(content), 16):
+                    yield content[i:i + 16].encode("utf-8")
+
+        async def _head(url):
+            self.checked.append(url)
+            return self.responses.get(url, (requests.codes.ok, ""))[0]
+
+        spider._fetch = _fetch
+        spider.link_checker._head = _head
+        if spider.sitemap is not None:
+            spider.sitemap._chunks = _chunks
+        return spider
+
+    def test_init_sitemap_deferred(self):
+        wp = async_website.AsyncSpider(self.site_url, "/sitemap.xml")
+
+        self.assertEqual(wp.pages_to_crawl, [self.site_url])
+        self.assertIsInstance(wp.sitemap, async_website.AsyncSitemap)
+        self.assertEqual(wp.sitemap.url, self.site_url + "/sitemap.xml")
+
+    def test_init_page(self):
+        wp = async_website.AsyncSpider(self.site_url, None, "/about")
+
+        self.assertEqual(wp.pages_to_crawl, [self.site_url + "/about"])
+
+    @ddt.file_data("data_webpage.json")
+    def test_crawl(self, data):
+        resp_code, content = data.split("|")
+        self.responses[self.site_url] = (int(resp_code), content)
+        self.responses[self.site_url + "/robots.txt"] = (
+            requests.codes.ok, "")
+
+        wp = self.mock_fetch(async_website.AsyncSpider(self.site_url))
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        self.assertTrue(any(earned["achievement"] == BADGES["ROBOTS.TXT"]
+                            for earned in wp.achieved))
+        self.assertTrue(any(issue["warning"] == WARNINGS["BLOG_MISSING"]
+                            for issue in wp.issues))
+
+        if int(resp_code) == requests.codes.ok:
+            self.assertEqual(len(report["pages"]), 1)
+        elif int(resp_code) == requests.codes.not_found:
+            self.assertTrue(any(issue["warning"] == WARNINGS["BROKEN_LINK"]
+                                for issue in wp.issues))
+        else:
+            self.assertTrue(any(issue["warning"] == WARNINGS["SERVER_ERROR"]
+                                for issue in wp.issues))
+
+    @ddt.data(1, 3, 50)
+    def test_crawl_sitemap(self, concurrency):
+        pages = [self.site_url + "/page{0}".format(i) for i in range(10)]
+        html = "<html><head><title>A shared title for pages</title></html>"
+
+        self.responses[self.site_url + "/sitemap.xml"] = (
+            requests.codes.ok,
+            "<sitemapindex><sitemap><loc>/sitemap1.xml</loc></sitemap>"
+            "<sitemap><loc>/sitemap2.xml</loc></sitemap></sitemapindex>")
+        for i, half in enumerate([pages[:5], pages[5:]]):
+            self.responses[self.site_url + "/sitemap{0}.xml".format(i + 1)] = (
+                requests.codes.ok,
+                "<urlset>{0}</urlset>".format("".join(
+                    "<url><loc>{0}</loc></url>".format(p) for p in half)))
+        for page in [self.site_url] + pages:
+            self.responses[page] = (requests.codes.ok, html)
+
+        wp = self.mock_fetch(async_website.AsyncSpider(
+            self.site_url, "/sitemap.xml", concurrency=concurrency))
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        # pages are analyzed in crawl order
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url] + pages)
+        self.assertEqual(len(wp.pages_crawled), len(pages) + 1)
+        self.assertFalse(any(issue["warning"] == WARNINGS["TITLE_DUPLICATED"]
+                             for issue in report["pages"][0]["issues"]))
+        for page in report["pages"][1:]:
+            self.assertTrue(any(issue["warning"] == WARNINGS[
+                "TITLE_DUPLICATED"] for issue in page["issues"]))
+
+    def test_crawl_sitemap_invalid(self):
+        self.responses[self.site_url + "/sitemap.xml"] = (
+            requests.codes.ok, "<urlset></set>")
+
+        wp = self.mock_fetch(async_website.AsyncSpider(
+            self.site_url, "/sitemap.xml"))
+        wp.report = {"pages": []}
+        wp.crawl()
+
+        self.assertTrue(any(issue["warning"] == WARNINGS["SITEMAP_INVALID"]
+                            for issue in wp.issues))
+
+    def test_crawl_follow_links(self):
+        html = "<html><title>{0}</title><a href='{1}'>Next page</a></html>"
+        for i in range(5):
+            self.responses[self.site_url + "/{0}".format(i)] = (
+                requests.codes.ok,
+                html.format(i, "/{0}".format(i + 1)))
+
+        wp = self.mock_fetch(async_website.AsyncSpider(
+            self.site_url, None, "/0", concurrency=3, follow_links=True,
+            max_pages=4))
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url + "/{0}".format(i) for i in range(4)])
+
+    @ddt.data((None, 8 * 1024), (1024, 1025))
+    @ddt.unpack
+    def test_fetch_max_page_size(self, max_page_size, size):
+        client = MockClient(MockResponse(requests.codes.ok, b"x" * 8 * 1024))
+        wp = async_website.AsyncSpider(self.site_url,
+                                       max_page_size=max_page_size)
+
+        resp = run(wp._fetch(client, self.site_url))
+
+        self.assertEqual(len(resp.content), size)
+
+    def test_fetch_max_page_size_cached(self):
+        body = b"x" * 8 * 1024
+        client = MockClient(
+            MockResponse(requests.codes.ok, body, {"ETag": '"v1"'}))
+        cache = mock.MagicMock()
+        cache.get.return_value = None
+        cache.conditional_headers.return_value = {}
+        wp = async_website.AsyncSpider(self.site_url, cache=cache,
+                                       max_page_size=1024)
+
+        resp = run(wp._fetch(client, self.site_url))
+
+        # the whole page is stored, it is only cut short when analyzed
+        self.assertEqual(resp.content, body)
+        cache.miss.assert_called_once_with(
+            self.site_url, requests.codes.ok, {"ETag": '"v1"'}, body)
+
+    @ddt.data((2, True), (1, False))
+    @ddt.unpack
+    @mock.patch.object(async_website, "RETRY_BACKOFF", 0)
+    def test_fetch_retries(self, retries, fetched):
+        errors = [async_website.aiohttp.ClientConnectionError(),
+                  asyncio.TimeoutError()]
+        client = MockClient(MockResponse(requests.codes.ok, b"page"), errors)
+        wp = async_website.AsyncSpider(self.site_url, retries=retries)
+
+        if fetched:
+            resp = run(wp._fetch(client, self.site_url))
+            self.assertEqual(resp.content, b"page")
+        else:
+            self.assertRaises(asyncio.TimeoutError, run,
+                              wp._fetch(client, self.site_url))
+        self.assertEqual(client.requests, retries + 1)
+
+    def test_crawl_politeness_robots_txt(self):
+        self.responses[self.site_url] = (
+            requests.codes.ok, "<html><title>Home</title></html>")
+        scheduler = mock.MagicMock()
+        scheduler.max_connections = None
+        scheduler.reserve.return_value = 0
+        scheduler.robots_txt.return_value = async_website.Response(
+            requests.codes.ok, b"User-agent: *\n")
+
+        wp = self.mock_fetch(async_website.AsyncSpider(
+            self.site_url, politeness=scheduler))
+        wp.crawl()
+
+        # robots.txt is only fetched by the scheduler
+        scheduler.robots_txt.assert_called_once_with(self.site_url)
+        self.assertNotIn(self.site_url + "/robots.txt", self.requested)
+        self.assertTrue(any(earned["achievement"] == BADGES["ROBOTS.TXT"]
+                            for earned in wp.achieved))
+
+    def test_fetch_blocking_off_loop(self):
+        threads = []
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread())
+
+        client = MockClient(
+            MockResponse(requests.codes.ok, b"page", {"ETag": '"v1"'}))
+        cache = mock.MagicMock()
+        cache.get.side_effect = record
+        cache.miss.side_effect = record
+        cache.conditional_headers.return_value = {}
+        store = mock.MagicMock()
+        store.get.side_effect = record
+        wp = async_website.AsyncSpider(self.site_url, cache=cache,
+                                       store=store)
+
+        run(wp._fetch_bounded(client, asyncio.Semaphore(1), self.site_url,
+                              pool=mock.MagicMock()))
+
+        # the cache and store are never accessed from the event loop
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_crawl_link_checker(self):
+        html = ("<html><title>Home</title><a href='/missing'>Missing</a>"
+                "<a href='http://www.example.com/'>External</a></html>")
+        self.responses[self.site_url] = (requests.codes.ok, html)
+        self.responses[self.site_url + "/missing"] = (
+            requests.codes.not_found, "")
+
+        wp = self.mock_fetch(async_website.AsyncSpider(
+            self.site_url, concurrency=500))
+        self.assertIsInstance(wp.link_checker, async_website.AsyncLinkChecker)
+        report = wp.crawl()
+
+        # links are checked on the event loop, each once
+        self.assertEqual(sorted(self.checked), [
+            "http://www.example.com/", self.site_url + "/missing"])
+        self.assertIn(self.site_url + "/missing",
+                      [issue["value"] for issue in report["pages"][0]["issues"]
+                       if issue["warning"] == WARNINGS["BROKEN_LINK"]])
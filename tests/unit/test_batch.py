@@ -0,0 +1,104 @@
+import ddt
+import json
+import mock
+import os
+import requests
+import shutil
+import sys
+import tempfile
+import testtools
+
+from six.moves.urllib import parse
+
+from seo_report import batch
+
+
+@ddt.ddt
+class BatchTests(testtools.TestCase):
+
+    def setUp(self):
+        super(BatchTests, self).setUp()
+
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+        self.domains = ["http://www.mock{0}.com".format(i) for i in range(5)]
+
+    def mock_get(self, url, *args, **kwargs):
+        # every site has a home page titled after its host
+        parsed_url = parse.urlparse(url)
+        resp = mock.MagicMock()
+        resp.status_code = requests.codes.ok
+        resp.content = "<html><head><title>{0}</title></head></html>".format(
+            parsed_url.netloc)
+        return resp
+
+    def test_load_domains(self):
+        path = os.path.join(self.tempdir, "domains.txt")
+        with open(path, "w") as f:
+            f.write("# nightly audit\n\n{0}\n  {1}  \n".format(
+                *self.domains[:2]))
+
+        self.assertEqual(batch.load_domains(path), self.domains[:2])
+
+    def test_report_path(self):
+        self.assertEqual(
+            batch.report_path("reports", "http://WWW.mock.com:8080", "jsonl"),
+            os.path.join("reports", "www.mock.com_8080.jsonl"))
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_audit(self, mock_requests):
+        mock_requests.side_effect = self.mock_get
+
+        failed = batch.audit(self.domains, self.tempdir, sites=3)
+        self.assertEqual(failed, {})
+
+        # each report only holds the pages of its own site
+        for domain in self.domains:
+            with open(batch.report_path(
+                    self.tempdir, domain, "json")) as f:
+                report = json.load(f)
+            self.assertEqual([p["url"] for p in report["pages"]], [domain])
+            self.assertEqual(report["pages"][0]["title"],
+                             parse.urlparse(domain).netloc)
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_audit_failed(self, mock_requests):
+        def mock_get(url, *args, **kwargs):
+            if url.startswith(self.domains[1]):
+                raise requests.exceptions.ConnectionError(url)
+            return self.mock_get(url)
+
+        mock_requests.side_effect = mock_get
+
+        failed = batch.audit(self.domains, self.tempdir, sites=2,
+                             output_format='jsonl')
+
+        # the other sites are still audited
+        self.assertEqual(list(failed), [self.domains[1]])
+        self.assertFalse(os.path.exists(batch.report_path(
+            self.tempdir, self.domains[1], "jsonl")))
+        with open(batch.report_path(
+                self.tempdir, self.domains[2], "jsonl")) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_main(self, mock_requests):
+        mock_requests.side_effect = self.mock_get
+        path = os.path.join(self.tempdir, "domains.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(self.domains))
+        output_dir = os.path.join(self.tempdir, "reports")
+
+        sys.argv[1:] = [path, "--output-dir", output_dir, "--stats"]
+        batch.main()
+
+        self.assertEqual(len(os.listdir(output_dir)), len(self.domains))
+
+        sys.argv[1:] = [path, "--checkpoint", "crawl.json"]
+        self.assertRaises(SystemExit, batch.main)
+
+    @ddt.data(["--warc", "crawl.warc.gz"], ["--directory", "public"])
+    def test_main_single_site(self, argv):
+        sys.argv[1:] = ["domains.txt"] + argv
+        self.assertRaises(SystemExit, batch.main)
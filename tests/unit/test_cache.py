@@ -0,0 +1,116 @@
+import mock
+import os
+import requests
+import shutil
+import tempfile
+import testtools
+
+from seo_report import cache
+
+
+class ResponseCacheTests(testtools.TestCase):
+
+    def setUp(self):
+        super(ResponseCacheTests, self).setUp()
+
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.path = os.path.join(tempdir, "cache.db")
+
+        self.cache = cache.ResponseCache(self.path, max_size=100)
+        self.addCleanup(self.cache.close)
+
+    def mock_session(self, status_code, content=b"", headers=None):
+        session = mock.MagicMock()
+        session.get.return_value.status_code = status_code
+        session.get.return_value.content = content
+        session.get.return_value.headers = headers or {}
+        return session
+
+    def test_store_and_get(self):
+        self.cache.store("http://www.example.com/", {"ETag": '"v1"'}, b"body")
+
+        cached = self.cache.get("http://www.example.com/")
+        self.assertEqual(cached.status_code, requests.codes.ok)
+        self.assertEqual(cached.content, b"body")
+        self.assertEqual(self.cache.conditional_headers(cached),
+                         {"If-None-Match": '"v1"'})
+        self.assertIsNone(self.cache.get("http://www.example.com/about"))
+
+    def test_store_without_validators(self):
+        self.cache.store("http://www.example.com/", {}, b"body")
+
+        self.assertIsNone(self.cache.get("http://www.example.com/"))
+
+    def test_persistent(self):
+        self.cache.store("http://www.example.com/",
+                         {"Last-Modified": "Sat, 01 Oct 2016 00:00:00 GMT"},
+                         b"body")
+        self.cache.close()
+
+        reopened = cache.ResponseCache(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(
+            reopened.conditional_headers(
+                reopened.get("http://www.example.com/")),
+            {"If-Modified-Since": "Sat, 01 Oct 2016 00:00:00 GMT"})
+
+    def test_fetch_revalidated(self):
+        self.cache.store("http://www.example.com/", {"ETag": '"v1"'}, b"old")
+        session = self.mock_session(requests.codes.not_modified)
+
+        resp = self.cache.fetch(session, "http://www.example.com/")
+
+        session.get.assert_called_once_with(
+            "http://www.example.com/", headers={"If-None-Match": '"v1"'})
+        self.assertEqual(resp.status_code, requests.codes.ok)
+        self.assertEqual(resp.content, b"old")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
+
+    def test_fetch_modified(self):
+        self.cache.store("http://www.example.com/", {"ETag": '"v1"'}, b"old")
+        session = self.mock_session(
+            requests.codes.ok, b"new", {"ETag": '"v2"'})
+
+        resp = self.cache.fetch(session, "http://www.example.com/")
+
+        self.assertEqual(resp.content, b"new")
+        cached = self.cache.get("http://www.example.com/")
+        self.assertEqual((cached.content, cached.etag), (b"new", '"v2"'))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+
+    def test_fetch_not_found(self):
+        session = self.mock_session(
+            requests.codes.not_found, b"missing", {"ETag": '"v1"'})
+
+        resp = self.cache.fetch(session, "http://www.example.com/")
+
+        self.assertEqual(resp.status_code, requests.codes.not_found)
+        self.assertIsNone(self.cache.get("http://www.example.com/"))
+
+    def test_evict_least_recently_used(self):
+        for i in range(2):
+            self.cache.store("http://www.example.com/{0}".format(i),
+                             {"ETag": str(i)}, b"x" * 40)
+        self.cache.touch("http://www.example.com/0")
+
+        self.cache.store("http://www.example.com/2", {"ETag": "2"}, b"x" * 40)
+
+        self.assertEqual(self.cache.size(), 80)
+        self.assertIsNotNone(self.cache.get("http://www.example.com/0"))
+        self.assertIsNone(self.cache.get("http://www.example.com/1"))
+        self.assertIsNotNone(self.cache.get("http://www.example.com/2"))
+
+    def test_size(self):
+        self.cache.store("http://www.example.com/0", {"ETag": "0"}, b"x" * 40)
+        self.cache.store("http://www.example.com/1", {"ETag": "1"}, b"x" * 30)
+        self.assertEqual(self.cache.size(), 70)
+
+        # replacing a page only counts its new body
+        self.cache.store("http://www.example.com/0", {"ETag": "2"}, b"x" * 10)
+        self.assertEqual(self.cache.size(), 40)
+        self.cache.close()
+
+        reopened = cache.ResponseCache(self.path, max_size=100)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.size(), 40)
@@ -0,0 +1,95 @@
+import json
+import mock
+import os
+import requests
+import shutil
+import tempfile
+import testtools
+import uuid
+
+from seo_report import checkpoint
+from seo_report import website
+from seo_report.warnings import BADGES
+
+
+class CheckpointTests(testtools.TestCase):
+
+    def setUp(self):
+        super(CheckpointTests, self).setUp()
+
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.path = os.path.join(tempdir, "crawl.json")
+
+        self.site_url = "http://www.mock{0}.com".format(uuid.uuid4())
+
+    def test_save_load(self):
+        state = checkpoint.Checkpoint(self.path, interval=3600)
+        self.assertIsNone(state.load())
+        self.assertFalse(state.due())
+
+        state.save({"pages": [u"café"]})
+
+        self.assertEqual(state.load(), {"pages": [u"café"]})
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+        state.clear()
+        self.assertIsNone(state.load())
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_resume(self, mock_requests):
+        paths = ["/a", "/b", "/c", "/d"]
+        fetched = []
+        interrupt = ["/c"]
+
+        def mock_get(url, *args, **kwargs):
+            path = url[len(self.site_url):]
+            if path in interrupt:
+                interrupt.remove(path)
+                raise requests.exceptions.ConnectionError(url)
+
+            fetched.append(path)
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            resp.content = (
+                "<html><head><title>Page {0} of the website</title>"
+                "</head></html>").format(path)
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        def spider(resume):
+            wp = website.Spider(
+                self.site_url, None, resume=resume,
+                checkpoint=checkpoint.Checkpoint(self.path, interval=0))
+            wp.report = {"pages": []}
+            wp.pages_to_crawl = [self.site_url + path for path in paths]
+            return wp
+
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          spider(False).crawl)
+        self.assertIsNotNone(checkpoint.Checkpoint(self.path).load())
+
+        del fetched[:]
+        wp = spider(True)
+        report = json.loads(json.dumps(wp.crawl()))
+
+        # only the pages not crawled before the interruption are fetched
+        self.assertEqual(fetched, ["/c", "/d"])
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url + path for path in paths])
+        self.assertEqual(len(wp.titles), 4)
+        self.assertEqual(
+            len([earned for earned in report["site"]["achieved"]
+                 if earned["achievement"] == BADGES["ROBOTS.TXT"]]), 1)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_resume_other_site(self):
+        checkpoint.Checkpoint(self.path).save(
+            {"site": "http://www.drawbuildplay.com"})
+
+        wp = website.Spider(
+            self.site_url, None, resume=True,
+            checkpoint=checkpoint.Checkpoint(self.path))
+
+        self.assertRaises(ValueError, wp.crawl)
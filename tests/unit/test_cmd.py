@@ -2,11 +2,13 @@ import ddt
 import json
 import jsonschema
 import mock
+import six
 import sys
 import testtools
 import uuid
 
 from seo_report import cmd
+from seo_report import website
 
 
 @ddt.ddt
@@ -33,10 +35,82 @@ class CmdTests(testtools.TestCase):
         self.assertEqual(args.domain, domain)
         self.assertEqual(args.sitemap, sitemap)
 
+    @ddt.data(
+        ("--domain http://www.mock{0}.com", None),
+        ("--domain http://www.mock{0}.com --concurrency 8", 8),
+        ("--domain http://www.mock{0}.com -c 2", 2))
+    @ddt.unpack
+    def test_create_parser_concurrency(self, data, concurrency):
+        argv = data.format(uuid.uuid4()).split()
+
+        parser = cmd.create_parser()
+        args = parser.parse_args(argv)
+
+        self.assertEqual(args.concurrency, concurrency)
+
+    @ddt.data(
+        ("--domain http://www.mock{0}.com", "threads"),
+        ("--domain http://www.mock{0}.com --engine asyncio", "asyncio"),
+        ("--domain http://www.mock{0}.com -e threads", "threads"))
+    @ddt.unpack
+    def test_create_parser_engine(self, data, engine):
+        argv = data.format(uuid.uuid4()).split()
+
+        parser = cmd.create_parser()
+        args = parser.parse_args(argv)
+
+        self.assertEqual(args.engine, engine)
+
+    @ddt.data(
+        ("--domain http://www.mock{0}.com", "html.parser"),
+        ("--domain http://www.mock{0}.com --parser lxml", "lxml"),
+        ("--domain http://www.mock{0}.com --parser html5lib", "html5lib"))
+    @ddt.unpack
+    def test_create_parser_html_parser(self, data, html_parser):
+        argv = data.format(uuid.uuid4()).split()
+
+        parser = cmd.create_parser()
+        args = parser.parse_args(argv)
+
+        self.assertEqual(args.parser, html_parser)
+
+    def test_get_spider(self):
+        self.assertEqual(cmd.get_spider("threads"), website.Spider)
+
+    @testtools.skipIf(sys.version_info < (3, 6),
+                      "the asyncio engine requires Python 3.6+")
+    def test_get_spider_asyncio(self):
+        self.assertEqual(cmd.get_spider("asyncio").__name__, "AsyncSpider")
+
+    @ddt.data(("threads", None, 1), ("asyncio", None, 100),
+              ("asyncio", 8, 8))
+    @ddt.unpack
+    def test_get_concurrency(self, engine, concurrency, expected):
+        self.assertEqual(cmd.get_concurrency(engine, concurrency), expected)
+
+    @ddt.data(("threads", 8, 18), ("threads", 500, 1000),
+              ("asyncio", 500, 10))
+    @ddt.unpack
+    def test_pool_size(self, engine, concurrency, size):
+        self.assertEqual(cmd.pool_size(concurrency, engine), size)
+
+    @mock.patch('seo_report.cmd.get_spider')
+    def test_analyze_asyncio(self, mock_get_spider):
+        mock_get_spider.return_value.return_value.crawl.return_value = {}
+        domain = "http://www.mock{0}.com".format(uuid.uuid4())
+
+        cmd.analyze(domain, engine="asyncio", timeout=5, retries=1)
+
+        kwargs = mock_get_spider.return_value.call_args[1]
+        self.assertEqual(kwargs["concurrency"], 100)
+        self.assertEqual((kwargs["timeout"], kwargs["retries"]), (5, 1))
+
     @ddt.data(
         "",
         "--mysite http://www.mock{0}.com",
-        "--domain http://www.mock{0}.com --mymap /sitemap.xml")
+        "--domain http://www.mock{0}.com --mymap /sitemap.xml",
+        "--domain http://www.mock{0}.com --engine twisted",
+        "--domain http://www.mock{0}.com --parser sax")
     def test_create_parser_invalid_args(self, data):
         args = data.format(uuid.uuid4())
         argv = args.split()
@@ -44,7 +118,7 @@ class CmdTests(testtools.TestCase):
 
         self.assertRaises(SystemExit, parser.parse_args, argv)
 
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_analyze(self, mock_requests):
 
         domain = "http://www.mock{0}.com".format(uuid.uuid4())
@@ -56,15 +130,39 @@ class CmdTests(testtools.TestCase):
         self.assertTrue(jsonschema.Draft3Validator(
             self.report_schema).is_valid(report))
 
-    @ddt.data("--domain http://www.mock{0}.com")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_analyze_jsonl(self, mock_requests):
+        mock_requests.return_value.status_code = 200
+        mock_requests.return_value.content = (
+            "<html><head><title>A mocked website title</title></head></html>")
+
+        domain = "http://www.mock{0}.com".format(uuid.uuid4())
+        stream = six.StringIO()
+
+        result = cmd.analyze(domain, output_format="jsonl", stream=stream)
+
+        self.assertIsNone(result)
+        records = [json.loads(line)
+                   for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["page"]["url"], domain)
+        self.assertEqual(records[0]["page"]["title"],
+                         "A mocked website title")
+        self.assertIn("issues", records[1]["site"])
+
+    @ddt.data("--domain http://www.mock{0}.com",
+              "--domain http://www.mock{0}.com --stats")
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_main(self, data, mock_requests):
 
         sys.argv[1:] = data.format(uuid.uuid4()).split()
         cmd.main()
 
-    @ddt.data("--invalid http://www.mock{0}.com", "")
-    @mock.patch('seo_report.website.requests.get')
+    @ddt.data("--invalid http://www.mock{0}.com", "",
+              "--domain http://www.mock{0}.com --resume",
+              "--domain http://www.mock{0}.com --format jsonl "
+              "--checkpoint crawl.json --resume")
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_main_negative(self, data, mock_requests):
 
         sys.argv[1:] = data.format(uuid.uuid4()).split()
@@ -0,0 +1,94 @@
+import ddt
+import json
+import testtools
+import threading
+
+from seo_report import duplicates
+
+
+@ddt.ddt
+class DuplicatesTests(testtools.TestCase):
+
+    @ddt.data(u"The Home Page", u"  the home\tpage ", u"THE HOME\nPAGE")
+    def test_value_hash(self, value):
+        self.assertEqual(duplicates.normalize(value), u"the home page")
+        self.assertEqual(duplicates.value_hash(value),
+                         duplicates.value_hash(u"the home page"))
+        self.assertNotEqual(duplicates.value_hash(value),
+                            duplicates.value_hash(u"the about page"))
+
+    def test_describe(self):
+        self.assertEqual(duplicates.describe(u"Home", [u"/a", u"/b"]),
+                         u'"Home" previously used on pages: /a, /b')
+
+        previous = [u"/{0}".format(i) for i in range(duplicates.MAX_LISTED)]
+        value = duplicates.describe(u"Home", previous, 25)
+        self.assertIn(u"/9 and 15 more", value)
+        self.assertNotIn(u"/10", value)
+
+    @ddt.data(None, 1)
+    def test_add(self, max_keys):
+        registry = duplicates.DuplicateRegistry(max_keys=max_keys)
+
+        self.assertEqual(registry.add(u"Home", u"/"), ([], 0))
+        self.assertEqual(registry.add(u"About", u"/about"), ([], 0))
+        self.assertEqual(registry.add(u"home ", u"/index"), ([u"/"], 1))
+        self.assertEqual(registry.add(u"HOME", u"/start"),
+                         ([u"/", u"/index"], 2))
+
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.urls(u"Home"), [u"/", u"/index", u"/start"])
+        self.assertEqual(registry.urls(u"Contact"), [])
+        self.assertEqual(list(registry.duplicates()),
+                         [(u"home ", [u"/", u"/index", u"/start"])])
+
+        # spilled to disk as soon as more than one value is held
+        self.assertEqual(registry.db is not None, max_keys is not None)
+        registry.close()
+
+    def test_add_listed(self):
+        registry = duplicates.DuplicateRegistry()
+        for i in range(30):
+            previous, count = registry.add(u"Home", u"/{0}".format(i))
+
+        self.assertEqual(count, 29)
+        self.assertEqual(len(previous), duplicates.MAX_LISTED)
+        self.assertEqual(len(registry.urls(u"Home")), 30)
+
+    def test_add_threads(self):
+        registry = duplicates.DuplicateRegistry(shards=4, max_keys=200)
+
+        def add(thread):
+            for i in range(100):
+                registry.add(u"Title {0}".format(i),
+                             u"/{0}/{1}".format(thread, i))
+
+        threads = [threading.Thread(target=add, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(registry), 100)
+        for i in range(100):
+            self.assertEqual(
+                sorted(registry.urls(u"Title {0}".format(i))),
+                [u"/{0}/{1}".format(t, i) for t in range(8)])
+        self.assertEqual(len(list(registry.duplicates())), 100)
+
+    @ddt.data(None, 1)
+    def test_state(self, max_keys):
+        registry = duplicates.DuplicateRegistry(max_keys=max_keys)
+        registry.add(u"Home", u"/")
+        registry.add(u"About", u"/about")
+        registry.add(u"Home", u"/index")
+
+        restored = duplicates.DuplicateRegistry()
+        restored.restore(json.loads(json.dumps(registry.state())))
+
+        self.assertEqual(len(restored), 2)
+        self.assertEqual(restored.urls(u"About"), [u"/about"])
+        self.assertEqual(list(restored.duplicates()),
+                         [(u"Home", [u"/", u"/index"])])
+        self.assertEqual(restored.add(u"Home", u"/start"),
+                         ([u"/", u"/index"], 2))
@@ -0,0 +1,96 @@
+import ddt
+import testtools
+
+from seo_report import frontier
+
+
+@ddt.ddt
+class FrontierTests(testtools.TestCase):
+
+    @ddt.data(
+        ("http://www.drawbuildplay.com", "http://www.drawbuildplay.com/"),
+        ("HTTP://WWW.DrawBuildPlay.com/About",
+         "http://www.drawbuildplay.com/About"),
+        ("http://www.drawbuildplay.com:80/about#team",
+         "http://www.drawbuildplay.com/about"),
+        ("https://www.drawbuildplay.com:443/?q=1",
+         "https://www.drawbuildplay.com/?q=1"),
+        ("https://www.drawbuildplay.com:8443/ ",
+         "https://www.drawbuildplay.com:8443/"))
+    @ddt.unpack
+    def test_normalize_url(self, url, expected):
+        self.assertEqual(frontier.normalize_url(url), expected)
+
+    def test_add_deduplicates(self):
+        pages = frontier.Frontier()
+
+        self.assertTrue(pages.add("http://www.drawbuildplay.com"))
+        self.assertFalse(pages.add("http://www.drawbuildplay.com/"))
+        self.assertFalse(pages.add("http://www.drawbuildplay.com/#top"))
+        self.assertTrue(pages.add("http://www.drawbuildplay.com/about", 1))
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages.pop(), ("http://www.drawbuildplay.com", 0))
+        self.assertEqual(pages.pop(),
+                         ("http://www.drawbuildplay.com/about", 1))
+        self.assertIsNone(pages.pop())
+
+        # pages already crawled are not queued again
+        self.assertFalse(pages.add("http://www.drawbuildplay.com/about", 1))
+
+    def test_max_depth(self):
+        pages = frontier.Frontier(max_depth=1)
+
+        self.assertTrue(pages.add("http://www.drawbuildplay.com/a", 1))
+        self.assertFalse(pages.add("http://www.drawbuildplay.com/b", 2))
+        self.assertEqual(len(pages), 1)
+
+    def test_max_pages(self):
+        pages = frontier.Frontier(max_pages=2)
+        for i in range(5):
+            pages.add("http://www.drawbuildplay.com/{0}".format(i))
+
+        self.assertIsNotNone(pages.pop())
+        self.assertIsNotNone(pages.pop())
+        self.assertIsNone(pages.pop())
+
+    def test_add_source(self):
+        pages = frontier.Frontier()
+        consumed = []
+
+        def sitemap():
+            for i in range(3):
+                url = "http://www.drawbuildplay.com/{0}".format(i)
+                consumed.append(url)
+                yield url
+
+        pages.add("http://www.drawbuildplay.com/0")
+        pages.add_source(sitemap())
+
+        # the source is only read once the queue runs out
+        self.assertEqual(pages.pop()[0], "http://www.drawbuildplay.com/0")
+        self.assertEqual(consumed, [])
+
+        self.assertEqual(pages.pop()[0], "http://www.drawbuildplay.com/1")
+        self.assertEqual(len(consumed), 2)
+        self.assertEqual(pages.pop()[0], "http://www.drawbuildplay.com/2")
+        self.assertIsNone(pages.pop())
+
+    def test_state_restore(self):
+        pages = frontier.Frontier()
+        for i in range(4):
+            pages.add("http://www.drawbuildplay.com/{0}".format(i), i)
+
+        pages.done(pages.pop()[0])
+        pages.pop()
+
+        # pages popped but not done are queued again
+        restored = frontier.Frontier()
+        restored.restore(pages.state())
+
+        self.assertEqual(restored.popped, 1)
+        self.assertEqual(restored.pop(),
+                         ("http://www.drawbuildplay.com/1", 1))
+        self.assertEqual(restored.pop(),
+                         ("http://www.drawbuildplay.com/2", 2))
+        self.assertFalse(restored.add("http://www.drawbuildplay.com/0"))
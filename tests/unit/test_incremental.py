@@ -0,0 +1,101 @@
+import json
+import mock
+import os
+import requests
+import shutil
+import tempfile
+import testtools
+import uuid
+
+from seo_report import incremental
+from seo_report import webpage
+from seo_report import website
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+ANALYZE = webpage.Webpage.analyze
+
+
+class IncrementalTests(testtools.TestCase):
+
+    def setUp(self):
+        super(IncrementalTests, self).setUp()
+
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        self.path = os.path.join(tempdir, "audits.db")
+
+        self.store = incremental.AuditStore(self.path)
+        self.addCleanup(self.store.close)
+
+        self.site_url = "http://www.mock{0}.com".format(uuid.uuid4())
+
+    def test_content_digest(self):
+        digest = incremental.content_digest(u"<html></html>", "html.parser")
+
+        self.assertEqual(
+            digest, incremental.content_digest(b"<html></html>",
+                                               "html.parser"))
+        self.assertNotEqual(
+            digest, incremental.content_digest(u"<html> </html>",
+                                               "html.parser"))
+        self.assertNotEqual(
+            digest, incremental.content_digest(u"<html></html>", "lxml"))
+
+    def test_store(self):
+        url = self.site_url + "/"
+        self.assertIsNone(self.store.get(url, "abc"))
+
+        self.store.put(url, "abc", {"title": u"Title", "value": object})
+
+        self.assertEqual(self.store.get(url, "abc")["title"], u"Title")
+        self.assertIsNone(self.store.get(url, "def"))
+        self.assertEqual((self.store.reused, self.store.analyzed), (1, 2))
+
+    @mock.patch('seo_report.webpage.Webpage.analyze',
+                autospec=True)
+    @mock.patch('seo_report.website.requests.Session.get')
+    def crawl(self, pages, mock_requests, mock_analyze=None):
+        def mock_get(url, *args, **kwargs):
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            resp.content = pages.get(url[len(self.site_url):], "")
+            return resp
+
+        mock_requests.side_effect = mock_get
+        mock_analyze.side_effect = ANALYZE
+
+        spider = website.Spider(self.site_url, None, store=self.store)
+        spider.report = {"pages": []}
+        spider.pages_to_crawl = [self.site_url + path for path in pages]
+
+        report = json.loads(json.dumps(spider.crawl()))
+        return report, mock_analyze.call_count
+
+    def test_crawl_incremental(self):
+        html = ("<html><head><title>{0}</title></head>"
+                "<body><h1>Cats</h1><p>Cats chase mice</p></body></html>")
+        pages = {
+            "/a": html.format("The same title for all pages"),
+            "/b": html.format("A different title for page b"),
+        }
+
+        first, analyzed = self.crawl(pages)
+        self.assertEqual(analyzed, 2)
+
+        # unchanged pages are restored, page b now duplicates page a
+        pages["/b"] = pages["/a"]
+        second, analyzed = self.crawl(pages)
+        self.assertEqual(analyzed, 1)
+
+        again, analyzed = self.crawl(pages)
+        self.assertEqual(analyzed, 0)
+        self.assertEqual(again, second)
+
+        page_a, page_b = second["pages"]
+        self.assertEqual(page_a, first["pages"][0])
+        self.assertTrue(any(earned["achievement"] == BADGES["TITLE_UNIQUE"]
+                            for earned in page_a["achieved"]))
+        self.assertTrue(any(issue["warning"] == WARNINGS["TITLE_DUPLICATED"]
+                            for issue in page_b["issues"]))
+        self.assertEqual(page_b["keywords"], page_a["keywords"])
@@ -0,0 +1,56 @@
+import json
+import pickle
+import testtools
+
+from seo_report import issues
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+
+class IssuesTests(testtools.TestCase):
+
+    def test_issue(self):
+        issue = issues.Issue("BROKEN_LINK", "http://www.drawbuildplay.com/a")
+
+        # reads like the rendered dict
+        self.assertEqual(issue["warning"], WARNINGS["BROKEN_LINK"])
+        self.assertEqual(issue["value"], "http://www.drawbuildplay.com/a")
+        self.assertRaises(KeyError, issue.__getitem__, "achievement")
+        self.assertEqual(issue, {"warning": WARNINGS["BROKEN_LINK"],
+                                 "value": "http://www.drawbuildplay.com/a"})
+        self.assertNotEqual(issue, issues.Achievement("BROKEN_LINK",
+                                                      issue.value))
+        self.assertFalse(hasattr(issue, "__dict__"))
+
+    def test_achievement(self):
+        achievement = issues.Achievement("TITLE_LENGTH", 42)
+
+        self.assertEqual(achievement["achievement"], BADGES["TITLE_LENGTH"])
+        self.assertEqual(achievement.render(codes=True),
+                         {"achievement": "TITLE_LENGTH", "value": 42})
+
+    def test_render(self):
+        records = [issues.Issue("BROKEN_LINK", "/a"),
+                   issues.Issue("TITLE_MISSING")]
+
+        self.assertEqual(issues.render(records), [
+            {"warning": WARNINGS["BROKEN_LINK"], "value": "/a"},
+            {"warning": WARNINGS["TITLE_MISSING"], "value": None}])
+        self.assertEqual(issues.render(records, codes=True), [
+            {"warning": "BROKEN_LINK", "value": "/a"},
+            {"warning": "TITLE_MISSING", "value": None}])
+
+        # every code is listed along with the messages
+        messages = issues.messages()
+        for record in records:
+            self.assertEqual(messages["warnings"][record.code],
+                             record.message)
+
+    def test_dump_load(self):
+        records = [issues.Achievement("TITLE_LENGTH", 42),
+                   issues.Achievement("DESCRIPTION_LENGTH", 120)]
+
+        pairs = json.loads(json.dumps(issues.dump(records)))
+        self.assertEqual(issues.load(issues.Achievement, pairs), records)
+
+        self.assertEqual(pickle.loads(pickle.dumps(records)), records)
@@ -0,0 +1,109 @@
+import ddt
+import mock
+import requests
+import testtools
+
+from seo_report import links
+from seo_report import webpage
+from seo_report.warnings import WARNINGS
+
+
+@ddt.ddt
+class LinkCheckerTests(testtools.TestCase):
+
+    def setUp(self):
+        super(LinkCheckerTests, self).setUp()
+
+        self.checker = links.LinkChecker(concurrency=4)
+        self.addCleanup(self.checker.close)
+
+    @ddt.data(
+        (200, False),
+        (301, False),
+        (404, True),
+        (500, False))
+    @ddt.unpack
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_is_broken(self, status_code, broken, mock_head):
+        mock_head.return_value.status_code = status_code
+
+        self.assertEqual(
+            self.checker.is_broken("http://www.example.com/"), broken)
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_check_cached(self, mock_head):
+        mock_head.return_value.status_code = requests.codes.ok
+
+        urls = ["http://www.example.com/{0}".format(i % 5)
+                for i in range(50)]
+        results = [self.checker.check(url) for url in urls]
+
+        self.assertEqual(set(f.result() for f in results),
+                         set([requests.codes.ok]))
+        self.assertEqual(mock_head.call_count, 5)
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_shared_across_pages(self, mock_head):
+        mock_head.return_value.status_code = requests.codes.not_found
+        html = ("<html><a href='/missing.html'>Missing</a>"
+                "<a href='/missing.html'>Missing</a></html>")
+
+        for i in range(3):
+            wp = webpage.Webpage(
+                "https://www.drawbuildplay.com/page{0}.html".format(i),
+                html, {}, {}, link_checker=self.checker)
+            wp.report()
+
+            broken = [issue for issue in wp.issues
+                      if issue["warning"] == WARNINGS["BROKEN_LINK"]]
+            self.assertEqual(len(broken), 1)
+
+        mock_head.assert_called_once_with(
+            "https://www.drawbuildplay.com/missing.html")
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_politeness(self, mock_head):
+        mock_head.return_value.status_code = requests.codes.ok
+        scheduler = mock.MagicMock()
+        checker = links.LinkChecker(politeness=scheduler)
+        self.addCleanup(checker.close)
+
+        self.assertFalse(checker.is_broken("http://www.example.com/"))
+        scheduler.slot.assert_called_once_with("http://www.example.com/")
+
+    @ddt.data(True, False)
+    def test_close(self, shared):
+        session = mock.MagicMock() if shared else None
+        checker = links.LinkChecker(session=session)
+        session = checker.session = mock.MagicMock(wraps=checker.session)
+
+        checker.close()
+
+        # only the session created by the checker is closed with it
+        self.assertEqual(session.close.called, not shared)
+
+    @mock.patch('seo_report.links.LinkChecker.close')
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_page_link_checker_closed(self, mock_head, mock_close):
+        mock_head.return_value.status_code = requests.codes.ok
+        html = "<html><a href='/about.html'>About</a></html>"
+
+        wp = webpage.Webpage("https://www.drawbuildplay.com/", html, {}, {})
+        wp.report()
+
+        self.assertIsNone(wp.link_checker)
+        mock_close.assert_called_once_with()
+
+        # a checker shared across pages is left open
+        mock_close.reset_mock()
+        webpage.Webpage("https://www.drawbuildplay.com/", html, {}, {},
+                        link_checker=self.checker).report()
+        self.assertFalse(mock_close.called)
+
+    def test_offline_link_checker(self):
+        statuses = {"http://www.example.com/missing": requests.codes.not_found}
+        checker = links.OfflineLinkChecker(
+            lambda url: statuses.get(url, requests.codes.ok))
+
+        self.assertTrue(checker.is_broken("http://www.example.com/missing"))
+        self.assertFalse(checker.is_broken("http://www.example.com/"))
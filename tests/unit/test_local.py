@@ -0,0 +1,145 @@
+import ddt
+import io
+import json
+import mock
+import os
+import requests
+import shutil
+import tempfile
+import testtools
+
+from seo_report import cmd
+from seo_report import local
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+
+@ddt.ddt
+class LocalTests(testtools.TestCase):
+
+    def setUp(self):
+        super(LocalTests, self).setUp()
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        self.site_url = "http://www.example.com"
+        self.files = {
+            "index.html": "<html><head><title>Home</title></head><body>"
+                          "<a href='/about'>About us</a>"
+                          "<a href='/blog/'>Our blog</a>"
+                          "<a href='/missing.html'>Missing page</a>"
+                          "</body></html>",
+            "about/index.html": "<html><head><title>About</title></head>"
+                                "<body><a href='../'>Home page</a>"
+                                "</body></html>",
+            "blog/first post.html": "<html><head><title>Home</title>"
+                                    "</head></html>",
+            "blog/index.html": "<html><head><title>Blog</title></head>"
+                               "<body><a href='first%20post.html'>First "
+                               "post</a></body></html>",
+            "robots.txt": "User-agent: *\n",
+            "logo.png": "PNG",
+        }
+        for name, content in self.files.items():
+            path = os.path.join(self.root, *name.split("/"))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with io.open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+    @ddt.data(
+        ("index.html", "/"),
+        ("about/index.html", "/about/"),
+        ("blog/first post.html", "/blog/first%20post.html"))
+    @ddt.unpack
+    def test_url_path(self, name, path):
+        self.assertEqual(
+            local.url_path(self.root, os.path.join(self.root, name)), path)
+
+    @ddt.data(
+        ("/", "index.html"),
+        ("/about", "about/index.html"),
+        ("/about/", "about/index.html"),
+        ("/blog/first%20post.html", "blog/first post.html"),
+        ("/blog/first%20post", "blog/first post.html"),
+        ("/missing.html", None),
+        ("/../index.html", "index.html"),
+        ("/logo.png", "logo.png"))
+    @ddt.unpack
+    def test_file_path(self, path, name):
+        expected = None
+        if name is not None:
+            expected = os.path.join(self.root, *name.split("/"))
+
+        self.assertEqual(local.file_path(self.root, path), expected)
+
+    def test_walk(self):
+        self.assertEqual(list(local.walk(self.root)),
+                         ["/", "/about/", "/blog/first%20post.html",
+                          "/blog/"])
+
+    @ddt.data((1, None, False), (4, None, False), (2, 2, False),
+              (1, None, True))
+    @ddt.unpack
+    @mock.patch('seo_report.links.requests.Session.head')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl(self, concurrency, processes, follow_links, mock_get,
+                   mock_head):
+        spider = local.DirectorySpider(
+            self.site_url, self.root, concurrency=concurrency,
+            processes=processes, follow_links=follow_links)
+        report = spider.crawl()
+
+        # no request is made for the pages of the site
+        mock_get.assert_not_called()
+        mock_head.assert_not_called()
+
+        # the pages linked are analyzed in the order they are found
+        paths = ["/about/", "/blog/first%20post.html", "/blog/"]
+        if follow_links:
+            paths = ["/about", "/blog/", "/blog/first%20post.html"]
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url] +
+                         [self.site_url + path for path in paths])
+
+        home = report["pages"][0]
+        self.assertIn({"warning": WARNINGS["BROKEN_LINK"],
+                       "value": self.site_url + "/missing.html"},
+                      home["issues"])
+        self.assertEqual(
+            [issue for issue in home["issues"]
+             if issue["warning"] == WARNINGS["BROKEN_LINK"]],
+            [{"warning": WARNINGS["BROKEN_LINK"],
+              "value": self.site_url + "/missing.html"}])
+        self.assertTrue(any(
+            issue["warning"] == WARNINGS["TITLE_DUPLICATED"]
+            for issue in report["pages"][1 + paths.index(
+                "/blog/first%20post.html")]["issues"]))
+
+        self.assertIn({"achievement": BADGES["ROBOTS.TXT"], "value": None},
+                      report["site"]["achieved"])
+        self.assertIn({"achievement": BADGES["BLOG_DETECTED"],
+                       "value": self.site_url + "/blog"},
+                      report["site"]["achieved"])
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_link_checker(self, mock_head):
+        mock_head.return_value.status_code = requests.codes.not_found
+        checker = local.LocalLinkChecker("www.example.com", self.root)
+        self.addCleanup(checker.close)
+
+        self.assertFalse(checker.is_broken(self.site_url + "/about"))
+        self.assertTrue(checker.is_broken(self.site_url + "/contact"))
+
+        # links to other websites are still requested
+        self.assertTrue(checker.is_broken("http://www.other.com/"))
+        mock_head.assert_called_once_with("http://www.other.com/")
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_analyze(self, mock_head):
+        report = json.loads(cmd.analyze(self.site_url, directory=self.root,
+                                        concurrency=4, max_pages=2))
+
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url, self.site_url + "/about/"])
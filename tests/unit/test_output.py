@@ -0,0 +1,31 @@
+import json
+import six
+import testtools
+
+from seo_report import output
+
+
+class OutputTests(testtools.TestCase):
+
+    def test_json_lines_writer(self):
+        stream = six.StringIO()
+        writer = output.JsonLinesWriter(stream)
+
+        writer.write_page({"url": "http://www.drawbuildplay.com/",
+                           "issues": [], "title": u"Home\nPage"})
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+
+        writer.write_page({"url": "http://www.drawbuildplay.com/about",
+                           "issues": [], "title": u"About"})
+        writer.write_site({"issues": [], "achieved": []})
+        writer.write_messages({"warnings": {}, "achievements": {}})
+
+        records = [json.loads(line)
+                   for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0]["page"]["title"], u"Home\nPage")
+        self.assertEqual(records[1]["page"]["url"],
+                         "http://www.drawbuildplay.com/about")
+        self.assertEqual(records[2], {"site": {"issues": [], "achieved": []}})
+        self.assertEqual(records[3], {"messages": {"warnings": {},
+                                                   "achievements": {}}})
@@ -0,0 +1,185 @@
+import ddt
+import mock
+import requests
+import testtools
+import threading
+import uuid
+
+from seo_report import politeness
+from seo_report import website
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+ROBOTS = (b"User-agent: *\n"
+          b"Disallow: /private\n"
+          b"Crawl-delay: 2\n")
+
+
+def mock_session(status_code=requests.codes.ok, content=ROBOTS):
+    session = mock.MagicMock()
+    session.get.return_value.status_code = status_code
+    session.get.return_value.content = content
+    return session
+
+
+@ddt.ddt
+class PolitenessTests(testtools.TestCase):
+
+    def test_token_bucket(self):
+        now = [100.0]
+        bucket = politeness.TokenBucket(2, burst=2, clock=lambda: now[0])
+
+        # the burst is free, then callers queue half a second apart
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+        now[0] += 2.5
+        self.assertEqual(bucket.reserve(), 0)
+
+    @ddt.data(("http://www.drawbuildplay.com/", True),
+              ("http://www.drawbuildplay.com/private/page", False),
+              ("http://WWW.drawbuildplay.com/about", True))
+    @ddt.unpack
+    def test_allowed(self, url, allowed):
+        session = mock_session()
+        scheduler = politeness.Scheduler(session)
+
+        self.assertEqual(scheduler.allowed(url), allowed)
+        self.assertEqual(
+            scheduler.allowed("http://www.drawbuildplay.com/private"), False)
+
+        # robots.txt is fetched once per host
+        session.get.assert_called_once_with(
+            "http://www.drawbuildplay.com/robots.txt")
+
+    @ddt.data((requests.codes.not_found, True),
+              (requests.codes.forbidden, False),
+              (requests.codes.server_error, True))
+    @ddt.unpack
+    def test_allowed_status(self, status_code, allowed):
+        scheduler = politeness.Scheduler(mock_session(status_code))
+
+        self.assertEqual(
+            scheduler.allowed("http://www.drawbuildplay.com/private"),
+            allowed)
+
+    def test_robots_txt(self):
+        session = mock_session()
+        scheduler = politeness.Scheduler(session)
+
+        self.assertFalse(
+            scheduler.allowed("http://www.drawbuildplay.com/private"))
+        self.assertEqual(
+            scheduler.robots_txt("http://www.drawbuildplay.com"),
+            session.get.return_value)
+
+        # the response is reused, the rules were read from it
+        session.get.assert_called_once_with(
+            "http://www.drawbuildplay.com/robots.txt")
+
+    def test_robots_txt_outside_lock(self):
+        fetching = threading.Event()
+        release = threading.Event()
+        session = mock_session()
+
+        def slow_get(url, *args, **kwargs):
+            fetching.set()
+            release.wait(5)
+            return mock.DEFAULT
+
+        session.get.side_effect = slow_get
+        scheduler = politeness.Scheduler(session, rate=10)
+        thread = threading.Thread(
+            target=scheduler.allowed, args=("http://www.slow.com/",))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        fetching.wait(5)
+
+        # other hosts are scheduled while robots.txt is being fetched
+        self.assertEqual(scheduler.reserve("http://www.example.com/"), 0)
+        self.assertFalse(release.is_set())
+
+    def test_allowed_ignore_robots(self):
+        session = mock_session()
+        scheduler = politeness.Scheduler(session, obey_robots=False)
+
+        self.assertTrue(
+            scheduler.allowed("http://www.drawbuildplay.com/private"))
+        self.assertFalse(session.get.called)
+
+    def test_crawl_delay(self):
+        scheduler = politeness.Scheduler(mock_session(), rate=10)
+        scheduler.allowed("http://www.drawbuildplay.com/")
+
+        self.assertEqual(
+            scheduler.reserve("http://www.drawbuildplay.com/a"), 0)
+        self.assertAlmostEqual(
+            scheduler.reserve("http://www.drawbuildplay.com/b"), 2, 1)
+
+        # hosts without rules only get the configured rate
+        self.assertEqual(scheduler.reserve("http://www.example.com/"), 0)
+        self.assertAlmostEqual(
+            scheduler.reserve("http://www.example.com/"), 0.1, 1)
+
+    def test_reserve_unlimited(self):
+        scheduler = politeness.Scheduler(mock_session(), obey_robots=False)
+
+        for i in range(5):
+            self.assertEqual(
+                scheduler.reserve("http://www.drawbuildplay.com/"), 0)
+
+    def test_slot_max_connections(self):
+        scheduler = politeness.Scheduler(mock_session(), max_connections=1)
+        semaphore = scheduler._connections("http://www.drawbuildplay.com")
+
+        with scheduler.slot("http://www.drawbuildplay.com/a"):
+            self.assertFalse(semaphore.acquire(False))
+
+        self.assertTrue(semaphore.acquire(False))
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_skips_disallowed(self, mock_requests):
+        site_url = "http://www.mock{0}.com".format(uuid.uuid4())
+
+        def mock_get(url, *args, **kwargs):
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            if url.endswith("/robots.txt"):
+                resp.content = b"User-agent: *\nDisallow: /private\n"
+            else:
+                resp.content = (
+                    "<html><head><title>A mocked website title</title>"
+                    "</head></html>")
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        wp = website.Spider(site_url, None)
+        wp.politeness = politeness.Scheduler(wp.session)
+        wp.report = {"pages": []}
+        wp.pages_to_crawl = [site_url + "/", site_url + "/private/a"]
+        report = wp.crawl()
+
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [site_url + "/"])
+        self.assertIn({"warning": WARNINGS["ROBOTS_DISALLOWED"],
+                       "value": site_url + "/private/a"}, wp.issues)
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_robots_fetched_once(self, mock_requests):
+        site_url = "http://www.mock{0}.com".format(uuid.uuid4())
+        mock_requests.return_value.status_code = requests.codes.ok
+        mock_requests.return_value.content = ROBOTS
+
+        wp = website.Spider(site_url, None)
+        wp.politeness = politeness.Scheduler(wp.session)
+        wp.crawl()
+
+        self.assertTrue(any(earned["achievement"] == BADGES["ROBOTS.TXT"]
+                            for earned in wp.achieved))
+        self.assertEqual(
+            [c[0][0] for c in mock_requests.call_args_list].count(
+                site_url + "/robots.txt"), 1)
@@ -0,0 +1,36 @@
+import ddt
+import mock
+import testtools
+
+from seo_report import sessions
+
+
+@ddt.ddt
+class SessionsTests(testtools.TestCase):
+
+    @ddt.data("http://www.example.com", "https://www.example.com")
+    def test_create_session(self, url):
+        session = sessions.create_session(pool_size=4, retries=2, timeout=5)
+        adapter = session.get_adapter(url)
+
+        self.assertIsInstance(adapter, sessions.TimeoutHTTPAdapter)
+        self.assertEqual(adapter.timeout, 5)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(session.headers["Connection"], "keep-alive")
+
+    def test_create_session_no_keep_alive(self):
+        session = sessions.create_session(keep_alive=False)
+
+        self.assertEqual(session.headers["Connection"], "close")
+
+    @ddt.data((None, 7), (2, 2))
+    @ddt.unpack
+    @mock.patch('requests.adapters.HTTPAdapter.send')
+    def test_adapter_timeout(self, timeout, expected, mock_send):
+        adapter = sessions.TimeoutHTTPAdapter(timeout=7)
+        request = mock.MagicMock()
+
+        adapter.send(request, timeout=timeout)
+
+        mock_send.assert_called_once_with(request, timeout=expected)
@@ -0,0 +1,69 @@
+import ddt
+import json
+import random
+import testtools
+
+from seo_report import similarity
+
+
+@ddt.ddt
+class SimilarityTests(testtools.TestCase):
+
+    def setUp(self):
+        super(SimilarityTests, self).setUp()
+
+        self.rand = random.Random(0)
+        self.words = [u"word{0}".format(i) for i in range(2000)]
+
+    def text(self, length=500):
+        return [self.rand.choice(self.words) for _ in range(length)]
+
+    def edit(self, tokens, changes):
+        tokens = list(tokens)
+        for _ in range(changes):
+            tokens[self.rand.randrange(len(tokens))] = \
+                self.rand.choice(self.words)
+
+        return tokens
+
+    def test_minhash(self):
+        tokens = self.text()
+
+        signature = similarity.minhash(tokens)
+        self.assertEqual(len(signature), similarity.NUM_PERM)
+        self.assertEqual(similarity.minhash(list(tokens)), signature)
+
+        # too short to have a single shingle
+        self.assertIsNone(similarity.minhash(tokens[:2]))
+        self.assertIsNotNone(similarity.minhash(tokens[:3]))
+
+    @ddt.data((5, 0.8, 1.0), (100, 0.3, 0.75), (500, 0.0, 0.2))
+    @ddt.unpack
+    def test_similarity(self, changes, low, high):
+        tokens = self.text()
+
+        estimate = similarity.similarity(
+            similarity.minhash(tokens),
+            similarity.minhash(self.edit(tokens, changes)))
+
+        self.assertTrue(low <= estimate <= high, estimate)
+
+    def test_clusters(self):
+        index = similarity.NearDuplicateIndex()
+        first, second = self.text(), self.text()
+
+        pages = [("/a", first), ("/b", second),
+                 ("/c", self.edit(first, 3)), ("/d", self.text()),
+                 ("/e", self.edit(second, 2)), ("/f", list(first)),
+                 ("/g", self.edit(first, 200))]
+        for url, tokens in pages:
+            index.add(url, similarity.minhash(tokens))
+
+        self.assertEqual(len(index), len(pages))
+        self.assertEqual(index.clusters(),
+                         [["/a", "/c", "/f"], ["/b", "/e"]])
+
+        # the index is rebuilt the same from its state
+        restored = similarity.NearDuplicateIndex()
+        restored.restore(json.loads(json.dumps(index.state())))
+        self.assertEqual(restored.clusters(), index.clusters())
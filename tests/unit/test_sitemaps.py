@@ -0,0 +1,100 @@
+import ddt
+import gzip
+import io
+import mock
+import requests
+import testtools
+
+from seo_report import sitemaps
+
+URLSET = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    b'<url><loc>http://www.drawbuildplay.com/</loc></url>'
+    b'<url><loc> http://www.drawbuildplay.com/about </loc>'
+    b'<lastmod>2016-01-01</lastmod></url>'
+    b'<url><loc>http://www.drawbuildplay.com/?a=1&amp;b=2</loc></url>'
+    b'</urlset>')
+
+LOCATIONS = [
+    "http://www.drawbuildplay.com/",
+    "http://www.drawbuildplay.com/about",
+    "http://www.drawbuildplay.com/?a=1&b=2"
+]
+
+
+def gzipped(content):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+        f.write(content)
+    return buf.getvalue()
+
+
+def chunked(content, size):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+@ddt.ddt
+class SitemapsTests(testtools.TestCase):
+
+    @ddt.data(1, 7, 4096)
+    def test_parse_locations(self, size):
+        locations = sitemaps.parse_locations(chunked(URLSET, size))
+
+        self.assertEqual(list(locations), LOCATIONS)
+
+    @ddt.data(1, 7, 4096)
+    def test_parse_locations_gzip(self, size):
+        locations = sitemaps.parse_locations(chunked(gzipped(URLSET), size))
+
+        self.assertEqual(list(locations), LOCATIONS)
+
+    def test_parser_sitemap_index(self):
+        parser = sitemaps.SitemapParser()
+        locations = parser.feed(
+            b"<sitemapindex><sitemap><loc>/a.xml</loc></sitemap>"
+            b"<sitemap><loc>/b.xml.gz</loc></sitemap></sitemapindex>")
+        locations.extend(parser.close())
+
+        self.assertEqual(locations,
+                         [("sitemap", "/a.xml"), ("sitemap", "/b.xml.gz")])
+        self.assertIsNone(parser.error)
+
+    @ddt.data(b"<urlset></set>", b"\x1f\x8bnot gzip", b"not xml")
+    def test_parser_invalid(self, content):
+        parser = sitemaps.SitemapParser()
+        parser.feed(content)
+        parser.close()
+
+        self.assertIsNotNone(parser.error)
+
+    def test_sitemap_follows_index(self):
+        bodies = {
+            "http://www.drawbuildplay.com/sitemap.xml":
+            b"<sitemapindex><sitemap><loc>/pages.xml.gz</loc></sitemap>"
+            b"<sitemap><loc>/sitemap.xml</loc></sitemap>"
+            b"<sitemap><loc>/broken.xml</loc></sitemap>"
+            b"<sitemap><loc>/missing.xml</loc></sitemap></sitemapindex>",
+            "http://www.drawbuildplay.com/pages.xml.gz": gzipped(URLSET),
+            "http://www.drawbuildplay.com/broken.xml": b"<urlset></set>",
+        }
+
+        def mock_get(url, stream=False):
+            resp = mock.MagicMock()
+            if url in bodies:
+                resp.status_code = requests.codes.ok
+                resp.iter_content.return_value = chunked(bodies[url], 10)
+            else:
+                resp.status_code = requests.codes.not_found
+            return resp
+
+        session = mock.MagicMock()
+        session.get.side_effect = mock_get
+
+        sitemap = sitemaps.Sitemap(
+            session, "http://www.drawbuildplay.com/sitemap.xml")
+
+        self.assertEqual(list(sitemap), LOCATIONS)
+        self.assertEqual(sitemap.invalid,
+                         ["http://www.drawbuildplay.com/broken.xml"])
+        self.assertEqual(session.get.call_count, 4)
@@ -0,0 +1,79 @@
+import mock
+import requests
+import testtools
+import uuid
+
+from seo_report import stats
+from seo_report import website
+
+
+class StatsTests(testtools.TestCase):
+
+    def setUp(self):
+        super(StatsTests, self).setUp()
+
+        self.now = [10.0]
+        self.stats = stats.CrawlStats(clock=lambda: self.now[0])
+
+    def test_timed(self):
+        with stats.timed(self.stats, "parse"):
+            self.now[0] += 0.5
+        with stats.timed(self.stats, "parse"):
+            self.now[0] += 0.25
+
+        # nothing is recorded when the crawl doesn't collect stats
+        with stats.timed(None, "parse"):
+            self.now[0] += 1
+
+        self.assertEqual(self.stats.timings["parse"], 0.75)
+        self.assertEqual(self.stats.calls["parse"], 2)
+
+    def test_summary(self):
+        self.stats.incr("pages", 4)
+        self.stats.incr("bytes", 1024)
+        self.stats.add_time("fetch", 1.5)
+        self.now[0] += 2
+        self.stats.finish()
+        self.now[0] += 10
+
+        summary = self.stats.summary()
+
+        self.assertEqual(summary["elapsed"], 2)
+        self.assertEqual(summary["pages_per_second"], 2)
+        self.assertEqual(summary["phases"],
+                         {"fetch": {"seconds": 1.5, "calls": 1}})
+        self.assertEqual(summary["counters"], {"pages": 4, "bytes": 1024})
+        self.assertGreater(summary["peak_rss_mb"], 0)
+
+    def test_format(self):
+        self.stats.add_time("fetch", 0.5)
+        self.stats.add_time("parse", 2.0)
+        self.stats.incr("pages", 3)
+
+        lines = self.stats.format().splitlines()
+
+        # slowest phases come first
+        self.assertTrue(lines[1].startswith("parse"))
+        self.assertTrue(lines[2].startswith("fetch"))
+        self.assertIn("pages", self.stats.format())
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl(self, mock_requests):
+        mock_requests.return_value.status_code = requests.codes.ok
+        mock_requests.return_value.content = (
+            "<html><head><title>A mocked website title</title></head></html>")
+        crawl_stats = stats.CrawlStats()
+
+        wp = website.Spider("http://www.mock{0}.com".format(uuid.uuid4()),
+                            None, stats=crawl_stats)
+        wp.report = {"pages": []}
+        wp.crawl()
+
+        self.assertEqual(crawl_stats.counters["pages"], 1)
+        self.assertEqual(crawl_stats.counters["requests"], 1)
+        self.assertEqual(crawl_stats.counters["bytes"], len(
+            mock_requests.return_value.content))
+        for phase in ("fetch", "analyze", "parse", "_analyze_title",
+                      "_analyze_links", "_analyze_duplicates"):
+            self.assertEqual(crawl_stats.calls[phase], 1, phase)
+        self.assertIsNotNone(crawl_stats.finished)
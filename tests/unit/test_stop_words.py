@@ -1,3 +1,7 @@
+import io
+import os
+import shutil
+import tempfile
 import testtools
 
 from seo_report import stop_words
@@ -17,3 +21,32 @@ class StopWordsTests(testtools.TestCase):
         self.assertTrue("looks" in words)
         self.assertTrue("zero" in words)
         self.assertEqual(len(words), 635)
+
+    def test_stopwords_index(self):
+        index = stop_words.get_stop_words()
+
+        self.assertIsInstance(index, frozenset)
+        self.assertEqual(index, frozenset(stop_words.ENGLISH_STOP_WORDS))
+        self.assertEqual(stop_words.get_stop_words("English"), index)
+
+    def test_register_stop_words(self):
+        index = stop_words.register_stop_words(
+            "mock", ["Le ", "la", "", "les"])
+
+        self.assertEqual(index, frozenset(["le", "la", "les"]))
+        self.assertEqual(stop_words.get_stop_words("mock"), index)
+
+    def test_load_stop_words(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        filename = os.path.join(tempdir, "french.txt")
+        with io.open(filename, "w", encoding="utf-8") as f:
+            f.write(u"# French stop words\nle\nla\nd\u00e9j\u00e0\n\n")
+
+        index = stop_words.load_stop_words(filename, "french")
+
+        self.assertEqual(index, frozenset([u"le", u"la", u"d\u00e9j\u00e0"]))
+        self.assertEqual(stop_words.get_stop_words("french"), index)
+
+    def test_get_stop_words_unknown(self):
+        self.assertRaises(ValueError, stop_words.get_stop_words, "klingon")
@@ -0,0 +1,189 @@
+import ddt
+import gzip
+import io
+import json
+import mock
+import os
+import shutil
+import sys
+import tempfile
+import testtools
+import zlib
+
+from seo_report import cmd
+from seo_report import warc
+from seo_report.warnings import BADGES
+from seo_report.warnings import WARNINGS
+
+
+def warc_record(url, http_response, warc_type=b"response",
+                content_type=b"application/http; msgtype=response"):
+    return (
+        b"WARC/1.0\r\n"
+        b"WARC-Type: " + warc_type + b"\r\n"
+        b"WARC-Target-URI: " + url + b"\r\n"
+        b"Content-Type: " + content_type + b"\r\n"
+        b"Content-Length: " + str(len(http_response)).encode() + b"\r\n"
+        b"\r\n" + http_response + b"\r\n\r\n")
+
+
+def http_response(status, body, content_type=b"text/html", headers=b""):
+    return (
+        b"HTTP/1.1 " + status + b"\r\n"
+        b"Content-Type: " + content_type + b"\r\n" + headers +
+        b"\r\n" + body)
+
+
+def page(title, *hrefs):
+    return (b"<html><head><title>" + title + b"</title></head><body>" +
+            b"".join(b"<a href='" + href + b"'>" + href + b"</a>"
+                     for href in hrefs) +
+            b"</body></html>")
+
+
+@ddt.ddt
+class WarcTests(testtools.TestCase):
+
+    def setUp(self):
+        super(WarcTests, self).setUp()
+
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+        self.site_url = "http://www.example.com"
+        self.records = [
+            warc_record(b"http://www.example.com/robots.txt", http_response(
+                b"200 OK", b"User-agent: *\n", content_type=b"text/plain")),
+            warc_record(b"http://www.example.com/", b"",
+                        warc_type=b"request"),
+            warc_record(b"http://www.example.com/", http_response(
+                b"200 OK", page(b"Home", b"/about", b"/missing",
+                                b"/not-archived"))),
+            warc_record(b"http://www.example.com/about", http_response(
+                b"200 OK", page(b"Home", b"/"))),
+            warc_record(b"http://www.example.com/about", http_response(
+                b"200 OK", page(b"About again"))),
+            warc_record(b"http://www.example.com/logo.png", http_response(
+                b"200 OK", b"\x89PNG", content_type=b"image/png")),
+            warc_record(b"http://www.example.com/old", http_response(
+                b"301 Moved Permanently", b"")),
+            warc_record(b"http://www.example.com/missing", http_response(
+                b"404 Not Found", b"Not Found")),
+            warc_record(b"http://www.other.com/", http_response(
+                b"200 OK", page(b"Other"))),
+        ]
+
+    def write_archive(self, name, gzipped=False):
+        path = os.path.join(self.tempdir, name)
+        with io.open(path, "wb") as f:
+            for record in self.records:
+                # gzipped archives compress each record on its own
+                if gzipped:
+                    record = gzip_member(record)
+                f.write(record)
+
+        return path
+
+    @ddt.data(False, True)
+    def test_captures(self, gzipped):
+        path = self.write_archive("site.warc", gzipped)
+
+        captures = list(warc.captures([path]))
+
+        self.assertEqual(len(captures), len(self.records) - 1)
+        self.assertEqual(captures[0].url, self.site_url + "/robots.txt")
+        self.assertEqual(captures[0].content, b"User-agent: *\n")
+        self.assertEqual(captures[1].status_code, 200)
+        self.assertEqual(captures[1].headers["content-type"], "text/html")
+        self.assertEqual(
+            warc.statuses([path])[self.site_url + "/missing"], 404)
+
+    def test_captures_not_http(self):
+        self.records[1:1] = [
+            warc_record(b"dns:www.example.com",
+                        b"20161001000000\r\nwww.example.com. 300 IN A "
+                        b"93.184.216.34\r\n", content_type=b"text/dns"),
+            warc_record(b"http://www.example.com/truncated", b"HTTP/1.1"),
+        ]
+        path = self.write_archive("site.warc")
+
+        captures = list(warc.captures([path]))
+
+        self.assertEqual(len(captures), len(self.records) - 3)
+        self.assertNotIn(self.site_url + "/truncated",
+                         [capture.url for capture in captures])
+
+    def test_parse_response_invalid(self):
+        self.assertRaises(ValueError, warc.parse_response, b"HTTP/1.1")
+        self.assertRaises(ValueError, warc.parse_response, b"")
+
+    def test_parse_response_encoded(self):
+        body = page(b"Home")
+        compressed = zlib.compress(body)
+        chunked = (b"5\r\n" + compressed[:5] + b"\r\n" +
+                   "{0:x}".format(len(compressed) - 5).encode() + b"\r\n" +
+                   compressed[5:] + b"\r\n0\r\n\r\n")
+
+        status_code, headers, content = warc.parse_response(http_response(
+            b"200 OK", chunked, headers=b"Transfer-Encoding: chunked\r\n"
+                                        b"Content-Encoding: deflate\r\n"))
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(content, body)
+
+    def test_invalid_archive(self):
+        path = os.path.join(self.tempdir, "invalid.warc")
+        with io.open(path, "wb") as f:
+            f.write(b"<html></html>")
+
+        self.assertRaises(ValueError, list, warc.captures([path]))
+
+    @ddt.data(None, 2)
+    def test_crawl(self, processes):
+        path = self.write_archive("site.warc.gz", gzipped=True)
+
+        spider = warc.WarcSpider(self.site_url, [path], processes=processes)
+        with mock.patch('seo_report.links.requests.Session.head') as head:
+            report = spider.crawl()
+        head.assert_not_called()
+
+        # only the html pages of the site are analyzed, once each
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url + "/", self.site_url + "/about"])
+        self.assertIn({"warning": WARNINGS["BROKEN_LINK"],
+                       "value": self.site_url + "/missing"},
+                      report["pages"][0]["issues"])
+        self.assertTrue(any(
+            issue["warning"] == WARNINGS["TITLE_DUPLICATED"]
+            for issue in report["pages"][1]["issues"]))
+
+        site = report["site"]
+        self.assertIn({"warning": WARNINGS["BROKEN_LINK"],
+                       "value": self.site_url + "/missing"}, site["issues"])
+        self.assertIn({"achievement": BADGES["ROBOTS.TXT"], "value": None},
+                      site["achieved"])
+        self.assertIn({"warning": WARNINGS["BLOG_MISSING"], "value": None},
+                      site["issues"])
+
+    def test_main(self):
+        path = self.write_archive("site.warc")
+
+        stdout = sys.stdout
+        self.addCleanup(setattr, sys, "stdout", stdout)
+        sys.stdout = io.StringIO() if sys.version_info[0] > 2 \
+            else io.BytesIO()
+        sys.argv[1:] = ["--domain", self.site_url, "--warc", path,
+                        "--max-pages", "1"]
+        cmd.main()
+
+        report = json.loads(sys.stdout.getvalue())
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url + "/"])
+
+
+def gzip_member(data):
+    stream = io.BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode="wb") as f:
+        f.write(data)
+
+    return stream.getvalue()
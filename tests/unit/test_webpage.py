@@ -1,7 +1,10 @@
 import bs4
 import ddt
+import json
+import mock
 import testtools
 
+from seo_report import similarity
 from seo_report import webpage
 from seo_report.warnings import BADGES
 from seo_report.warnings import WARNINGS
@@ -122,3 +125,145 @@ class WebpageTests(testtools.TestCase):
                             WARNINGS[expected_error],
                             self.titles,
                             self.descriptions))
+
+    def test_page_text_extracted_once(self):
+        html = ("<html><head><title>Cats</title></head><body>"
+                "<h1>Cats and dogs</h1><p>Cats chase mice, dogs chase "
+                "cats.</p><script>var cats = 1;</script></body></html>")
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com",
+            html,
+            self.titles,
+            self.descriptions)
+
+        soup = self.soup_file(html)
+        soup.findAll = mock.MagicMock(wraps=soup.findAll)
+
+        keywords = self.wp._get_keywords(soup)
+        self.wp._analyze_keywords(soup)
+        self.wp._analyze_wordcount(soup)
+
+        self.assertEqual(
+            soup.findAll.call_args_list.count(mock.call(text=True)), 1)
+        self.assertEqual(keywords, [("cats", 3), ("dogs", 2), ("chase", 2),
+                                    ("mice", 1)])
+        self.assertEqual(self.wp.keywords, keywords)
+        self.assertEqual(self.wp.page_text.tokens, [
+            "cats", "dogs", "cats", "chase", "mice", "dogs", "chase", "cats"])
+        self.assertTrue(any(issue["value"] == "You have 8 words."
+                            for issue in self.wp.issues))
+
+    def test_get_keywords_copy(self):
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com",
+            "",
+            self.titles,
+            self.descriptions)
+
+        soup = self.soup_file("<p>red green blue cyan pink gray black</p>")
+        keywords = self.wp._get_keywords(soup)
+        del keywords[1:]
+
+        self.assertEqual(len(self.wp._get_keywords(soup)), 7)
+
+    def test_custom_stop_words(self):
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com",
+            "",
+            self.titles,
+            self.descriptions,
+            stop_words=frozenset(["le", "chat"]))
+
+        self.assertEqual(self.wp.tokenize("Le chat noir and the dog"),
+                         ["noir", "and", "the", "dog"])
+
+    @ddt.data(*webpage.PARSERS)
+    def test_parser(self, parser):
+        if bs4.builder.builder_registry.lookup(parser) is None:
+            self.skipTest("{0} is not installed".format(parser))
+
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com",
+            "<html><head><title>Parsing with any backend</title></head>"
+            "<body><h1>Parsers</h1></body></html>",
+            self.titles,
+            self.descriptions,
+            parser=parser)
+
+        page_report = self.wp.report()
+
+        self.assertEqual(page_report["title"], "Parsing with any backend")
+        self.assertEqual(self.wp.headers, ["Parsers"])
+
+    def test_snapshot_restore(self):
+        html = ("<html><head><title>The cat in the hat</title>"
+                "<meta name='description' content='One fish, two fish' />"
+                "</head><body><h1>Cats</h1><p>Cats and hats</p>"
+                "<a href='mailto:me@drawbuildplay.com'>Mail</a>"
+                "</body></html>")
+
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com", html, {}, {})
+        self.wp.analyze()
+        snapshot = self.wp.snapshot()
+        expected = self.wp.complete()
+
+        restored = webpage.Webpage(
+            "https://www.drawbuildplay.com", None, {}, {})
+        restored.restore(snapshot)
+
+        self.assertEqual(restored.complete(), expected)
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    def test_analyze_page(self, mock_head):
+        mock_head.return_value.status_code = 404
+        html = ("<html><head><title>The cat in the hat</title>"
+                "<meta name='keywords' content='cats, hats' /></head>"
+                "<body><a href='/broken'>Broken</a></body></html>")
+
+        snapshot = webpage.analyze_page("https://www.drawbuildplay.com", html)
+
+        # links are not verified until the page is completed
+        self.assertFalse(mock_head.called)
+        self.assertEqual(snapshot["links"],
+                         ["https://www.drawbuildplay.com/broken"])
+
+        page = webpage.Webpage(
+            "https://www.drawbuildplay.com", None, self.titles, {})
+        page.restore(snapshot)
+        page_report = page.complete()
+
+        self.assertTrue(any(issue["warning"] == WARNINGS["BROKEN_LINK"]
+                            for issue in page_report["issues"]))
+        self.assertEqual(self.titles["The cat in the hat"],
+                         "https://www.drawbuildplay.com")
+
+    def test_analyze_fingerprint(self):
+        html = ("<html><head><title>Cats</title></head><body>"
+                "<p>Cats chase mice around the garden every night</p>"
+                "</body></html>")
+
+        snapshot = webpage.analyze_page("https://www.drawbuildplay.com", html)
+        page = webpage.Webpage(
+            "https://www.drawbuildplay.com/copy", None, {}, {})
+        page.restore(json.loads(json.dumps(snapshot)))
+
+        self.assertEqual(len(page.fingerprint), similarity.NUM_PERM)
+        self.assertEqual(list(page.fingerprint), snapshot["fingerprint"])
+
+    def test_analyze_releases_page(self):
+        self.wp = webpage.Webpage(
+            "https://www.drawbuildplay.com",
+            "<html><head><title>Released once analyzed</title></head>"
+            "<body><h1>Cats</h1><p>Cats chase mice</p></body></html>",
+            self.titles,
+            self.descriptions)
+
+        with mock.patch.object(bs4.BeautifulSoup, "decompose") as decompose:
+            self.wp.analyze()
+
+        decompose.assert_called_once_with()
+        self.assertIsNone(self.wp.html)
+        self.assertIsNone(self.wp.page_text)
+        self.assertEqual(self.wp.complete()["title"],
+                         "Released once analyzed")
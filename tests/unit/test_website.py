@@ -1,10 +1,12 @@
 import ddt
 import mock
 import requests
+import sqlite3
 import testtools
 import uuid
 
 from bs4 import BeautifulSoup as Soup
+from six.moves.urllib import parse
 
 from seo_report import website
 from seo_report.warnings import WARNINGS
@@ -25,8 +27,16 @@ class WebsiteTests(testtools.TestCase):
         self.assertEqual(len(wp.pages_to_crawl), 1)
         self.assertEqual(wp.pages_to_crawl[0], self.site_url)
 
+    def test_init_report(self):
+        # every spider reports its own pages
+        wp = website.Spider(self.site_url, None)
+        wp.report["pages"].append({"url": self.site_url})
+
+        self.assertEqual(website.Spider(self.site_url, None).report,
+                         {"pages": []})
+
     @ddt.file_data("data_sitemap_positive.json")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_init_sitemap_positive(self, sitemap_content, mock_requests):
         sitemap_url = "/sitemap.xml"
 
@@ -38,7 +48,7 @@ class WebsiteTests(testtools.TestCase):
         self.assertTrue(self.site_url in wp.pages_to_crawl)
 
     @ddt.file_data("data_sitemap_negative.json")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_init_sitemap_negative(self, sitemap_content, mock_requests):
         sitemap_url = "/sitemap.xml"
 
@@ -61,7 +71,7 @@ class WebsiteTests(testtools.TestCase):
         self.assertEqual(len(locations), len(urls))
 
     @ddt.file_data("data_webpage.json")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_crawl(self, data, mock_requests):
         wp = website.Spider(self.site_url, None)
         wp._analyze_crawlers = mock.MagicMock(name="_analyze_crawlers")
@@ -86,7 +96,7 @@ class WebsiteTests(testtools.TestCase):
                             "{0} not raised.".format(WARNINGS["SERVER_ERROR"]))
 
     @ddt.data("200", "404", "500")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_analyze_crawlers(self, resp_code, mock_requests):
         mock_requests.return_value.status_code = int(resp_code)
 
@@ -103,7 +113,7 @@ class WebsiteTests(testtools.TestCase):
                             "{0} not raised.".format(WARNINGS["ROBOTS.TXT"]))
 
     @ddt.data("200", "404", "500")
-    @mock.patch('seo_report.website.requests.get')
+    @mock.patch('seo_report.website.requests.Session.get')
     def test_analyze_blog(self, resp_code, mock_requests):
         mock_requests.return_value.status_code = int(resp_code)
 
@@ -120,3 +130,319 @@ class WebsiteTests(testtools.TestCase):
                 any(issue["warning"] == WARNINGS["BLOG_MISSING"]
                     for issue in wp.issues),
                 "{0} not raised.".format(WARNINGS["BLOG_MISSING"]))
+
+    @ddt.data((1, None), (4, None), (2, 2))
+    @ddt.unpack
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_concurrency(self, concurrency, processes, mock_requests):
+        pages = ["/", "/about", "/contact", "/about-us", "/404"]
+        html = "<html><head><title>{0}</title></head></html>"
+        titles = {
+            "/": "The home of the mock website",
+            "/about": "All about the mock website",
+            "/contact": "The home of the mock website",
+            "/about-us": "All about the mock website",
+        }
+
+        def mock_get(url, *args, **kwargs):
+            path = url[len(self.site_url):]
+            resp = mock.MagicMock()
+            if path in titles:
+                resp.status_code = requests.codes.ok
+                resp.content = html.format(titles[path])
+            else:
+                resp.status_code = requests.codes.not_found
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        wp = website.Spider(self.site_url, None, concurrency=concurrency,
+                            processes=processes)
+        wp.report = {"pages": []}
+        wp.pages_to_crawl = [self.site_url + p for p in pages]
+        report = wp.crawl()
+
+        # pages are reported in crawl order regardless of concurrency
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url + p for p in pages[:-1]])
+
+        # every page using a title is kept, later pages are duplicates
+        self.assertEqual(wp.titles.urls(titles["/"]),
+                         [self.site_url + "/", self.site_url + "/contact"])
+        self.assertEqual(
+            wp.titles.urls(titles["/about"]),
+            [self.site_url + "/about", self.site_url + "/about-us"])
+        for page in report["pages"][2:]:
+            self.assertTrue(any(issue["warning"] == WARNINGS[
+                "TITLE_DUPLICATED"] for issue in page["issues"]))
+
+        # the site lists all the pages of each duplicated title
+        self.assertIn(u'"{0}" used on pages: {1}/, {1}/contact'.format(
+            titles["/"], self.site_url),
+            [issue["value"] for issue in wp.issues
+             if issue["warning"] == WARNINGS["TITLE_DUPLICATED"]])
+
+        self.assertTrue(any(issue["warning"] == WARNINGS["BROKEN_LINK"]
+                            for issue in wp.issues))
+
+    @mock.patch('seo_report.duplicates.DuplicateRegistry.close')
+    @mock.patch('seo_report.links.LinkChecker.close')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_closes_link_checker(self, mock_requests, mock_close,
+                                       mock_registry_close):
+        mock_requests.return_value.status_code = requests.codes.not_found
+        mock_requests.side_effect = RuntimeError("connection reset")
+
+        wp = website.Spider(self.site_url, None)
+        self.assertRaises(RuntimeError, wp.crawl)
+
+        mock_close.assert_called_once_with()
+
+        # the titles and descriptions registries
+        self.assertEqual(mock_registry_close.call_count, 2)
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_closes_spilled_duplicates(self, mock_requests, mock_head):
+        mock_requests.return_value.status_code = requests.codes.ok
+        mock_requests.return_value.content = (
+            "<html><head><title>A mocked website title</title></head></html>")
+
+        wp = website.Spider(self.site_url, None)
+        wp.titles.spill()
+        db = wp.titles.db
+        wp.crawl()
+
+        self.assertIsNone(wp.titles.db)
+        self.assertRaises(sqlite3.ProgrammingError, db.execute, "SELECT 1")
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_sitemap_streamed(self, mock_requests):
+        sitemap = ("<urlset><url><loc>{0}/about</loc></url>"
+                   "<url><loc>{0}/contact</loc></url>").format(self.site_url)
+
+        def mock_get(url, *args, **kwargs):
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            if url.endswith("/sitemap.xml"):
+                # the urlset is never closed
+                resp.iter_content.return_value = [sitemap.encode("utf-8")]
+            else:
+                resp.content = "<html><head><title>{0}</title></head></html>"
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        wp = website.Spider(self.site_url, "/sitemap.xml")
+        wp.report = {"pages": []}
+        self.assertEqual(wp.sitemap.url, self.site_url + "/sitemap.xml")
+
+        report = wp.crawl()
+
+        self.assertEqual([p["url"] for p in report["pages"]], [
+            self.site_url, self.site_url + "/about",
+            self.site_url + "/contact"])
+        self.assertTrue(any(issue["warning"] == WARNINGS["SITEMAP_INVALID"]
+                            for issue in wp.issues))
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_writer(self, mock_requests):
+        mock_requests.return_value.status_code = requests.codes.ok
+        mock_requests.return_value.content = (
+            "<html><head><title>A mocked website title</title></head></html>")
+        writer = mock.MagicMock()
+
+        wp = website.Spider(self.site_url, None, writer=writer)
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        # pages are handed to the writer instead of kept in the report
+        self.assertEqual(report["pages"], [])
+        self.assertEqual(writer.write_page.call_count, 1)
+        self.assertEqual(writer.write_page.call_args[0][0]["url"],
+                         self.site_url)
+        writer.write_site.assert_called_once_with(report["site"])
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_near_duplicates(self, mock_requests, mock_head):
+        text = " ".join("cats chase mice {0} times".format(i)
+                        for i in range(50))
+        pages = {
+            "/a": text,
+            "/b": "dogs chase cats instead",
+            "/c": text.replace("49 times", "fifty times"),
+        }
+
+        def mock_get(url, *args, **kwargs):
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            resp.content = "<html><body><p>{0}</p></body></html>".format(
+                pages.get(parse.urlparse(url).path, ""))
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        wp = website.Spider(self.site_url, None)
+        wp.pages_to_crawl = [self.site_url + path for path in sorted(pages)]
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        self.assertIn({"warning": WARNINGS["CONTENT_NEAR_DUPLICATE"],
+                       "value": [self.site_url + "/a", self.site_url + "/c"]},
+                      report["site"]["issues"])
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_codes(self, mock_requests):
+        mock_requests.return_value.status_code = requests.codes.ok
+        mock_requests.return_value.content = (
+            "<html><head><title>A mocked website title</title></head></html>")
+        writer = mock.MagicMock()
+
+        wp = website.Spider(self.site_url, None, writer=writer, codes=True)
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        # the codes are reported, their messages listed once
+        page = writer.write_page.call_args[0][0]
+        self.assertIn({"warning": "DESCRIPTION_MISSING", "value": None},
+                      page["issues"])
+        self.assertEqual(report["messages"]["warnings"], WARNINGS)
+        self.assertEqual(report["messages"]["achievements"], BADGES)
+        writer.write_messages.assert_called_once_with(report["messages"])
+
+    @ddt.data((1, None, 4, None), (4, None, 4, None), (1, 1, 3, None),
+              (2, 0, 1, None), (2, None, 4, 2), (1, 1, 3, 1))
+    @ddt.unpack
+    @mock.patch('seo_report.links.requests.Session.head')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_follow_links(self, concurrency, max_depth, crawled,
+                                processes, mock_requests, mock_head):
+        site = {
+            "/": ["/a", "/b", "http://www.externalsite.com/",
+                  "mailto:me@drawbuildplay.com"],
+            "/a": ["/", "/b#top", "/a/c"],
+            "/b": ["/a"],
+            "/a/c": ["/", "/a"],
+        }
+
+        def mock_get(url, *args, **kwargs):
+            path = parse.urlparse(url).path or "/"
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            if path not in site:
+                resp.status_code = requests.codes.not_found
+                return resp
+
+            resp.content = "<html><title>{0}</title>{1}</html>".format(
+                path, "".join("<a href='{0}'>link</a>".format(href)
+                              for href in site[path]))
+            return resp
+
+        mock_requests.side_effect = mock_get
+        mock_head.return_value.status_code = requests.codes.ok
+
+        wp = website.Spider(self.site_url, None, concurrency=concurrency,
+                            follow_links=True, max_depth=max_depth,
+                            processes=processes)
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        expected = [self.site_url, self.site_url + "/a",
+                    self.site_url + "/b", self.site_url + "/a/c"]
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         expected[:crawled])
+
+    @mock.patch('seo_report.links.requests.Session.head')
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_follow_links_normalized(self, mock_requests, mock_head):
+        site = {
+            "/": ["/b#top", "/b"],
+            "/b": ["/"],
+        }
+
+        def mock_get(url, *args, **kwargs):
+            path = parse.urlparse(url).path or "/"
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            if path not in site:
+                resp.status_code = requests.codes.not_found
+                return resp
+
+            resp.content = "<html><title>{0}</title>{1}</html>".format(
+                path, "".join("<a href='{0}'>link</a>".format(href)
+                              for href in site[path]))
+            return resp
+
+        mock_requests.side_effect = mock_get
+        mock_head.return_value.status_code = requests.codes.ok
+
+        wp = website.Spider(self.site_url, None, follow_links=True)
+        report = wp.crawl()
+
+        # the fragment of the first link to the page is dropped
+        self.assertEqual([p["url"] for p in report["pages"]],
+                         [self.site_url, self.site_url + "/b"])
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_max_pages(self, mock_requests):
+        mock_requests.return_value.status_code = requests.codes.not_found
+
+        wp = website.Spider(self.site_url, None, max_pages=2)
+        wp.pages_to_crawl.extend(
+            [self.site_url + "/{0}".format(i) for i in range(5)])
+        wp.crawl()
+
+        broken = [issue for issue in wp.issues
+                  if issue["warning"] == WARNINGS["BROKEN_LINK"]]
+        self.assertEqual(len(broken), 2)
+
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_cache(self, mock_requests):
+        mock_requests.return_value.status_code = requests.codes.not_modified
+        response_cache = mock.MagicMock()
+        response_cache.fetch.return_value.status_code = requests.codes.ok
+        response_cache.fetch.return_value.content = (
+            "<html><head><title>A cached website title</title></head></html>")
+
+        wp = website.Spider(self.site_url, None, cache=response_cache)
+        wp.report = {"pages": []}
+        report = wp.crawl()
+
+        response_cache.fetch.assert_called_once_with(wp.session, self.site_url)
+        self.assertEqual(report["pages"][0]["title"],
+                         "A cached website title")
+
+    @ddt.data(None, 2)
+    @mock.patch('seo_report.website.requests.Session.get')
+    def test_crawl_max_page_size(self, processes, mock_requests):
+        head = b"<html><head><title>A mocked website title</title></head>"
+        body = b"<body>" + b"<p>Cats chase mice</p>" * 1000 + b"</body>"
+
+        def mock_get(url, *args, **kwargs):
+            resp = mock.MagicMock()
+            resp.status_code = requests.codes.ok
+            if url.endswith("/large"):
+                resp.iter_content.return_value = [head, body, body]
+            else:
+                resp.iter_content.return_value = [head]
+            return resp
+
+        mock_requests.side_effect = mock_get
+
+        wp = website.Spider(self.site_url, None, max_page_size=1024,
+                            processes=processes)
+        wp.report = {"pages": []}
+        wp.pages_to_crawl = [self.site_url + "/small",
+                             self.site_url + "/large"]
+        report = wp.crawl()
+
+        # the download stops once past the limit
+        for call in mock_requests.call_args_list[2:]:
+            self.assertEqual(call[1], {"stream": True})
+        self.assertEqual([p["title"] for p in report["pages"]],
+                         ["A mocked website title"] * 2)
+        self.assertEqual(
+            [issue["value"] for issue in wp.issues
+             if issue["warning"] == WARNINGS["PAGE_TOO_LARGE"]],
+            [self.site_url + "/large"])